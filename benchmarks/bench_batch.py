@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+    benchmarks/bench_batch.py
+    -------------------------
+    decoding throughput of myo.batch against the per-object myo.types path
+"""
+
+import argparse
+import os
+import time
+
+from myo.batch import decode_emg, decode_fv, decode_imu
+from myo.types import EMGData, FVData, IMUData
+
+
+def best_of(repeat, fn):
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return min(times)
+
+
+def main(args):
+    n = args.packets
+    cases = (
+        ("emg", 16, EMGData, decode_emg),
+        ("fv", 17, FVData, decode_fv),
+        ("imu", 20, IMUData, decode_imu),
+    )
+    for name, size, cls, batch in cases:
+        packets = [os.urandom(size) for _ in range(n)]
+        buffer = b"".join(packets)
+        t_obj = best_of(args.repeat, lambda: [cls(p) for p in packets])
+        t_list = best_of(args.repeat, lambda: batch(packets))
+        t_buf = best_of(args.repeat, lambda: batch(buffer))
+        print(
+            f"{name:>4}: per-object {n / t_obj / 1e6:7.2f} Mpkt/s"
+            f" | batch(list) {n / t_list / 1e6:7.2f} Mpkt/s"
+            f" | batch(buffer) {n / t_buf / 1e6:7.2f} Mpkt/s"
+            f" | {t_obj / t_buf:6.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--packets", default=100000, type=int, help="packets per run")
+    parser.add_argument("--repeat", default=5, type=int, help="runs per variant (best is reported)")
+    main(parser.parse_args())
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+    benchmarks/bench_features.py
+    ----------------------------
+    cost of myo.features.FeatureExtractor (running sums) against recomputing
+    every window from its samples, and of extract_features over a recording
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from myo.features import FeatureExtractor, extract_features
+
+
+def from_scratch(x, window, hop):
+    # what a per-hop implementation does: all the features from the window's samples
+    out = []
+    for end in range(window, len(x) + 1, hop):
+        w = x[end - window : end]
+        d = np.diff(w, axis=0)
+        out.append(
+            np.stack(
+                [
+                    np.sqrt(np.mean(w * w, axis=0)),
+                    np.mean(np.abs(w), axis=0),
+                    np.sum(np.abs(d), axis=0),
+                    np.sum(w[:-1] * w[1:] < 0, axis=0),
+                    np.sum(-d[:-1] * d[1:] > 0, axis=0),
+                ],
+                axis=-1,
+            )
+        )
+    return out
+
+
+def main(args):
+    rng = np.random.default_rng(0)
+    channels = 8 * args.bands
+    x = rng.normal(0, 30, (args.seconds * 200, channels))
+    for window in args.windows:
+        fx = FeatureExtractor(window, args.hop, channels=channels)
+        t0 = time.perf_counter()
+        for i in range(0, len(x), args.block):
+            fx.process(x[i : i + args.block])
+        t_stream = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        from_scratch(x, window, args.hop)
+        t_scratch = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        extract_features(x, window, args.hop)
+        t_offline = time.perf_counter() - t0
+        print(
+            f"window {window:4d}: streaming {t_stream / args.seconds * 100:6.2f}% of a core"
+            f" | from scratch {t_scratch / args.seconds * 100:6.2f}%"
+            f" | offline {args.seconds / t_offline:8.0f}x real time"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--windows", default=[40, 100, 400], nargs="+", type=int, help="window lengths in samples")
+    parser.add_argument("--hop", default=2, type=int, help="hop in samples")
+    parser.add_argument("--block", default=2, type=int, help="samples per block (2: one EMG packet)")
+    parser.add_argument("--bands", default=4, type=int, help="bands (8 channels each)")
+    parser.add_argument("--seconds", default=30, type=int, help="seconds of 200Hz data")
+    main(parser.parse_args())
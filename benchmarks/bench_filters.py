@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+    benchmarks/bench_filters.py
+    ---------------------------
+    per-block cost of myo.filters.EMGFilterBank for several bands in one bank,
+    against filtering sample by sample
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from myo.filters import EMGFilterBank, _step
+
+
+def per_block(bank, blocks):
+    t0 = time.perf_counter()
+    for x in blocks:
+        bank.process(x)
+    return (time.perf_counter() - t0) / len(blocks)
+
+
+def per_sample(bank, blocks):
+    # the same cascades, one sample at a time
+    band = bank.band.sos
+    smooth = bank.smooth.sos
+    z1 = np.zeros((2 * len(band), bank.channels))
+    z2 = np.zeros((2 * len(smooth), bank.channels))
+    t0 = time.perf_counter()
+    for x in blocks:
+        for row in x:
+            y, z1 = _step(band, row, z1)
+            _, z2 = _step(smooth, np.abs(y), z2)
+    return (time.perf_counter() - t0) / len(blocks)
+
+
+def main(args):
+    rng = np.random.default_rng(0)
+    for bands in args.bands:
+        channels = 8 * bands
+        blocks = [rng.normal(0, 30, (args.block, channels)) for _ in range(args.blocks)]
+        t_block = per_block(EMGFilterBank(channels=channels), blocks)
+        t_sample = per_sample(EMGFilterBank(channels=channels), blocks)
+        # one block per packet of every band at 200Hz
+        load = t_block * 200 / args.block
+        print(
+            f"{bands:3d} bands: {t_block * 1e6:7.1f} us/block"
+            f" | per-sample {t_sample * 1e6:7.1f} us/block"
+            f" | {t_sample / t_block:5.1f}x | {load * 100:5.2f}% of a core"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--bands", default=[1, 4, 16, 64], nargs="+", type=int, help="bands per bank")
+    parser.add_argument("--block", default=2, type=int, help="samples per block (2: one EMG packet)")
+    parser.add_argument("--blocks", default=5000, type=int, help="blocks per run")
+    main(parser.parse_args())
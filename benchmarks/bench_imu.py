@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+    benchmarks/bench_imu.py
+    -----------------------
+    orientation processing of myo.imu on (N, 10) blocks against the same math
+    per IMUData object in pure Python
+"""
+
+import argparse
+import math
+import time
+
+import numpy as np
+
+from myo.batch import decode_imu
+from myo.imu import IMUProcessor
+from myo.replay import imu_packet
+from myo.types import IMUData
+
+
+def best_of(repeat, fn):
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return min(times)
+
+
+def per_object(packets, rate):
+    angle = [0.0, 0.0, 0.0]
+    before = None
+    out = []
+    for p in packets:
+        imu = IMUData(p)
+        o = imu.orientation
+        n = math.sqrt(o.w * o.w + o.x * o.x + o.y * o.y + o.z * o.z)
+        w, x, y, z = o.w / n, o.x / n, o.y / n, o.z / n
+        euler = (
+            math.atan2(2 * (w * x + y * z), 1 - 2 * (x * x + y * y)),
+            math.asin(max(-1.0, min(1.0, 2 * (w * y - x * z)))),
+            math.atan2(2 * (w * z + x * y), 1 - 2 * (y * y + z * z)),
+        )
+        a = imu.accelerometer
+        linear = (
+            a[0] - 2 * (x * z - w * y),
+            a[1] - 2 * (y * z + w * x),
+            a[2] - (1 - 2 * (x * x + y * y)),
+        )
+        g = imu.gyroscope
+        if before is not None:
+            angle = [angle[i] + (before[i] + g[i]) / (2 * rate) for i in range(3)]
+        before = g
+        out.append((euler, linear, tuple(angle)))
+    return out
+
+
+def main(args):
+    rng = np.random.default_rng(0)
+    packets = [
+        imu_packet(q / np.linalg.norm(q), rng.normal(0, 1, 3), rng.normal(0, 100, 3))
+        for q in rng.normal(0, 1, (args.packets, 4))
+    ]
+    buffer = b"".join(packets)
+    n = args.packets
+    t_obj = best_of(args.repeat, lambda: per_object(packets, 50))
+    t_batch = best_of(args.repeat, lambda: IMUProcessor(frame="band").process(decode_imu(buffer)))
+    print(f"per-object {n / t_obj / 1e3:9.1f} ksample/s")
+    print(f"     batch {n / t_batch / 1e3:9.1f} ksample/s | {t_obj / t_batch:6.1f}x")
+    for block in (1, 10, 50):
+        p = IMUProcessor(frame="band")
+        x = decode_imu(buffer)
+        t = best_of(args.repeat, lambda: [p.process(x[i : i + block]) for i in range(0, n, block)])
+        print(f"{block:>4}/block {n / t / 1e3:9.1f} ksample/s | {t_obj / t:6.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--packets", default=50000, type=int, help="IMU samples per run")
+    parser.add_argument("--repeat", default=3, type=int, help="runs per variant (best is reported)")
+    main(parser.parse_args())
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+    benchmarks/bench_inference.py
+    -----------------------------
+    sample-to-decision latency of the gesture pipeline (sequencer -> filter bank ->
+    features -> InferenceStage) for several bands replayed in real time
+"""
+
+import argparse
+import asyncio
+
+import numpy as np
+
+from myo import MyoClient, MyoGroup
+from myo.features import FeatureExtractor, extract_features
+from myo.filters import EMGFilterBank
+from myo.inference import LDA, InferenceStage
+from myo.replay import ReplayBackend, ReplayFleet, synthetic_source
+from myo.types import ClassifierMode, EMGMode, IMUMode
+
+
+class GestureClient(MyoClient):
+    async def on_gesture(self, gesture):
+        pass
+
+
+def trained_model(window, hop):
+    # a model over the features of synthetic data, labelled by its contraction envelope
+    source = [p for t, h, p in synthetic_source(duration=20.0) if h.name.startswith("EMG")]
+    emg = np.frombuffer(b"".join(source), dtype=np.int8).reshape(-1, 8).astype(np.float64)
+    x = extract_features(EMGFilterBank(envelope=None).process(emg), window, hop)
+    x = x.reshape(len(x), -1)
+    rms = x[:, 0::5].mean(axis=1)
+    y = np.where(rms > np.median(rms), "fist", "rest")
+    return LDA().fit(x, y)
+
+
+async def main(args):
+    fleet = ReplayFleet(
+        [
+            ReplayBackend(synthetic_source(seed=i), address=f"D2:3B:85:94:32:{i:02X}")
+            for i in range(args.bands)
+        ]
+    )
+    group = await MyoGroup.with_devices(count=args.bands, client_cls=GestureClient, backend=fleet, sequence_emg=True)
+    for client in group:
+        client.sequencer.depth = args.depth
+        client.add_emg_stage(EMGFilterBank(envelope=None))
+        client.features = FeatureExtractor(args.window, args.hop)
+    stage = group.infer(InferenceStage(trained_model(args.window, args.hop), tick=args.tick))
+    await group.setup(classifier_mode=ClassifierMode.DISABLED, emg_mode=EMGMode.SEND_RAW, imu_mode=IMUMode.NONE)
+    await group.start()
+    await asyncio.sleep(args.seconds)
+    await group.stop()
+    await group.disconnect()
+
+    stats = stage.stats()
+    print(f"{args.bands} bands: {stats['decisions']} decisions in {stats['batches']} batches")
+    for name in ("latency", "processing", "model"):
+        h = stats[name]
+        print(f"{name:>10}: mean {h['mean'] * 1e3:6.2f}ms p50 {h['p50'] * 1e3:6.2f}ms p99 {h['p99'] * 1e3:6.2f}ms")
+    print(f"over budget: {stats['over_budget']}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--bands", default=4, type=int, help="replayed bands")
+    parser.add_argument("--seconds", default=5.0, type=float, help="wall-clock seconds to run")
+    parser.add_argument("--window", default=40, type=int, help="feature window in samples")
+    parser.add_argument("--hop", default=10, type=int, help="feature hop in samples")
+    parser.add_argument("--depth", default=4, type=int, help="packets the sequencer holds back for late ones")
+    parser.add_argument("--tick", default=0.0, type=float, help="InferenceStage tick in seconds")
+    asyncio.run(main(parser.parse_args()))
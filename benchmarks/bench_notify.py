@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+    benchmarks/bench_notify.py
+    --------------------------
+    per-packet overhead of MyoClient.notify_callback
+    (the legacy if/elif dispatch vs the dispatch table built by start())
+"""
+
+import argparse
+import asyncio
+import logging
+import time
+
+from myo import Handle, MyoClient
+from myo.core import EMGDataSingle
+from myo.types import ClassifierMode, EMGData, EMGMode, FVData, IMUData, IMUMode
+
+logger = logging.getLogger("myo.core")
+
+EMG_BLOB = bytes.fromhex("090d01fefefefa0206e9fcfdfcfe0502")
+FV_BLOB = bytes.fromhex("5203ce0061007901d80062006f00730100")
+IMU_BLOB = bytes.fromhex("3e2eab2be5f824004e01bd0757000300f5fffcff")
+
+
+class Sender:
+    __slots__ = "handle"
+
+    def __init__(self, handle):
+        self.handle = handle
+
+
+class NullClient(MyoClient):
+    async def on_emg_data(self, emg):
+        pass
+
+    async def on_fv_data(self, fvd):
+        pass
+
+    async def on_imu_data(self, imu):
+        pass
+
+
+async def legacy_notify_callback(self, sender, data):
+    # the notify_callback before the dispatch table, kept for comparison
+    handle = Handle(sender.handle)
+    logger.debug(f"notify_callback ({handle}): {data}")
+    if handle == Handle.CLASSIFIER_EVENT:
+        pass
+    elif handle == Handle.FV_DATA:
+        await self.on_fv_data(FVData(data))
+    elif handle == Handle.IMU_DATA:
+        await self.on_imu_data(IMUData(data))
+    elif handle == Handle.MOTION_EVENT:
+        pass
+    elif handle in [
+        Handle.EMG0_DATA,
+        Handle.EMG1_DATA,
+        Handle.EMG2_DATA,
+        Handle.EMG3_DATA,
+    ]:
+        emg = EMGData(data)
+        if self.aggregate_emg:
+            await self.on_emg_data_aggregated(EMGDataSingle(emg.sample1))
+            await self.on_emg_data_aggregated(EMGDataSingle(emg.sample2))
+        else:
+            await self.on_emg_data(emg)
+
+
+def packets(n):
+    # 200Hz EMG round-robin over EMG0-3 (50Hz each) + 50Hz IMU, per 20ms tick
+    tick = [
+        (Sender(Handle.EMG0_DATA.value), EMG_BLOB),
+        (Sender(Handle.EMG1_DATA.value), EMG_BLOB),
+        (Sender(Handle.EMG2_DATA.value), EMG_BLOB),
+        (Sender(Handle.EMG3_DATA.value), EMG_BLOB),
+        (Sender(Handle.IMU_DATA.value), IMU_BLOB),
+    ]
+    return (tick * (n // len(tick) + 1))[:n]
+
+
+async def run(callback, client, pkts):
+    t0 = time.perf_counter()
+    for sender, data in pkts:
+        await callback(client, sender, data)
+    return time.perf_counter() - t0
+
+
+async def main(args):
+    client = NullClient()
+    client.classifier_mode = ClassifierMode.DISABLED
+    client.emg_mode = EMGMode.SEND_RAW
+    client.imu_mode = IMUMode.SEND_DATA
+    client._build_dispatch()
+    pkts = packets(args.packets)
+
+    results = {}
+    for name, cb in (("legacy", legacy_notify_callback), ("dispatch", MyoClient.notify_callback)):
+        best = min([await run(cb, client, pkts) for _ in range(args.repeat)])
+        results[name] = best / len(pkts) * 1e9
+        print(f"{name:>10}: {results[name]:8.0f} ns/packet")
+    print(f"{'speedup':>10}: {results['legacy'] / results['dispatch']:8.2f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--packets", default=100000, type=int, help="packets per run")
+    parser.add_argument("--repeat", default=5, type=int, help="runs per variant (best is reported)")
+    asyncio.run(main(parser.parse_args()))
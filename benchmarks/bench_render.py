@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+    benchmarks/bench_render.py
+    --------------------------
+    frame time of the retained-mode renderers used by myo_progects/myo_viewer.py
+    (8 channels x 10s of 200Hz data by default, drawn with the Agg backend)
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import matplotlib
+
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt  # noqa: E402
+import numpy as np  # noqa: E402
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "myo_progects"))
+from live_render import LineRenderer, RadarRenderer  # noqa: E402
+
+
+def run(fig, renderer, rate, fps, frames):
+    rng = np.random.default_rng(0)
+    per_frame = max(1, rate // fps)
+    canvas = fig.canvas
+    canvas.draw()
+    background = canvas.copy_from_bbox(fig.bbox)
+    # fill the window first so every frame draws a full one
+    renderer.push(rng.normal(500, 100, (renderer.window.size, renderer.window.channels)))
+    t0 = time.perf_counter()
+    for _ in range(frames):
+        renderer.push(rng.normal(500, 100, (per_frame, renderer.window.channels)))
+        canvas.restore_region(background)
+        for artist in renderer.draw():
+            fig.draw_artist(artist)
+        canvas.blit(fig.bbox)
+    return (time.perf_counter() - t0) / frames
+
+
+def main(args):
+    fig, ax = plt.subplots(figsize=(10, 6))
+    ax.set_ylim(0, 1000)
+    line = LineRenderer(ax, channels=args.channels, rate=args.rate, seconds=args.seconds)
+    dt = run(fig, line, args.rate, args.fps, args.frames)
+    print(f" line: {dt * 1e3:6.2f} ms/frame ({1 / dt:6.0f} fps), {line.window.size} samples x {args.channels} ch")
+
+    fig, ax = plt.subplots(figsize=(6, 6), subplot_kw={"polar": True})
+    ax.set_ylim(0, 1000)
+    radar = RadarRenderer(ax, channels=args.channels)
+    dt = run(fig, radar, args.rate, args.fps, args.frames)
+    print(f"radar: {dt * 1e3:6.2f} ms/frame ({1 / dt:6.0f} fps), artists: {len(ax.patches)} patch")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--channels", default=8, type=int)
+    parser.add_argument("--rate", default=200, type=int, help="samples per second")
+    parser.add_argument("--seconds", default=10.0, type=float, help="window length")
+    parser.add_argument("--fps", default=60, type=int, help="target frame rate (sets samples per frame)")
+    parser.add_argument("--frames", default=300, type=int)
+    main(parser.parse_args())
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+    benchmarks/bench_replay.py
+    --------------------------
+    end-to-end throughput of MyoClient fed by the replay backend
+"""
+
+import argparse
+import asyncio
+import time
+
+from myo import MyoClient
+from myo.replay import ReplayBackend, jsonl_source, synthetic_source
+from myo.types import ClassifierMode, EMGMode, IMUMode
+
+
+class NullClient(MyoClient):
+    async def on_aggregated_data(self, ad):
+        pass
+
+    async def on_emg_data(self, emg):
+        pass
+
+    async def on_fv_data(self, fvd):
+        pass
+
+    async def on_imu_data(self, imu):
+        pass
+
+
+async def main(args):
+    source = jsonl_source(args.jsonl, loop=True) if args.jsonl else synthetic_source()
+    backend = ReplayBackend(source, speed=args.speed or None)
+    client = await NullClient.with_device(backend=backend, aggregate_all=args.aggregate)
+    await client.setup(
+        classifier_mode=ClassifierMode.DISABLED,
+        emg_mode=EMGMode.SEND_RAW if args.raw else EMGMode.SEND_FILT,
+        imu_mode=IMUMode.SEND_DATA,
+    )
+    if args.metrics:
+        client.enable_metrics()
+    t0 = time.perf_counter()
+    await client.start()
+    await asyncio.sleep(args.seconds)
+    await client.stop()
+    elapsed = time.perf_counter() - t0
+    snapshot = client.metrics_snapshot()
+    await client.disconnect()
+
+    sent = sum(backend.clients[0].sent.values())
+    print(f"packets: {sent} in {elapsed:.2f}s -> {sent / elapsed:,.0f} packets/s")
+    print(f"replayed {backend.clock():.1f}s of device time ({backend.clock() / elapsed:.1f}x real time)")
+    for name, m in snapshot["handles"].items():
+        cb = m["callback"]
+        print(f"{name}: {m['packets']} packets, callback p50 {cb['p50'] * 1e6:.0f}us p99 {cb['p99'] * 1e6:.0f}us")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seconds", default=5.0, type=float, help="wall-clock seconds to run")
+    parser.add_argument("--speed", default=0.0, type=float, help="replay speed multiplier, 0 for unpaced")
+    parser.add_argument("--raw", action="store_true", help="stream raw EMG instead of FV")
+    parser.add_argument("--aggregate", action="store_true", help="run with aggregate_all")
+    parser.add_argument("--metrics", action="store_true", help="run with enable_metrics()")
+    parser.add_argument("--jsonl", default="", help="replay a JSONL recording instead of synthetic data")
+    asyncio.run(main(parser.parse_args()))
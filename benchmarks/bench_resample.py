@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+    benchmarks/bench_resample.py
+    ----------------------------
+    cost of myo.resample.FrameResampler putting 200Hz EMG and 50Hz FV/IMU, pushed
+    packet by packet as from a band, on one fixed-rate clock
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from myo.resample import FrameResampler
+
+
+def main(args):
+    rng = np.random.default_rng(0)
+    ticks = int(args.seconds * 50)
+    emg = rng.normal(0, 30, (ticks * 4, 8))
+    fv = rng.uniform(0, 1000, (ticks, 8))
+    imu = rng.normal(0, 1, (ticks, 10))
+    frames = FrameResampler(rate=args.rate)
+    emitted = 0
+    t0 = time.perf_counter()
+    for i in range(ticks):
+        t = i / 50 + rng.uniform(0, 0.01)
+        # two EMG packets of 2 samples per 50Hz tick
+        for j in (0, 2):
+            emitted += len(frames.push("emg", emg[4 * i + j : 4 * i + j + 2], t, np.arange(4 * i + j, 4 * i + j + 2)))
+        emitted += len(frames.push("fv", fv[i], t))
+        emitted += len(frames.push("imu", imu[i], t))
+    elapsed = time.perf_counter() - t0
+    pushes = ticks * 4
+    print(f"{args.seconds:.0f}s of data -> {emitted} frames at {args.rate:.0f}Hz in {elapsed:.2f}s")
+    print(f"{elapsed / pushes * 1e6:.1f}us per packet, {elapsed / args.seconds * 100:.2f}% of one core in real time")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seconds", default=60.0, type=float, help="seconds of band data")
+    parser.add_argument("--rate", default=100.0, type=float, help="frame rate in Hz")
+    main(parser.parse_args())
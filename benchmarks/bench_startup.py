@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+    benchmarks/bench_startup.py
+    ---------------------------
+    time-to-first-sample of setup() + start(), with and without fast_start,
+    against the replay backend with a simulated BLE round trip
+"""
+
+import argparse
+import asyncio
+import statistics
+
+from myo import MyoClient
+from myo.replay import ReplayBackend, synthetic_source
+from myo.types import ClassifierMode, EMGMode, IMUMode
+
+
+class NullClient(MyoClient):
+    async def on_emg_data(self, emg):
+        pass
+
+    async def on_fv_data(self, fvd):
+        pass
+
+    async def on_imu_data(self, imu):
+        pass
+
+    async def on_motion_event(self, me):
+        pass
+
+
+async def bring_up(args, fast_start):
+    backend = ReplayBackend(synthetic_source(), latency=args.latency)
+    client = await NullClient.with_device(backend=backend, fast_start=fast_start)
+    await client.setup(
+        classifier_mode=ClassifierMode.DISABLED,
+        emg_mode=EMGMode.SEND_RAW if args.raw else EMGMode.SEND_FILT,
+        imu_mode=IMUMode.SEND_ALL,
+    )
+    await client.start()
+    while client.time_to_first_sample is None:
+        await asyncio.sleep(0.001)
+    startup = dict(client.startup)
+    await client.stop()
+    await client.disconnect()
+    return startup
+
+
+async def main(args):
+    for fast_start in (False, True):
+        runs = [await bring_up(args, fast_start) for _ in range(args.runs)]
+        steps = {k: statistics.median(r[k] for r in runs) * 1e3 for k in ("setup", "start", "first_sample")}
+        label = "fast_start" if fast_start else "default"
+        print(
+            f"{label:>10}: setup {steps['setup']:6.1f} ms, start {steps['start']:6.1f} ms, "
+            f"first sample {steps['first_sample']:6.1f} ms"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--latency", default=0.03, type=float, help="simulated round trip in seconds")
+    parser.add_argument("--runs", default=5, type=int)
+    parser.add_argument("--raw", action="store_true", help="stream raw EMG (4 handles) instead of FV")
+    asyncio.run(main(parser.parse_args()))
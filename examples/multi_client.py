@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+
+import argparse
+import asyncio
+import logging
+
+from myo import MyoGroup
+from myo.types import ClassifierMode, EMGMode, IMUMode
+
+
+async def main(args: argparse.Namespace):
+    logging.info("scanning for Myo devices...")
+
+    group = await MyoGroup.with_devices(macs=args.mac or None, count=args.count)
+    logging.info(f"connected to {group.addresses}")
+
+    # setup and start all the devices at once
+    await group.setup(
+        classifier_mode=ClassifierMode.DISABLED,
+        emg_mode=EMGMode.SEND_FILT,
+        imu_mode=IMUMode.SEND_DATA,
+    )
+    stream = group.stream(kinds=("fv", "imu"))
+    await group.start()
+
+    async def consume():
+        async for batch in stream:
+            for address, handle, t, data in batch:
+                logging.debug(f"{address} {handle.name} {t:.3f}: {data}")
+
+    consumer = asyncio.create_task(consume())
+    await asyncio.sleep(args.seconds)
+
+    await group.stop()
+    await group.disconnect()
+    await consumer
+
+    for address, stats in group.stats().items():
+        logging.info(f"{address}: {stats}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+
+    parser.add_argument(
+        "-d",
+        "--debug",
+        action="store_true",
+        help="sets the log level to debug",
+    )
+    parser.add_argument(
+        "--mac",
+        action="append",
+        help="a mac address to connect to (repeatable)",
+        metavar="<mac-address>",
+    )
+    parser.add_argument(
+        "--count",
+        default=2,
+        help="the number of devices to connect to when no mac address is given",
+        metavar="<count>",
+        type=int,
+    )
+    parser.add_argument(
+        "--seconds",
+        default=10,
+        help="seconds to read data",
+        metavar="<seconds>",
+        type=int,
+    )
+
+    args = parser.parse_args()
+
+    log_level = logging.DEBUG if args.debug else logging.INFO
+    logging.basicConfig(
+        level=log_level,
+        format="%(asctime)-15s %(name)-8s %(levelname)s: %(message)s",
+    )
+
+    asyncio.run(main(args))
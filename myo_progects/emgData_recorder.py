@@ -3,11 +3,10 @@
 import argparse
 import asyncio
 import logging
-import json
 import datetime
-import os
 
 from myo import AggregatedData, MyoClient
+from myo.recorder import RecordingSink
 from myo.types import (
     ClassifierEvent,
     ClassifierMode,
@@ -30,43 +29,33 @@ class SampleClient(MyoClient):
         
         # ディレクトリの作成
         self.save_directory = "./emg_data"
-        os.makedirs(self.save_directory, exist_ok=True)
+        # ストリームごとにファイルを開いたまま、バックグラウンドでまとめて書き込む
+        self.sink = RecordingSink(self.save_directory, self.file_prefix)
+        self.sinks.append(self.sink)
 
     async def on_classifier_event(self, ce: ClassifierEvent):
         logging.info(ce.json())
-        with open(f'{self.save_directory}/{self.file_prefix}_classifier_event.json', 'a') as f:
-            json.dump(ce.to_dict(), f)
-            f.write('\n')
+        self.sink.write("classifier_event", ce)
 
     async def on_aggregated_data(self, ad: AggregatedData):
         logging.info(ad)
-        with open(f'{self.save_directory}/{self.file_prefix}_aggregated_data.json', 'a') as f:
-            json.dump(ad.to_dict(), f)
-            f.write('\n')
+        self.sink.write("aggregated_data", ad)
 
     async def on_emg_data(self, emg: EMGData):
         # logging.info(emg)
-        with open(f'{self.save_directory}/{self.file_prefix}_emg_data.json', 'a') as f:
-            json.dump(emg.to_dict(), f)
-            f.write('\n')
+        self.sink.write("emg_data", emg)
 
     async def on_fv_data(self, fvd: FVData):
         # logging.info(fvd.json())
-        with open(f'{self.save_directory}/{self.file_prefix}_fv_data.json', 'a') as f:
-            json.dump(fvd.to_dict(), f)
-            f.write('\n')
+        self.sink.write("fv_data", fvd)
 
     async def on_imu_data(self, imu: IMUData):
         # logging.info(imu.json())
-        with open(f'{self.save_directory}/{self.file_prefix}_imu_data.json', 'a') as f:
-            json.dump(imu.to_dict(), f)
-            f.write('\n')
+        self.sink.write("imu_data", imu)
 
     async def on_motion_event(self, me: MotionEvent):
         logging.info(me.json())
-        with open(f'{self.save_directory}/{self.file_prefix}_motion_event.json', 'a') as f:
-            json.dump(me.to_dict(), f)
-            f.write('\n')
+        self.sink.write("motion_event", me)
 
 
 async def main(args: argparse.Namespace):
@@ -4,6 +4,8 @@ import matplotlib.animation as animation
 import os
 from tkinter import Tk, filedialog
 
+from myo.mapped import MappedSession
+
 # ファイル選択ダイアログを表示してファイルを選択
 def select_file():
     root = Tk()
@@ -11,7 +13,7 @@ def select_file():
     file_path = filedialog.askopenfilename(
         initialdir="EMG_data",
         title="Select a JSON file",
-        filetypes=(("JSON files", "*.json"), ("All files", "*.*")),
+        filetypes=(("JSON files", "*.json"), ("Myo session files", "*.myo"), ("All files", "*.*")),
     )
     return file_path
 
@@ -23,6 +25,13 @@ def load_aggregated_data(file_path):
             data.append(json.loads(line))
     return data
 
+# FVデータの読み込み（.myoはメモリマップで必要な範囲だけ読む）
+def load_fv_data(file_path):
+    if file_path.endswith(".myo"):
+        _, fv = MappedSession(file_path).fv()
+        return fv
+    return [d['fvd']['fv'] for d in load_aggregated_data(file_path)]
+
 # ファイル選択
 file_path = select_file()
 if not file_path:
@@ -48,7 +57,7 @@ def update(frame):
     # フレームに対応するデータを追加
     x_data.append(frame)
     for i in range(8):
-        fv_data[i].append(data[frame]['fvd']['fv'][i])
+        fv_data[i].append(data[frame][i])
 
     # X軸が右にずれるように範囲を更新
     ax.set_xlim(max(0, frame-100), frame + 10)
@@ -60,7 +69,7 @@ def update(frame):
     return fv_lines
 
 # データの読み込み
-data = load_aggregated_data(file_path)
+data = load_fv_data(file_path)
 
 # アニメーションの設定
 ani = animation.FuncAnimation(
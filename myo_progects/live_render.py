@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+"""
+リアルタイム表示用の描画レイヤー
+
+アーティストは最初に一度だけ作成し、毎フレームは事前確保したNumPyのウィンドウから
+set_paths / set_xy で中身だけを更新する。ウィンドウのサンプル数が横方向のピクセル数の半分より
+多い場合は、2ピクセルごとの列のmin〜maxをつないだ帯を塗りつぶして描く（折れ線や縦線を引くより
+Aggの描画がずっと軽い）。
+"""
+import numpy as np
+from matplotlib.collections import PathCollection
+from matplotlib.lines import Line2D
+from matplotlib.patches import Polygon
+from matplotlib.path import Path
+
+
+class SampleWindow:
+    """直近 size サンプル × channels の循環バッファ"""
+
+    def __init__(self, size, channels, dtype=np.float32):
+        self.size = size
+        self.channels = channels
+        self.count = 0  # これまでに追加された総サンプル数
+        self._buf = np.zeros((size, channels), dtype=dtype)
+        self._out = np.zeros((size, channels), dtype=dtype)
+
+    def push(self, frames):
+        frames = np.asarray(frames)
+        k = len(frames)
+        if k == 0:
+            return
+        if k >= self.size:
+            frames = frames[-self.size:]
+            self.count += k - self.size
+            k = self.size
+        i = self.count % self.size
+        first = min(k, self.size - i)
+        self._buf[i:i + first] = frames[:first]
+        self._buf[:k - first] = frames[first:]
+        self.count += k
+
+    def latest(self):
+        return self._buf[(self.count - 1) % self.size]
+
+    def ordered(self):
+        """古い順に並べたウィンドウ（事前確保した配列に書き込むビュー）"""
+        n = min(self.count, self.size)
+        i = self.count % self.size
+        if self.count <= self.size:
+            return self._buf[:n]
+        tail = self.size - i
+        self._out[:tail] = self._buf[i:]
+        self._out[tail:] = self._buf[:i]
+        return self._out
+
+
+def minmax_decimate(y, bins):
+    """
+    (n, c) を bins 列に間引く: 各列の最小値と最大値（ピークを失わない）。前の列の最後のサンプルも
+    含めるので、列をつないだ帯が途切れない
+    戻り値: (各列の最後のサンプルの位置 (bins,), 最小値 (bins, c), 最大値 (bins, c))
+    """
+    n = len(y)
+    # 各列の最初のサンプル（n が bins で割り切れなくても全サンプルを使う）
+    edges = np.linspace(0, n, bins + 1).astype(np.intp)[:-1]
+    lo = np.minimum.reduceat(y, edges, axis=0)
+    hi = np.maximum.reduceat(y, edges, axis=0)
+    last = y[edges[1:] - 1]
+    np.minimum(lo[1:], last, out=lo[1:])
+    np.maximum(hi[1:], last, out=hi[1:])
+    x = np.append(edges[1:] - 1, n - 1)
+    return x, lo, hi
+
+
+class LineRenderer:
+    """
+    チャンネルごとの折れ線。x軸は「現在からの秒数」（-seconds〜0）で固定
+    全チャンネルを1つのPathCollection（チャンネルごとに1パス、アンチエイリアスなし）で描き、
+    凡例には handles を使う。間引くときはmin〜maxの帯を上下に半ピクセルずつ広げて塗るので、
+    平坦な信号も1ピクセルの線として見える。8チャンネル×10秒×200Hzで1フレーム約9〜12ms
+    （benchmarks/bench_render.py、60fpsの16.7msに収まる）
+    """
+
+    def __init__(self, ax, channels=8, rate=200, seconds=10.0, colors=None, labels=None):
+        self.ax = ax
+        self.rate = rate
+        self.channels = channels
+        self.window = SampleWindow(int(rate * seconds), channels)
+        self.max_points = None
+        if colors is None:
+            colors = [f"C{i}" for i in range(channels)]
+        if labels is None:
+            labels = [f"ch{i+1}" for i in range(channels)]
+        self.collection = PathCollection(
+            [], facecolors="none", edgecolors=colors, linewidths=1, antialiaseds=False, capstyle="butt",
+            transform=ax.transData,
+        )
+        ax.add_collection(self.collection, autolim=False)
+        # 凡例用（軸には追加しない）: ax.legend(handles=renderer.handles)
+        self.handles = [Line2D([], [], lw=1, color=colors[i], label=labels[i]) for i in range(channels)]
+        self.colors = colors
+        self._filled = False  # 間引いて帯を塗っているか（折れ線のときは False）
+        self._verts = None  # (channels, 点数, 2) の描画用バッファ
+        ax.set_xlim(-seconds, 0)
+        self.resize()
+
+    def resize(self, event=None):
+        # 横方向のピクセル数に合わせて間引き後のビン数を決める（1ビン=min/maxの2点で約2ピクセル）
+        self.max_points = max(16, int(self.ax.bbox.width) // 2)
+
+    def push(self, frames):
+        self.window.push(frames)
+
+    def draw(self):
+        y = self.window.ordered()
+        n = len(y)
+        if n == 0:
+            return (self.collection,)
+        if n > 2 * self.max_points:
+            x, lo, hi = minmax_decimate(y, self.max_points)
+            m = len(x)
+            t = (x - (n - 1)) / self.rate
+            bottom, top = self.ax.get_ylim()
+            half = abs(top - bottom) / max(1.0, self.ax.bbox.height) / 2  # 半ピクセル（データ単位）
+            # 上側（max）を左から右へ、下側（min）を右から左へたどる閉じた帯
+            verts = self._buffer(2 * m)
+            verts[:, :m, 0] = t
+            verts[:, m:, 0] = t[::-1]
+            verts[:, :m, 1] = hi.T + half
+            verts[:, m:, 1] = lo.T[:, ::-1] - half
+            self._set_filled(True)
+        else:
+            verts = self._buffer(n)
+            verts[:, :, 0] = (np.arange(n) - (n - 1)) / self.rate
+            verts[:, :, 1] = y.T
+            self._set_filled(False)
+        self.collection.set_paths([Path(v) for v in verts])
+        return (self.collection,)
+
+    def _set_filled(self, filled):
+        if filled == self._filled:
+            return
+        self._filled = filled
+        if filled:
+            self.collection.set_facecolor(self.colors)
+            self.collection.set_edgecolor("none")
+            self.collection.set_linewidth(0)
+        else:
+            self.collection.set_facecolor("none")
+            self.collection.set_edgecolor(self.colors)
+            self.collection.set_linewidth(1)
+
+    def _buffer(self, m):
+        if self._verts is None or self._verts.shape[1] != m:
+            self._verts = np.empty((self.channels, m, 2))
+        return self._verts
+
+
+class RadarRenderer:
+    """最新サンプルのレーダーチャート。線と塗りつぶしのアーティストは1つずつ使い回す"""
+
+    def __init__(self, ax, channels=8, color="b"):
+        self.ax = ax
+        self.window = SampleWindow(1, channels)
+        angles = np.linspace(0, 2 * np.pi, channels, endpoint=False)
+        self.angles = np.append(angles, angles[:1])  # 円を閉じる
+        self._xy = np.zeros((channels + 1, 2))
+        self._xy[:, 0] = self.angles
+        self.line, = ax.plot(self.angles, np.zeros(channels + 1), color=color, lw=2)
+        self.fill = Polygon(self._xy, closed=True, color=color, alpha=0.25)
+        ax.add_patch(self.fill)
+
+    def push(self, frames):
+        self.window.push(frames)
+
+    def draw(self):
+        if self.window.count:
+            v = self.window.latest()
+            self._xy[:-1, 1] = v
+            self._xy[-1, 1] = v[0]
+            self.line.set_ydata(self._xy[:, 1])
+            self.fill.set_xy(self._xy)
+        return self.line, self.fill
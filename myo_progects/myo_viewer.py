@@ -1,43 +1,53 @@
 import asyncio
+import time
 import matplotlib.pyplot as plt
 import matplotlib.animation as animation
-from multiprocessing import Process, Queue, Event
-from myo import Myo, MyoClient, Handle
+from multiprocessing import Process, Event
+from myo import Gap, MyoClient, Handle
+from myo.shm import SharedRing
 from myo.types import FVData, EMGMode, IMUMode, ClassifierMode
 import numpy as np
 import argparse
 
+from live_render import LineRenderer, RadarRenderer
+
+RING_CAPACITY = 4096  # 50Hzで約80秒分
+FV_RATE = 50  # FVデータのサンプリングレート (Hz)
+
 class RealTimeFVClient(MyoClient):
-    def __init__(self, queue, fps, *args, **kwargs):
+    def __init__(self, *args, ring=None, **kwargs):
         super().__init__(*args, **kwargs)
-        self.queue = queue
-        self.fps = fps
-        self.interval = 1.0 / fps
+        self.ring = ring
 
     async def on_fv_data(self, fvd: FVData):
-        if not self.queue.full():
-            self.queue.put(fvd.fv)
-        await asyncio.sleep(self.interval)
+        # 全サンプルを共有メモリのリングバッファへ書き込む（通知処理をスリープで止めない）
+        self.ring.write(time.monotonic(), fvd.fv)
+
+    async def on_gap(self, gap: Gap):
+        # 再接続でデータが途切れた区間を表示
+        print(f"Reconnected: no data for {gap.duration:.2f}s ({gap.reason})")
 
     async def disconnect(self):
         if self._client and self._client.is_connected:
             await self._client.stop_notify(Handle.FV_DATA.value)
-            await self._client.disconnect()
+            await super().disconnect()
             print("Myo device disconnected successfully.")
 
-async def bluetooth_main(queue, stop_event, fps):
+async def bluetooth_main(ring_name, stop_event):
     client = None
+    ring = SharedRing.attach(ring_name, capacity=RING_CAPACITY, width=8, dtype=np.uint16)
     try:
         print("Searching for Myo device...")
-        myo_device = await Myo.with_uuid()
-        if myo_device is None:
+        # キャッシュの端末に接続できなければ with_device がキャッシュから消して再スキャンする
+        connecting = asyncio.ensure_future(RealTimeFVClient.with_device())
+        while not connecting.done() and not stop_event.is_set():
+            await asyncio.sleep(0.1)
+        if not connecting.done():
+            connecting.cancel()
             print("Myo device not found")
             return
-        
-        client = RealTimeFVClient(queue, fps)
-        client.m = myo_device
-        
-        await client.connect()
+        client = connecting.result()
+        client.ring = ring
         print("Myo device connected successfully.")
 
         await client.setup(
@@ -50,72 +60,54 @@ async def bluetooth_main(queue, stop_event, fps):
         await client.start()
         print("Myo device started.")
 
+        # 切断・データ停止を検知して自動で再接続する
+        client.supervise()
+
         while not stop_event.is_set():
             await asyncio.sleep(0.01)
 
     except Exception as e:
         print(f"Error occurred: {e}")
-        print("Attempting to reconnect...")
-        await asyncio.sleep(5)
 
     finally:
         if client:
             await client.disconnect()
+        ring.close()
 
-def bluetooth_task(queue, stop_event, fps):
-    asyncio.run(bluetooth_main(queue, stop_event, fps))
+def bluetooth_task(ring_name, stop_event):
+    asyncio.run(bluetooth_main(ring_name, stop_event))
 
-def plot_task(queue, stop_event, fps, plot_type):
+def plot_task(ring, stop_event, fps, plot_type, seconds):
     colors = ['b', 'g', 'r', 'c', 'm', 'y', 'k', 'orange']  # 各FVの色を定義
+    labels = [f"FV{i+1}" for i in range(8)]
 
     if plot_type == 'radar':
         fig, ax = plt.subplots(figsize=(6, 6), subplot_kw={'polar': True})
-        labels = [f"FV{i+1}" for i in range(8)]
-        angles = np.linspace(0, 2 * np.pi, len(labels), endpoint=False).tolist()
-        angles += angles[:1]
-
         ax.set_theta_offset(np.pi / 2)
         ax.set_theta_direction(-1)
         ax.set_ylim(0, 1000)
 
-        ax.set_xticks(angles[:-1])
+        renderer = RadarRenderer(ax, channels=8, color=colors[0])
+        ax.set_xticks(renderer.angles[:-1])
         ax.set_xticklabels(labels)  # FV名をラベルとして配置
 
-        line, = ax.plot([], [], color='b', lw=2)
-        ax.fill([], [], color='b', alpha=0.25)
-
-        def update(frame):
-            if not queue.empty():
-                data = queue.get()
-                data += data[:1]  # 最後の点を最初と同じにして円を閉じる
-                line.set_data(angles, data)
-                ax.fill(angles, data, color=colors[0], alpha=0.25)
-            return line,
-
     else:  # default to line pl
         fig, ax = plt.subplots(figsize=(10, 6))
-        ax.set_xlim(0, 50)
         ax.set_ylim(0, 1000)
 
-        fv_lines = [ax.plot([], [], lw=2, label=f"FV{i+1}", color=colors[i])[0] for i in range(8)]
-        ax.legend(loc="upper left")
-        x_data = []
-        fv_data = [[] for _ in range(8)]
-        current_frame = 0
-
-        def update(frame):
-            nonlocal current_frame
-            if not queue.empty():
-                data = queue.get()
-                current_frame += 1
-                x_data.append(current_frame)
-                for i in range(8):
-                    fv_data[i].append(data[i])
-                    fv_data[i] = fv_data[i][-50:]
-                ax.set_xlim(max(0, current_frame-50), current_frame + 10)
-                for i in range(8):
-                    fv_lines[i].set_data(x_data[-50:], fv_data[i])
-            return fv_lines
+        # 直近 seconds 秒の全サンプルを表示（アーティストは一度だけ作成）
+        renderer = LineRenderer(ax, channels=8, rate=FV_RATE, seconds=seconds, colors=colors, labels=labels)
+        fig.canvas.mpl_connect('resize_event', renderer.resize)
+        ax.legend(handles=renderer.handles, loc="upper left")
+
+    seen = 0
+
+    def update(frame):
+        nonlocal seen
+        # 前回の描画以降に届いたサンプルをすべてウィンドウへ追加する
+        seen, _, frames = ring.read_since(seen)
+        renderer.push(frames)
+        return renderer.draw()
 
     interval_ms = 1000 // fps
     ani = animation.FuncAnimation(fig, update, blit=True, interval=interval_ms, repeat=False, cache_frame_data=False)
@@ -131,15 +123,18 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Myo EMG Data Viewer")
     parser.add_argument('--plot_type', type=str, choices=['radar', 'line'], default='line',
                         help="Type of plot to display: 'radar' for radar chart, 'line' for line plot")
-    parser.add_argument('--fps', type=int, default=30, help="Frames per second for data acquisition and plotting")
+    parser.add_argument('--fps', type=int, default=30, help="Frames per second for plotting")
+    parser.add_argument('--seconds', type=float, default=10.0, help="Seconds of data shown by the line plot")
     args = parser.parse_args()
 
-    q = Queue(maxsize=1)
+    ring = SharedRing.create(capacity=RING_CAPACITY, width=8, dtype=np.uint16)
     stop_event = Event()
     
-    bluetooth_process = Process(target=bluetooth_task, args=(q, stop_event, args.fps))
+    bluetooth_process = Process(target=bluetooth_task, args=(ring.name, stop_event))
     bluetooth_process.start()
 
-    plot_task(q, stop_event, args.fps, args.plot_type)
-    
-    bluetooth_process.join()
+    try:
+        plot_task(ring, stop_event, args.fps, args.plot_type, args.seconds)
+        bluetooth_process.join()
+    finally:
+        ring.close()
@@ -5,13 +5,18 @@
 """
 from __future__ import absolute_import, annotations
 
+from .aggregator import Aggregator, MissingPolicy
 from .core import (
     AggregatedData,
     EMGDataSingle,
+    Gap,
     Myo,
     MyoClient,
 )
+from .group import MyoGroup
+from .info import DeviceInfo
 from .profile import Handle
+from .stream import MyoStream, OverflowPolicy
 from .types import (
     ClassifierEvent,
     ClassifierMode,
@@ -31,6 +36,15 @@ from .types import (
 )
 from .version import __version__
 
+
+def __getattr__(name):
+    # myo.inference needs numpy, which the core of the package does not
+    if name == "Gesture":
+        from .inference import Gesture
+
+        return Gesture
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 __author__ = "Iori Mizutani"
 __copyright__ = "Copyright (c) 2023 Iori Mizutani"
 __email__ = "iomz@sazanka.io"
@@ -0,0 +1,222 @@
+"""
+    myo.aggregator
+    ----------------
+    Timestamp-aligned joining of the FV, IMU and raw EMG streams
+    into AggregatedData frames, one frame per IMU tick
+"""
+import json
+from collections import deque
+from enum import Enum
+
+from .constants import EMG_DEFAULT_STREAMING_RATE
+from .types import EMGData, FVData, IMUData
+
+
+# this is a custom data type for fv, imu and (optionally) a window of raw emg samples
+class AggregatedData:
+    __slots__ = ("fvd", "imu", "emg", "timestamp")
+
+    def __init__(self, fvd: FVData, imu: IMUData, emg=None, timestamp=None):
+        self.fvd = fvd
+        self.imu = imu
+        self.emg = emg  # tuple of 8-channel samples, oldest first
+        self.timestamp = timestamp  # host monotonic time of the IMU tick
+
+    def __str__(self):
+        s = f"{','.join(map(str, self.fvd.fv))},{self.imu}" if self.fvd is not None else str(self.imu)
+        if self.emg is not None:
+            s += "," + ",".join(str(v) for sample in self.emg for v in sample)
+        return s
+
+    def json(self):
+        return json.dumps(self.to_dict())
+
+    def to_dict(self):
+        d = {"fvd": self.fvd.to_dict() if self.fvd is not None else None, "imu": self.imu.to_dict()}
+        if self.emg is not None:
+            d["emg"] = [list(sample) for sample in self.emg]
+        return d
+
+
+# fmt: off
+class MissingPolicy(Enum):
+    DROP = "drop"      # skip the frame
+    HOLD = "hold"      # reuse the previous partner (skip the frame if there is none yet)
+    EMPTY = "empty"    # emit the frame with None for the missing partner
+# fmt: on
+
+
+class Aggregator:
+    """
+    <> joins FV and/or raw EMG onto IMU ticks by host timestamp
+
+       every packet is pushed with its host monotonic arrival time; since arrival
+       times are monotonic across all streams, an IMU tick at t is final once any
+       packet arrives after t + tolerance, and then it is joined with
+         - the FV packet nearest to t within tolerance (fv=True)
+         - the last emg_window EMG samples up to t + tolerance (emg=True)
+       everything runs synchronously inside the notification handler, so no lock is needed
+    """
+
+    def __init__(self, fv=True, emg=False, tolerance=0.01, emg_window=4, missing=MissingPolicy.DROP):
+        self.fv = fv
+        self.emg = emg
+        self.tolerance = tolerance
+        self.emg_window = emg_window
+        self.missing = MissingPolicy(missing)
+        self.frames = 0
+        self.dropped_frames = 0
+        self.missing_fv = 0
+        self.missing_emg = 0
+        self.unused_fv = 0
+        self.unused_emg = 0
+        self._imu = deque()  # (t, IMUData) waiting for the watermark
+        self._fv = deque()  # (t, FVData)
+        self._emg = deque()  # (t, sample)
+        self._last_fv = None
+        self._last_emg = None
+        self._push = {EMGData: self.push_emg, FVData: self.push_fv, IMUData: self.push_imu}
+
+    def push(self, t, data) -> list:
+        """
+        <> push a decoded FVData, IMUData or EMGData received at t, return the completed frames
+        """
+        return self._push[type(data)](t, data)
+
+    def push_emg(self, t, emg: EMGData) -> list:
+        if self.emg:
+            # two samples per packet, the second one is the most recent
+            self._emg.append((t - 1.0 / EMG_DEFAULT_STREAMING_RATE, emg.sample1))
+            self._emg.append((t, emg.sample2))
+        return self._advance(t)
+
+    def push_fv(self, t, fvd: FVData) -> list:
+        if self.fv:
+            self._fv.append((t, fvd))
+        return self._advance(t)
+
+    def push_imu(self, t, imu: IMUData) -> list:
+        self._imu.append((t, imu))
+        return self._advance(t)
+
+    def flush(self) -> list:
+        """
+        <> join the IMU ticks still waiting for the watermark
+        """
+        frames = []
+        while self._imu:
+            frame = self._join(*self._imu.popleft())
+            if frame is not None:
+                frames.append(frame)
+        return frames
+
+    def stats(self) -> dict:
+        return {
+            "frames": self.frames,
+            "dropped_frames": self.dropped_frames,
+            "missing_fv": self.missing_fv,
+            "missing_emg": self.missing_emg,
+            "unused_fv": self.unused_fv,
+            "unused_emg": self.unused_emg,
+        }
+
+    def _advance(self, now) -> list:
+        frames = []
+        imu = self._imu
+        while imu and imu[0][0] + self.tolerance < now:
+            frame = self._join(*imu.popleft())
+            if frame is not None:
+                frames.append(frame)
+        self._trim(imu[0][0] if imu else now)
+        return frames
+
+    def _trim(self, base):
+        """
+        <> drop the FV packets and EMG samples no IMU tick at or after base can use,
+           so that they don't pile up while the IMU stream is late or missing
+        """
+        fv = self._fv
+        lo = base - self.tolerance
+        while fv and fv[0][0] < lo:
+            fv.popleft()
+            self.unused_fv += 1
+        emg = self._emg
+        hi = base + self.tolerance
+        # the next tick takes every sample up to hi but keeps only the last emg_window
+        while len(emg) > self.emg_window and emg[self.emg_window][0] <= hi:
+            emg.popleft()
+            self.unused_emg += 1
+
+    def _join(self, t, imu: IMUData):
+        fvd = emg = None
+        missing = False
+
+        if self.fv:
+            fvd = self._take_fv(t)
+            if fvd is None:
+                self.missing_fv += 1
+                fvd, missing = self._fill(self._last_fv)
+            else:
+                self._last_fv = fvd
+
+        if self.emg:
+            emg = self._take_emg(t)
+            if emg is None:
+                self.missing_emg += 1
+                emg, m = self._fill(self._last_emg)
+                missing = missing or m
+            else:
+                self._last_emg = emg
+
+        if missing:
+            self.dropped_frames += 1
+            return None
+        self.frames += 1
+        return AggregatedData(fvd, imu, emg, t)
+
+    def _fill(self, last):
+        """
+        <> (partner, drop frame?) for a missing partner under the missing policy
+        """
+        if self.missing == MissingPolicy.EMPTY:
+            return None, False
+        if self.missing == MissingPolicy.HOLD and last is not None:
+            return last, False
+        return None, True
+
+    def _take_fv(self, t):
+        fv = self._fv
+        lo = t - self.tolerance
+        while fv and fv[0][0] < lo:
+            fv.popleft()
+            self.unused_fv += 1
+        best = None
+        best_dt = self.tolerance
+        for i, (tf, _) in enumerate(fv):
+            dt = abs(tf - t)
+            if dt > best_dt:
+                if tf > t:
+                    break
+                continue
+            best, best_dt = i, dt
+        if best is None:
+            return None
+        for _ in range(best):
+            fv.popleft()
+            self.unused_fv += 1
+        return fv.popleft()[1]
+
+    def _take_emg(self, t):
+        emg = self._emg
+        hi = t + self.tolerance
+        window = deque(maxlen=self.emg_window)
+        n = 0
+        while emg and emg[0][0] <= hi:
+            window.append(emg.popleft()[1])
+            n += 1
+        if n < self.emg_window:
+            # a partial window belongs to this tick, don't shift it into the next one
+            self.unused_emg += n
+            return None
+        self.unused_emg += n - self.emg_window
+        return tuple(window)
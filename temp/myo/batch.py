@@ -0,0 +1,68 @@
+"""
+    myo.batch
+    ------------
+    Vectorized decoders for many notification payloads at once
+    (the NumPy counterpart of EMGData, FVData and IMUData)
+"""
+
+import numpy as np
+
+from .constants import (
+    ACCELEROMETER_SCALE,
+    GYROSCOPE_SCALE,
+    ORIENTATION_SCALE,
+)
+from .types import (
+    _EMG_DATA,
+    _FV_DATA,
+    _IMU_DATA,
+)
+
+# myohw_emg_data_t: 2 samples of 8 int8 channels
+EMG_DTYPE = np.dtype("i1")
+# FVData: 8 uint16 values + int8 mask, packed (17 bytes)
+FV_DTYPE = np.dtype([("fv", "<u2", (8,)), ("mask", "i1")])
+# myohw_imu_data_t: orientation w,x,y,z + accelerometer x,y,z + gyroscope x,y,z
+IMU_SCALES = np.array(
+    [ORIENTATION_SCALE] * 4 + [ACCELEROMETER_SCALE] * 3 + [GYROSCOPE_SCALE] * 3,
+    dtype=np.float32,
+)
+
+
+def _as_buffer(packets, size):
+    """
+    <> join a list of payloads (or take a contiguous buffer) of size-byte packets
+    """
+    if isinstance(packets, (list, tuple)):
+        packets = b"".join(packets)
+    buf = memoryview(packets).cast("B")
+    if len(buf) % size:
+        raise ValueError(f"buffer of {len(buf)} bytes is not a multiple of the {size}-byte packet size")
+    return buf
+
+
+def decode_emg(packets) -> np.ndarray:
+    """
+    <> N EMG packets -> (2N, 8) int8, sample1 and sample2 of each packet in order
+    """
+    buf = _as_buffer(packets, _EMG_DATA.size)
+    return np.frombuffer(buf, dtype=EMG_DTYPE).reshape(-1, 8).copy()
+
+
+def decode_fv(packets):
+    """
+    <> N FV packets -> ((N, 8) uint16 fv, (N,) int8 mask)
+    """
+    buf = _as_buffer(packets, _FV_DATA.size)
+    rec = np.frombuffer(buf, dtype=FV_DTYPE)
+    return rec["fv"].astype(np.uint16), rec["mask"].copy()
+
+
+def decode_imu(packets) -> np.ndarray:
+    """
+    <> N IMU packets -> (N, 10) float32 scaled like IMUData:
+       [w, x, y, z, accel x, y, z, gyro x, y, z]
+    """
+    buf = _as_buffer(packets, _IMU_DATA.size)
+    raw = np.frombuffer(buf, dtype="<i2").reshape(-1, 10)
+    return raw.astype(np.float32) / IMU_SCALES
@@ -0,0 +1,279 @@
+"""
+    myo.calibration
+    ------------
+    Per-channel calibration of EMG/FV magnitudes (rest and MVC phases) with streaming
+    statistics, in-stream normalization and profiles saved per band serial number
+"""
+import json
+import math
+import os
+import time
+
+import numpy as np
+
+from .sequence import EMGBlock
+
+DEFAULT_PROFILE_DIR = os.path.join(
+    os.environ.get("XDG_CONFIG_HOME") or os.path.join(os.path.expanduser("~"), ".config"),
+    "dl-myo",
+    "calibration",
+)
+PERCENTILES = (1, 5, 50, 95, 99)
+
+
+class RunningStats:
+    """
+    <> per-channel count, mean and variance (Welford), merged a block at a time; NaN is skipped
+    """
+
+    def __init__(self, channels=8):
+        self.n = np.zeros(channels)
+        self.mean = np.zeros(channels)
+        self._m2 = np.zeros(channels)
+        self.min = np.full(channels, np.inf)
+        self.max = np.full(channels, -np.inf)
+
+    def push(self, x):
+        x = np.asarray(x, dtype=np.float64)
+        valid = ~np.isnan(x)
+        n_b = valid.sum(axis=0)
+        if not n_b.any():
+            return
+        x0 = np.where(valid, x, 0.0)
+        mean_b = x0.sum(axis=0) / np.maximum(n_b, 1)
+        m2_b = (np.where(valid, x - mean_b, 0.0) ** 2).sum(axis=0)
+        # Chan et al.: merge the block's (n, mean, M2) into the running ones
+        n = self.n + n_b
+        delta = mean_b - self.mean
+        self.mean = self.mean + delta * n_b / np.maximum(n, 1)
+        self._m2 = self._m2 + m2_b + delta**2 * self.n * n_b / np.maximum(n, 1)
+        self.n = n
+        self.min = np.fmin(self.min, np.where(valid, x, np.inf).min(axis=0))
+        self.max = np.fmax(self.max, np.where(valid, x, -np.inf).max(axis=0))
+
+    @property
+    def var(self) -> np.ndarray:
+        return np.where(self.n > 1, self._m2 / np.maximum(self.n - 1, 1), 0.0)
+
+    @property
+    def std(self) -> np.ndarray:
+        return np.sqrt(self.var)
+
+
+class QuantileSketch:
+    """
+    <> per-channel percentiles within a relative error of alpha, in fixed memory
+
+       values are counted in logarithmic buckets (as in DDSketch): |v| in (g^(i-1), g^i]
+       with g = (1 + alpha) / (1 - alpha), one set for each sign, |v| <= min_value counts as 0
+       and |v| > max_value as max_value
+    """
+
+    def __init__(self, channels=8, alpha=0.01, min_value=1e-3, max_value=1e6):
+        self.channels = channels
+        self.alpha = alpha
+        self.min_value = min_value
+        self._log_gamma = math.log((1 + alpha) / (1 - alpha))
+        self._offset = math.ceil(math.log(min_value) / self._log_gamma)
+        self.buckets = math.ceil(math.log(max_value) / self._log_gamma) - self._offset + 1
+        # ascending values: negative buckets (largest magnitude first), zero, positive buckets
+        self.counts = np.zeros((channels, 2 * self.buckets + 1), dtype=np.int64)
+
+    @property
+    def count(self) -> np.ndarray:
+        return self.counts.sum(axis=1)
+
+    def push(self, x):
+        x = np.asarray(x, dtype=np.float64)
+        x = x[~np.isnan(x).any(axis=1)]
+        if not len(x):
+            return
+        magnitude = np.abs(x)
+        zero = magnitude <= self.min_value
+        k = np.ceil(np.log(np.where(zero, 1.0, magnitude)) / self._log_gamma) - self._offset
+        k = np.clip(k, 0, self.buckets - 1).astype(np.int64)
+        position = np.where(zero, self.buckets, np.where(x > 0, self.buckets + 1 + k, self.buckets - 1 - k))
+        width = self.counts.shape[1]
+        flat = position + np.arange(self.channels) * width
+        self.counts += np.bincount(flat.ravel(), minlength=self.channels * width).reshape(self.channels, width)
+
+    def percentile(self, p) -> np.ndarray:
+        """
+        <> (channels,) the p-th percentile (0..100), NaN for a channel without values
+        """
+        cumulative = np.cumsum(self.counts, axis=1)
+        total = cumulative[:, -1]
+        rank = p / 100 * np.maximum(total - 1, 0)
+        position = (cumulative > rank[:, None]).argmax(axis=1)
+        k = np.abs(position - self.buckets) - 1 + self._offset
+        # the middle of bucket k, within alpha of any value in it
+        value = 2 * np.exp(k * self._log_gamma) / (1 + math.exp(self._log_gamma))
+        value = np.sign(position - self.buckets) * value
+        return np.where(total > 0, value, np.nan)
+
+
+class CalibrationProfile:
+    """
+    <> the calibration of one band: per-channel statistics of the rest phase (mean, std,
+       baseline = median) and of the MVC phase (mvc = its mvc_percentile), and percentiles
+       of everything seen; kind: what was calibrated, "emg" or "fv"
+    """
+
+    def __init__(self, serial_number, kind, mean, std, baseline, mvc, percentiles, created=None):
+        self.serial_number = serial_number
+        self.kind = kind
+        self.mean = np.asarray(mean, dtype=np.float64)
+        self.std = np.asarray(std, dtype=np.float64)
+        self.baseline = np.asarray(baseline, dtype=np.float64)
+        self.mvc = np.asarray(mvc, dtype=np.float64)
+        self.percentiles = {int(p): np.asarray(v, dtype=np.float64) for p, v in percentiles.items()}
+        self.created = time.time() if created is None else created
+
+    def __str__(self):
+        return f"CalibrationProfile({self.serial_number}, {self.kind}, mvc {np.round(self.mvc, 1).tolist()})"
+
+    def json(self):
+        return json.dumps(self.to_dict())
+
+    def to_dict(self):
+        return {
+            "serial_number": self.serial_number,
+            "kind": self.kind,
+            "mean": self.mean.tolist(),
+            "std": self.std.tolist(),
+            "baseline": self.baseline.tolist(),
+            "mvc": self.mvc.tolist(),
+            "percentiles": {str(p): v.tolist() for p, v in self.percentiles.items()},
+            "created": self.created,
+        }
+
+    @classmethod
+    def from_dict(cls, d):
+        return cls(
+            d["serial_number"],
+            d["kind"],
+            d["mean"],
+            d["std"],
+            d["baseline"],
+            d["mvc"],
+            d["percentiles"],
+            d["created"],
+        )
+
+    def save(self, directory=DEFAULT_PROFILE_DIR) -> str:
+        path = profile_path(self.serial_number, self.kind, directory)
+        os.makedirs(directory, exist_ok=True)
+        tmp = path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(self.to_dict(), f)
+        os.replace(tmp, path)
+        return path
+
+
+def profile_path(serial_number, kind="emg", directory=DEFAULT_PROFILE_DIR) -> str:
+    return os.path.join(directory, f"{serial_number.replace(':', '-')}.{kind}.json")
+
+
+def load_profile(serial_number, kind="emg", directory=DEFAULT_PROFILE_DIR):
+    """
+    <> the saved CalibrationProfile of a band, None if there is none
+    """
+    try:
+        with open(profile_path(serial_number, kind, directory), "r") as f:
+            return CalibrationProfile.from_dict(json.load(f))
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+class Calibrator:
+    """
+    <> collects per-channel statistics during the "rest" and "mvc" phases and normalizes
+       the same stream as it passes, so no second pass over the data is needed
+
+         cal = client.add_emg_stage(Calibrator(serial_number))  # after an EMGFilterBank
+         cal.begin("rest"); ...; cal.begin("mvc"); ...; profile = cal.end()
+
+       mode "mvc" maps baseline -> 0 and mvc -> 1, "zscore" uses the rest mean/std; until a
+       profile exists, "zscore" uses the statistics of everything so far and "mvc" passes through.
+       process() takes an EMGBlock or an (n, channels) array (e.g. FV values)
+    """
+
+    def __init__(self, serial_number=None, kind="emg", channels=8, mode="mvc", mvc_percentile=99, profile=None):
+        if mode not in ("mvc", "zscore"):
+            raise ValueError(f"unknown normalization mode: {mode}")
+        self.serial_number = serial_number
+        self.kind = kind
+        self.channels = channels
+        self.mode = mode
+        self.mvc_percentile = mvc_percentile
+        self.profile = profile
+        self.phase = None
+        self.stats = {}  # phase -> RunningStats
+        self.sketches = {}  # phase -> QuantileSketch
+        self.overall = RunningStats(channels)
+        self.overall_sketch = QuantileSketch(channels)
+
+    def begin(self, phase):
+        """
+        <> count the following samples into phase ("rest", "mvc", ...), ending the current one
+        """
+        self.phase = phase
+        self.stats.setdefault(phase, RunningStats(self.channels))
+        self.sketches.setdefault(phase, QuantileSketch(self.channels))
+
+    def end(self) -> CalibrationProfile:
+        """
+        <> end the calibration and normalize with the resulting profile from now on
+        """
+        self.phase = None
+        self.profile = self.build_profile()
+        return self.profile
+
+    def build_profile(self) -> CalibrationProfile:
+        rest = self.stats.get("rest", self.overall)
+        rest_sketch = self.sketches.get("rest", self.overall_sketch)
+        mvc_sketch = self.sketches.get("mvc", self.overall_sketch)
+        return CalibrationProfile(
+            self.serial_number,
+            self.kind,
+            rest.mean,
+            rest.std,
+            rest_sketch.percentile(50),
+            mvc_sketch.percentile(self.mvc_percentile),
+            {p: self.overall_sketch.percentile(p) for p in PERCENTILES},
+        )
+
+    def reset(self):
+        """
+        <> a new series of the same band (MyoClient.start, e.g. after a reconnect): the phase
+           statistics, the current phase and the profile are kept, as they describe the band
+           and not the series; begin() again or use a new Calibrator to start over
+        """
+
+    def process(self, block):
+        x = block.emg if isinstance(block, EMGBlock) else np.asarray(block, dtype=np.float64)
+        if self.phase is not None:
+            self.stats[self.phase].push(x)
+            self.sketches[self.phase].push(x)
+            self.overall.push(x)
+            self.overall_sketch.push(x)
+        y = self.normalize(x)
+        if isinstance(block, EMGBlock):
+            return EMGBlock(block.index, block.t, y, block.gap)
+        return y
+
+    def normalize(self, x) -> np.ndarray:
+        """
+        <> float32 (n, channels), x as is while there is nothing to normalize with
+        """
+        p = self.profile
+        if p is None:
+            if self.mode == "mvc" or not self.overall.n.any():
+                return np.asarray(x, dtype=np.float32)
+            offset, scale = self.overall.mean, self.overall.std
+        elif self.mode == "mvc":
+            offset, scale = p.baseline, p.mvc - p.baseline
+        else:
+            offset, scale = p.mean, p.std
+        scale = np.where(np.abs(scale) > 1e-12, scale, 1.0)
+        return ((x - offset) / scale).astype(np.float32)
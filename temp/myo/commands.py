@@ -10,6 +10,18 @@ from .types import SleepMode, UnlockType, UserActionType
 # myohw_command_t
 class Command:
     cmd = 0x00
+    # how myo.control.CommandQueue treats the command
+    cached = False  # the bytes depend only on enum arguments, see encode
+    coalesce = False  # a newer command of the same type replaces a pending one
+    cosmetic = False  # callers do not wait for the write
+    response = True  # written with response (False: without, where the queue allows it)
+
+    @property
+    def key(self) -> tuple:
+        """
+        <> the arguments that determine the bytes of a cached command
+        """
+        return ()
 
     @property
     def payload(self) -> bytearray:
@@ -18,8 +30,8 @@ class Command:
     @property
     def data(self) -> bytearray:
         # myohw_command_header_t
-        header = bytearray([self.cmd, len(self.payload)])
-        return header + self.payload
+        payload = self.payload
+        return bytearray([self.cmd, len(payload)]) + payload
 
     def __str__(self):
         return str(type(self).__name__) + ": " + str(self.payload)
@@ -28,12 +40,17 @@ class Command:
 # -> myohw_command_set_mode_t
 class SetMode(Command):
     cmd = 0x01
+    cached = True
 
     def __init__(self, classifier_mode, emg_mode, imu_mode):
         self.classifier_mode = classifier_mode
         self.emg_mode = emg_mode
         self.imu_mode = imu_mode
 
+    @property
+    def key(self) -> tuple:
+        return self.classifier_mode, self.emg_mode, self.imu_mode
+
     @property
     def payload(self) -> bytearray:
         """
@@ -51,10 +68,16 @@ class SetMode(Command):
 # -> myohw_command_vibrate
 class Vibrate(Command):
     cmd = 0x03
+    cached = True
+    cosmetic = True
 
     def __init__(self, vibration_type):
         self.vibration_type = vibration_type
 
+    @property
+    def key(self) -> tuple:
+        return (self.vibration_type,)
+
     @property
     def payload(self) -> bytearray:
         return bytearray((self.vibration_type.value,))
@@ -63,6 +86,7 @@ class Vibrate(Command):
 # -> myohw_command_deep_sleep_t
 class DeepSleep(Command):
     cmd = 0x04
+    cached = True
 
     def __init__(self):
         pass
@@ -71,6 +95,9 @@ class DeepSleep(Command):
 # undocumented in myohw.h
 class LED(Command):
     cmd = 0x06
+    coalesce = True  # only the last color of a burst matters
+    cosmetic = True
+    response = False
 
     def __init__(self, logo, line):
         """[logoR, logoG, logoB], [lineR, lineG, lineB]"""
@@ -87,6 +114,7 @@ class LED(Command):
 # -> myohw_command_vibrate2_t
 class Vibrate2(Command):
     cmd = 0x07
+    cosmetic = True
 
     class Steps:
         def __init__(self, duration, strength):
@@ -112,10 +140,15 @@ class Vibrate2(Command):
 # -> myohw_command_set_sleep_mode_t
 class SetSleepMode(Command):
     cmd = 0x09
+    cached = True
 
     def __init__(self, sleep_mode: SleepMode):
         self.sleep_mode = sleep_mode
 
+    @property
+    def key(self) -> tuple:
+        return (self.sleep_mode,)
+
     @property
     def payload(self) -> bytearray:
         return bytearray((self.sleep_mode.value,))
@@ -124,10 +157,15 @@ class SetSleepMode(Command):
 # -> myohw_command_unlock_t
 class Unlock(Command):
     cmd = 0x0A
+    cached = True
 
     def __init__(self, unlock_type: UnlockType):
         self.unlock_type = unlock_type
 
+    @property
+    def key(self) -> tuple:
+        return (self.unlock_type,)
+
     @property
     def payload(self) -> bytearray:
         return bytearray((self.unlock_type.value,))
@@ -135,10 +173,31 @@ class Unlock(Command):
 
 class UserAction(Command):
     cmd = 0x0B
+    cached = True
 
     def __init__(self, user_action_type: UserActionType):
         self.user_action_type = user_action_type
 
+    @property
+    def key(self) -> tuple:
+        return (self.user_action_type,)
+
     @property
     def payload(self) -> bytearray:
         return bytearray((self.user_action_type.value,))
+
+
+_ENCODED = {}  # (type, key) -> bytes of the cached commands
+
+
+def encode(cmd: Command) -> bytes:
+    """
+    <> the bytes written for cmd, encoded once per distinct cached command
+    """
+    if not cmd.cached:
+        return bytes(cmd.data)
+    k = (type(cmd), cmd.key)
+    data = _ENCODED.get(k)
+    if data is None:
+        data = _ENCODED[k] = bytes(cmd.data)
+    return data
@@ -0,0 +1,140 @@
+"""
+    myo.control
+    ------------
+    A per-connection queue for the Command characteristic
+"""
+import asyncio
+import logging
+from collections import deque
+
+from .commands import Command, encode
+from .profile import Handle
+
+logger = logging.getLogger(__name__)
+
+
+class CommandQueue:
+    """
+    <> writes commands to the device one at a time, in order
+
+       a coalescing command (LED) replaces a pending one of the same type, so a
+       burst costs one write; callers of send() only wait for non-cosmetic commands.
+       commands with response=False are written without response when
+       without_response allows it (None: if the characteristic advertises it)
+    """
+
+    def __init__(self, client, handle=Handle.COMMAND.value, without_response=None):
+        self.handle = handle
+        if without_response is None:
+            without_response = "write-without-response" in _properties(client, handle)
+        self.without_response = without_response
+        self.written = 0
+        self.coalesced = 0
+        self._client = client
+        self._pending = deque()  # [Command, [Future]]
+        self._writing = None  # the [Command, [Future]] being written
+        self._wake = asyncio.Event()
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._task = None
+
+    def __len__(self):
+        return len(self._pending)
+
+    @property
+    def is_connected(self):
+        return self._client.is_connected
+
+    def submit(self, cmd: Command) -> asyncio.Future:
+        """
+        <> queue cmd, the future resolves once it (or the command replacing it) is written
+        """
+        fut = asyncio.get_running_loop().create_future()
+        if cmd.coalesce:
+            for entry in self._pending:
+                if type(entry[0]) is type(cmd):
+                    entry[0] = cmd
+                    entry[1].append(fut)
+                    self.coalesced += 1
+                    return fut
+        self._pending.append([cmd, [fut]])
+        self._idle.clear()
+        self._wake.set()
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+        return fut
+
+    async def send(self, cmd: Command):
+        """
+        <> queue cmd and wait for the write, unless it is cosmetic
+        """
+        fut = self.submit(cmd)
+        if cmd.cosmetic:
+            fut.add_done_callback(_log_failure)
+        else:
+            await fut
+
+    async def join(self):
+        """
+        <> wait until every queued command is written
+        """
+        await self._idle.wait()
+
+    async def close(self):
+        """
+        <> stop writing; pending commands fail with ConnectionError
+        """
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._writing is not None:
+            self._pending.appendleft(self._writing)
+            self._writing = None
+        while self._pending:
+            cmd, futures = self._pending.popleft()
+            for fut in futures:
+                if not fut.done():
+                    fut.set_exception(ConnectionError(f"command queue closed before {cmd}"))
+        self._idle.set()
+
+    async def _run(self):
+        while True:
+            while not self._pending:
+                self._idle.set()
+                self._wake.clear()
+                await self._wake.wait()
+            self._writing = self._pending.popleft()
+            cmd, futures = self._writing
+            response = cmd.response or not self.without_response
+            try:
+                await self._client.write_gatt_char(self.handle, encode(cmd), response)
+                self.written += 1
+                error = None
+            except Exception as e:
+                error = e
+            # close() fails the futures if it cancels the write
+            self._writing = None
+            for fut in futures:
+                if fut.done():
+                    continue
+                if error is None:
+                    fut.set_result(None)
+                else:
+                    fut.set_exception(error)
+
+
+def _properties(client, handle) -> list:
+    for service in client.services:
+        for char in service.characteristics:
+            if char.handle == handle:
+                return char.properties
+    return []
+
+
+def _log_failure(fut: asyncio.Future):
+    if not fut.cancelled() and fut.exception() is not None:
+        logger.warning(f"command failed: {fut.exception()}")
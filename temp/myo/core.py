@@ -5,16 +5,26 @@
     a wrapper class (MyoClient) to handle the connection to Myo devices
 
 """
+from __future__ import annotations
+
 import asyncio
 import binascii
 import logging
 import json
-from bleak import BleakClient, BleakScanner
+import time
+from typing import TYPE_CHECKING
+
+from bleak import BleakClient
 from bleak.backends.characteristic import BleakGATTCharacteristic
 from bleak.backends.device import BLEDevice
 from bleak.backends.scanner import AdvertisementData
 
 
+from .aggregator import (
+    AggregatedData,
+    Aggregator,
+    MissingPolicy,
+)
 from .constants import (
     RGB_CYAN,
     RGB_PINK,
@@ -23,6 +33,7 @@ from .constants import (
 )
 from .commands import (
     Command,
+    encode,
     SetMode,
     Vibrate,
     DeepSleep,
@@ -32,10 +43,28 @@ from .commands import (
     Unlock,
     UserAction,
 )
+from .control import CommandQueue
+from .info import DeviceInfo, read_device_info
+from .metrics import Metrics, summary
 from .profile import (
     GATTProfile,
     Handle,
 )
+from .scan import (
+    CachedDevice,
+    default_cache,
+    shared_scanner,
+)
+from .session import (
+    SessionHeader,
+    SessionWriter,
+)
+from .stream import (
+    STREAM_KINDS,
+    MyoStream,
+    OverflowPolicy,
+    StreamBuffer,
+)
 from .types import (
     ClassifierEvent,
     ClassifierMode,
@@ -51,62 +80,107 @@ from .types import (
     VibrationType,
 )
 
+if TYPE_CHECKING:
+    # the numpy stages, imported where they are enabled so that numpy stays optional
+    from .calibration import Calibrator
+    from .features import FeatureWindows
+    from .imu import IMUFrames
+    from .inference import Gesture
+    from .resample import FrameBlock
+    from .sequence import EMGBlock
+
 
 logger = logging.getLogger(__name__)
 
 
-# this is a custom data type for fv and imu
-class AggregatedData:
-    def __init__(self, fvd: FVData, imu: IMUData):
-        self.fvd = fvd
-        self.imu = imu
+# this is just one sample in EMGData
+class EMGDataSingle:
+    __slots__ = "data"
+
+    def __init__(self, data):
+        self.data = data
 
     def __str__(self):
-        return f"{','.join(map(str, self.fvd.fv))},{self.imu}"
+        return str(self.data)
 
     def json(self):
         return json.dumps(self.to_dict())
 
     def to_dict(self):
-        return {"fvd": self.fvd.to_dict(), "imu": self.imu.to_dict()}
+        return {"data": self.data}
 
 
-# this is just one sample in EMGData
-class EMGDataSingle:
-    def __init__(self, data):
-        self.data = data
+class Gap:
+    """
+    <> a stretch of time without data, from start to end on MyoClient.clock
+       reason: "disconnected" or "stalled"
+    """
+
+    __slots__ = ("start", "end", "reason")
+
+    def __init__(self, start, end, reason):
+        self.start = start
+        self.end = end
+        self.reason = reason
 
     def __str__(self):
-        return str(self.data)
+        return f"Gap({self.reason}, {self.end - self.start:.3f}s)"
+
+    @property
+    def duration(self) -> float:
+        return self.end - self.start
 
     def json(self):
         return json.dumps(self.to_dict())
 
     def to_dict(self):
-        return {"data": self.data}
+        return {"start": self.start, "end": self.end, "reason": self.reason}
 
 
 class Myo:
-    __slots__ = "_device"
+    __slots__ = ("_device", "cached")
 
     def __init__(self):
-        pass
+        self.cached = False  # the device came from the cache rather than a scan
 
     @property
     def device(self) -> BLEDevice:
         return self._device
 
     @classmethod
-    async def with_mac(cls, mac: str):
+    def with_device(cls, device: BLEDevice):
+        """
+        <> wrap a device found by an earlier scan, e.g. myo.group.discover
+        """
+        self = cls()
+        self._device = device
+        return self
+
+    @classmethod
+    async def with_mac(cls, mac: str, backend=None, cache=None, timeout=10.0):
+        """
+        <> the device with mac, from the cache (see myo.scan.DeviceCache) when it was seen
+           recently, otherwise from a scan; cache=None uses the default cache for bleak
+           and none for a backend, cache=False always scans
+           a cached device may be out of range: MyoClient.with_device forgets it and scans
+           when it cannot be connected, callers connecting by themselves have to do the same
+        """
+
         def match_myo_mac(device: BLEDevice, _: AdvertisementData):
             if mac.lower() == device.address.lower():
                 return True
             return False
 
         self = cls()
+        cache = _cache_for(backend, cache)
+        if cache is not None and mac in cache:
+            self._device = cache.get(mac)
+            self.cached = True
+            return self
         try:
             # scan the device
-            self._device = await BleakScanner.find_device_by_filter(match_myo_mac, cb=dict(use_bdaddr=True))
+            scanner = backend or shared_scanner()
+            self._device = await scanner.find_device_by_filter(match_myo_mac, timeout=timeout, cb=dict(use_bdaddr=True))
             if self.device is None:
                 logger.error(f"could not find device with address {mac}")
                 return None
@@ -114,22 +188,37 @@ class Myo:
             logger.error("the mac address may be invalid", e)
             return None
 
+        if cache is not None:
+            cache.put(self.device)
         return self
 
     @classmethod
-    async def with_uuid(cls):
+    async def with_uuid(cls, backend=None, cache=None, timeout=10.0):
+        """
+        <> the most recently seen device from the cache, otherwise the first one
+           advertising the Myo service; see with_mac for cache
+        """
+
         def match_myo_uuid(_: BLEDevice, adv: AdvertisementData):
             if str(GATTProfile.MYO_SERVICE).lower() in adv.service_uuids:
                 return True
             return False
 
         self = cls()
+        cache = _cache_for(backend, cache)
+        if cache is not None and cache.latest() is not None:
+            self._device = cache.latest()
+            self.cached = True
+            return self
         # scan the device
-        self._device = await BleakScanner.find_device_by_filter(match_myo_uuid, cb=dict(use_bdaddr=True))
+        scanner = backend or shared_scanner()
+        self._device = await scanner.find_device_by_filter(match_myo_uuid, timeout=timeout, cb=dict(use_bdaddr=True))
         if self.device is None:
             logger.error(f"could not find device with service UUID {GATTProfile.MYO_SERVICE}")
             return None
 
+        if cache is not None:
+            cache.put(self.device)
         return self
 
     async def battery_level(self, client: BleakClient):
@@ -142,8 +231,12 @@ class Myo:
     async def command(self, client: BleakClient, cmd: Command):
         """
         Command Characteristic
+            - client: a BleakClient, or the myo.control.CommandQueue of a connection
         """
-        await client.write_gatt_char(Handle.COMMAND.value, cmd.data, True)
+        if isinstance(client, CommandQueue):
+            await client.send(cmd)
+        else:
+            await client.write_gatt_char(Handle.COMMAND.value, encode(cmd), True)
 
     async def deep_sleep(self, client: BleakClient):
         """
@@ -229,58 +322,177 @@ class Myo:
 
 
 class MyoClient:
-    def __init__(self, aggregate_all=False, aggregate_emg=False):
+    def __init__(
+        self,
+        aggregate_all=False,
+        aggregate_emg=False,
+        aggregate_tolerance=0.01,
+        aggregate_missing=MissingPolicy.DROP,
+        backend=None,
+        fast_start=False,
+        sequence_emg=False,
+        sequence_fill=False,
+    ):
         self.m = None
+        self.backend = backend  # e.g. myo.replay.ReplayBackend, None for bleak
+        self.clock = getattr(backend, "clock", time.monotonic)  # host timestamps of the packets
         self.aggregate_all = aggregate_all
         self.aggregate_emg = aggregate_emg
+        self.aggregate_tolerance = aggregate_tolerance  # for aggregate_all
+        self.aggregate_missing = aggregate_missing  # for aggregate_all
+        self.sequence_emg = sequence_emg  # raw EMG in order to on_emg_samples, see myo.sequence
+        self.sequence_fill = sequence_fill  # for sequence_emg: NaN rows for the dropped packets
+        self.fast_start = fast_start  # skip the LED/vibration feedback and subscribe concurrently
+        self.startup = {}  # seconds from setup() to the end of "setup", "start" and the "first_sample"
         self.classifier_mode = None
         self.emg_mode = None
         self.imu_mode = None
+        self.sleep_mode = None
+        self.write_without_response = None  # for cosmetic commands, None: if the device advertises it
+        self.commands = None  # myo.control.CommandQueue of the connection
+        self.device_info = None  # myo.info.DeviceInfo, see get_device_info
+        self.metrics = None  # myo.metrics.Metrics while enabled, see enable_metrics
+        self._metrics_logger = None
         self._client = None
-        self.fv_aggregated = None  # for aggregate_all
-        self.imu_aggregated = None  # for aggregate_all
-        self._lock = asyncio.Lock()  # for aggregate_all
+        self.aggregator = Aggregator(tolerance=aggregate_tolerance, missing=aggregate_missing)  # for aggregate_all
+        self.sequencer = None  # for sequence_emg: myo.sequence.EMGSequencer
+        if sequence_emg:
+            from .sequence import EMGSequencer
+
+            self.sequencer = EMGSequencer(fill=sequence_fill)
+        self.emg_stages = []  # for sequence_emg: applied in order to each EMGBlock, see add_emg_stage
+        self.features = None  # for sequence_emg: myo.features.FeatureExtractor feeding on_emg_features
+        self.inference = None  # for features: myo.inference.InferenceStage feeding on_gesture
+        self.imu = None  # myo.imu.IMUProcessor feeding on_imu_frames instead of on_imu_data
+        self.resampler = None  # myo.resample.FrameResampler feeding on_frames
+        self.sinks = []  # myo.recorder.RecordingSink: synced on stop(), closed on disconnect()
+        self.session = None  # myo.session.SessionWriter receiving the raw notifications
+        self._dispatch = {}  # int handle -> (decoder, callback), see _build_dispatch
+        self._streams = {}  # int handle -> [StreamBuffer], see stream
+        self._streaming = False  # between start() and stop()
+        self._notifications = 0
+        self._supervisor = None  # see supervise
+        self._dropped = asyncio.Event()
+        self._gap = None  # a Gap waiting for the first notification after a reconnect
+        self._t_setup = None
+        self._awaiting_first_sample = False
 
     @classmethod
-    async def with_device(cls, mac=None, aggregate_all=False, aggregate_emg=False):
-        self = cls(aggregate_all=aggregate_all, aggregate_emg=aggregate_emg)
-        while self.m is None:
+    async def with_device(
+        cls,
+        mac=None,
+        aggregate_all=False,
+        aggregate_emg=False,
+        aggregate_tolerance=0.01,
+        aggregate_missing=MissingPolicy.DROP,
+        backend=None,
+        fast_start=False,
+        sequence_emg=False,
+        sequence_fill=False,
+        cache=None,
+        scan_timeout=10.0,
+        retry_delay=0.5,
+        max_retry_delay=8.0,
+    ):
+        """
+        <> find (see Myo.with_mac/with_uuid for cache) and connect to a device
+           failed scans are retried after retry_delay seconds, doubling up to max_retry_delay;
+           if a cached device cannot be connected, it is forgotten and scanned for
+        """
+        self = cls(
+            aggregate_all=aggregate_all,
+            aggregate_emg=aggregate_emg,
+            aggregate_tolerance=aggregate_tolerance,
+            aggregate_missing=aggregate_missing,
+            backend=backend,
+            fast_start=fast_start,
+            sequence_emg=sequence_emg,
+            sequence_fill=sequence_fill,
+        )
+        await self._find(mac, backend, cache, scan_timeout, retry_delay, max_retry_delay)
+        try:
+            await self.connect()
+        except Exception as e:
+            if not self.m.cached:
+                raise
+            logger.info(f"cached device {self.device.address} is not reachable, scanning: {e}")
+            _cache_for(backend, cache).forget(self.device.address)
+            await self._find(mac, backend, cache, scan_timeout, retry_delay, max_retry_delay)
+            await self.connect()
+        return self
+
+    async def _find(self, mac, backend, cache, timeout, retry_delay, max_retry_delay):
+        self.m = None
+        delay = retry_delay
+        while True:
             if mac and mac != "":
-                self.m = await Myo.with_mac(mac)
+                self.m = await Myo.with_mac(mac, backend=backend, cache=cache, timeout=timeout)
             else:
-                self.m = await Myo.with_uuid()
-
-        await self.connect()
-        return self
+                self.m = await Myo.with_uuid(backend=backend, cache=cache, timeout=timeout)
+            if self.m is not None:
+                return
+            logger.info(f"scanning again in {delay:.1f}s")
+            await asyncio.sleep(delay)
+            delay = min(2 * delay, max_retry_delay)
 
     @property
     def device(self):
         return self.m.device
 
+    def add_emg_stage(self, stage):
+        """
+        <> process the EMGBlocks of sequence_emg with stage before on_emg_samples,
+           e.g. myo.filters.EMGFilterBank; a stage has process(block) -> EMGBlock and reset()
+        """
+        self.emg_stages.append(stage)
+        return stage
+
+    async def add_calibrator(self, mode="mvc", directory=None) -> Calibrator:
+        """
+        <> add a myo.calibration.Calibrator stage for this band, normalizing with the profile
+           saved for its serial number (get_device_info) in directory if there is one
+           (None: myo.calibration.DEFAULT_PROFILE_DIR)
+        """
+        from .calibration import DEFAULT_PROFILE_DIR, Calibrator, load_profile
+
+        if directory is None:
+            directory = DEFAULT_PROFILE_DIR
+        serial = (await self.get_device_info()).serial_number
+        profile = load_profile(serial, "emg", directory)
+        if profile is None:
+            logger.info(f"{self.device.name}: no calibration profile for {serial}")
+        return self.add_emg_stage(Calibrator(serial, mode=mode, profile=profile))
+
     async def battery_level(self):
         """
         Battery Level Characteristic
         """
-        return self.m.battery_level(self._client)
+        return await self.m.battery_level(self._client)
 
     async def connect(self):
         """
         <> connect the client to the myo device
         """
-        self._client = BleakClient(self.device)
+        if self.backend is None:
+            # a device known only from the cache file is connected to by address
+            device = self.device.address if isinstance(self.device, CachedDevice) else self.device
+            self._client = BleakClient(device, disconnected_callback=self._on_disconnected)
+        else:
+            self._client = self.backend.client(self.device, disconnected_callback=self._on_disconnected)
         if self._client is None:
             logger.error("connection failed")
             return None
 
         # connect to the device
         await self._client.connect()
+        self.commands = CommandQueue(self._client, without_response=self.write_without_response)
         logger.info(f"connected to {self.device.name}: {self.device.address}")
 
     async def deep_sleep(self):
         """
         Deep Sleep Command
         """
-        await self.m.deep_sleep(self._client)
+        await self.m.deep_sleep(self.commands)
 
     async def disconnect(self):
         """
@@ -289,34 +501,124 @@ class MyoClient:
         if self._client is None:
             logger.error("connection is already closed")
 
+        if self._metrics_logger is not None:
+            self._metrics_logger.cancel()
+            self._metrics_logger = None
+
+        # an intended disconnect is not a drop-out
+        if self._supervisor is not None:
+            self._supervisor.cancel()
+            self._supervisor = None
+
+        # end the streams and recordings
+        for buffers in list(self._streams.values()):
+            for buf in buffers:
+                buf.close()
+        for sink in self.sinks:
+            await asyncio.to_thread(sink.close)
+        if self.session is not None:
+            await asyncio.to_thread(self.session.close)
+            self.session = None
+
+        # let the queued commands (e.g. the last LED color) go out first
+        if self.commands is not None:
+            try:
+                await asyncio.wait_for(self.commands.join(), 1.0)
+            except asyncio.TimeoutError:
+                logger.warning("commands still queued at disconnect")
+            await self.commands.close()
+            self.commands = None
+
         # disconnect from the device
         await self._client.disconnect()
         self._client = None
         logger.info(f"disconnected from {self.device.name}")
 
+    def enable_metrics(self, log_interval=None, clock=None) -> Metrics:
+        """
+        <> start collecting per-handle metrics (see metrics_snapshot), logged every
+           log_interval seconds if given; while disabled the notification path is untouched
+           clock: the time source of the metrics, None for time.perf_counter
+        """
+        if self.metrics is None:
+            self.metrics = Metrics() if clock is None else Metrics(clock)
+            self._dispatch = {h: self._dispatch_entry(Handle(h)) for h in self._dispatch}
+        if log_interval and self._metrics_logger is None:
+            self._metrics_logger = asyncio.create_task(self._log_metrics(log_interval))
+        return self.metrics
+
+    def disable_metrics(self):
+        if self._metrics_logger is not None:
+            self._metrics_logger.cancel()
+            self._metrics_logger = None
+        if self.metrics is not None:
+            self.metrics = None
+            self._dispatch = {h: self._dispatch_entry(Handle(h)) for h in self._dispatch}
+
+    def metrics_snapshot(self) -> dict:
+        """
+        <> handles: packets, rate, inter-arrival interval/jitter and callback time histogram per Handle
+           streams: depth, received and dropped per stream buffer
+           commands: commands waiting in the command queue
+           aggregator: Aggregator.stats() with aggregate_all
+           sequencer: EMGSequencer.stats() with sequence_emg
+        """
+        buffers = {id(b): b for bs in self._streams.values() for b in bs}.values()
+        snapshot = {
+            "handles": self.metrics.snapshot() if self.metrics is not None else {},
+            "streams": [
+                {"depth": len(b), "received": b.received, "dropped": b.dropped}
+                for b in buffers
+                if isinstance(b, StreamBuffer)
+            ],
+            "commands": len(self.commands) if self.commands is not None else 0,
+        }
+        if self.aggregate_all:
+            snapshot["aggregator"] = self.aggregator.stats()
+        if self.sequence_emg:
+            snapshot["sequencer"] = self.sequencer.stats()
+        return snapshot
+
+    async def _log_metrics(self, interval):
+        while True:
+            await asyncio.sleep(interval)
+            logger.info(f"{self.device.name} metrics: {summary(self.metrics_snapshot())}")
+
+    async def get_device_info(self, refresh=False) -> DeviceInfo:
+        """
+        <> manufacturer, firmware info/version and battery level; the static values
+           are read once per device and process (refresh=True reads them again)
+        """
+        self.device_info = await read_device_info(self._client, self.device.address, refresh=refresh)
+        return self.device_info
+
     async def get_services(self, indent=1) -> str:
         """
-        <> fetch available services as dict
+        <> fetch available services as a JSON string
+           the device information characteristics are not read again: their values come from
+           get_device_info, and that DeviceInfo is left in self.device_info for the caller
         """
-        sd = {}
+        values = (await self.get_device_info()).values()
+        services = []
         for service in self._client.services:  # BleakGATTServiceCollection
             try:
                 service_name = Handle(service.handle).name
             except Exception as e:
                 logger.debug("unknown handle: {}", e)
                 continue
+            services.append((service, service_name))
 
-            chars = {}
-            for char in service.characteristics:  # List[BleakGATTCharacteristic]
-                cd = await gatt_char_to_dict(self._client, char)
-                if cd:
-                    chars[hex(char.handle)] = cd
+        # any other readable characteristic is read concurrently
+        chars = [char for service, _ in services for char in service.characteristics]
+        cds = await asyncio.gather(*(gatt_char_to_dict(self._client, c, values.get(c.handle)) for c in chars))
+        cds = {c.handle: cd for c, cd in zip(chars, cds)}
 
-            # end char
+        sd = {}
+        for service, service_name in services:
             sd[hex(service.handle)] = {
                 "name": service_name,
                 "uuid": service.uuid,
-                "chars": chars,
+                "chars": {hex(c.handle): cds[c.handle] for c in service.characteristics if cds[c.handle]},
             }
         # end service
         return json.dumps({"services": sd}, indent=indent)
@@ -327,30 +629,23 @@ class MyoClient:
         args:
             - color: myo.constants.RGB_*
         """
-        await self.m.led(self._client, color, color)
+        await self.m.led(self.commands, color, color)
 
     async def on_classifier_event(self, ce: ClassifierEvent):
         raise NotImplementedError()
 
     async def on_data(self, data):
         """
-        <> for on_aggregated_data: data is either FVData or IMUData
+        <> for on_aggregated_data: data is FVData, IMUData or EMGData
+           stamped with self.clock() and joined by self.aggregator
         """
-        async with self._lock:
-            if isinstance(data, FVData):
-                self.fv_aggregated = data
-            elif isinstance(data, IMUData):
-                self.imu_aggregated = data
-            # trigger on_aggregated_data when both FVData and IMUData are ready
-            if all(d is not None for d in (self.fv_aggregated, self.imu_aggregated)):
-                await self.on_aggregated_data(AggregatedData(self.fv_aggregated, self.imu_aggregated))
-                self.fv_aggregated = None
-                self.imu_aggregated = None
+        for ad in self.aggregator.push(self.clock(), data):
+            await self.on_aggregated_data(ad)
 
     async def on_aggregated_data(self, ad: AggregatedData):
         """
-        <> on_aggregated_data is invoked when both FVData and IMUData are ready
-           it doesn't support EMGData since it is collected at different interval (200HZ instead of 50Hz)
+        <> on_aggregated_data is invoked once per IMU tick with the FVData nearest in time,
+           or with the window of the last 4 raw EMG samples in EMGMode.SEND_EMG/SEND_RAW
         """
         raise NotImplementedError()
 
@@ -363,48 +658,295 @@ class MyoClient:
         """
         raise NotImplementedError()
 
+    async def on_emg_features(self, windows: FeatureWindows):
+        """
+        <> for sequence_emg with features: the windows completed by the latest samples
+           (optional with inference)
+        """
+        raise NotImplementedError()
+
+    async def on_emg_samples(self, block: EMGBlock):
+        """
+        <> for sequence_emg: the raw EMG samples in order, see myo.sequence.EMGSequencer
+           (after the emg_stages); optional when features or resampler is set
+        """
+        raise NotImplementedError()
+
     async def on_fv_data(self, fvd: FVData):
         raise NotImplementedError()
 
+    async def on_frames(self, block: FrameBlock):
+        """
+        <> for resampler: the EMG (with sequence_emg), FV and IMU on one fixed-rate clock,
+           see myo.resample.FrameResampler; optional on_emg_samples, on_fv_data and on_imu_data
+        """
+        raise NotImplementedError()
+
+    async def on_gap(self, gap: Gap):
+        """
+        <> called after a supervised reconnect with the time that has no data, see supervise
+        """
+        pass
+
+    async def on_gesture(self, gesture: Gesture):
+        """
+        <> for inference: a decision on a feature window, see myo.inference.InferenceStage
+        """
+        raise NotImplementedError()
+
     async def on_imu_data(self, imu: IMUData):
         raise NotImplementedError()
 
+    async def on_imu_frames(self, frames: IMUFrames):
+        """
+        <> for imu: the orientation, linear acceleration and angular deltas of each IMU packet,
+           see myo.imu.IMUProcessor
+        """
+        raise NotImplementedError()
+
     async def on_motion_event(self, me: MotionEvent):
         raise NotImplementedError()
 
-    async def notify_callback(self, sender: BleakGATTCharacteristic, data: bytearray):
+    def _active_handles(self):
         """
-        <> invoke the on_* callbacks
+        <> the notify/indicate handles for the current modes
         """
+        handles = []
+        if self.emg_mode in [EMGMode.SEND_EMG, EMGMode.SEND_RAW]:
+            handles += [Handle.EMG0_DATA, Handle.EMG1_DATA, Handle.EMG2_DATA, Handle.EMG3_DATA]
+        elif self.emg_mode == EMGMode.SEND_FILT:
+            handles.append(Handle.FV_DATA)
+        if self.imu_mode not in [IMUMode.NONE, IMUMode.SEND_EVENTS]:
+            handles.append(Handle.IMU_DATA)
+        if self.imu_mode in [IMUMode.SEND_EVENTS, IMUMode.SEND_ALL]:
+            handles.append(Handle.MOTION_EVENT)
+        if self.classifier_mode == ClassifierMode.ENABLED:
+            handles.append(Handle.CLASSIFIER_EVENT)
+        return handles
+
+    def _build_dispatch(self):
+        """
+        <> build the dispatch table used by notify_callback from the active modes
+        """
+        self._dispatch = {h.value: self._dispatch_entry(h) for h in self._active_handles()}
+
+    def _dispatch_entry(self, handle: Handle):
+        """
+        <> the (decoder, callback) pair for a notify/indicate handle
+        """
+        entry = self._hook_entry(handle)
+        if entry is None or self.metrics is None:
+            return entry
+        decoder, callback = entry
+        return decoder, self._with_metrics(handle, callback)
 
-        handle = Handle(sender.handle)
-        logger.debug(f"notify_callback ({handle}): {data}")
+    def _hook_entry(self, handle: Handle):
+        """
+        <> the (decoder, on_* callback) pair, feeding the streams of handle
+        """
         if handle == Handle.CLASSIFIER_EVENT:
-            await self.on_classifier_event(ClassifierEvent(data))
+            return ClassifierEvent, self._with_streams(handle, self.on_classifier_event)
         elif handle == Handle.FV_DATA:
             if self.aggregate_all:
-                await self.on_data(FVData(data))
-            else:
-                await self.on_fv_data(FVData(data))
+                return FVData, self._with_streams(handle, self.on_data)
+            return FVData, self._with_streams(handle, self._resampled("fv", self.on_fv_data))
         elif handle == Handle.IMU_DATA:
             if self.aggregate_all:
-                await self.on_data(IMUData(data))
-            else:
-                await self.on_imu_data(IMUData(data))
+                return IMUData, self._with_streams(handle, self.on_data)
+            if self.imu is not None:
+                from .batch import decode_imu
+
+                # streams of "imu" receive the (1, 10) rows of myo.batch.decode_imu
+                return decode_imu, self._with_streams(handle, self._resampled("imu", self.on_imu_processed))
+            return IMUData, self._with_streams(handle, self._resampled("imu", self.on_imu_data))
         elif handle == Handle.MOTION_EVENT:
-            await self.on_motion_event(MotionEvent(data))
+            return MotionEvent, self._with_streams(handle, self.on_motion_event)
         elif handle in [
             Handle.EMG0_DATA,
             Handle.EMG1_DATA,
             Handle.EMG2_DATA,
             Handle.EMG3_DATA,
         ]:
-            emg = EMGData(data)
-            if self.aggregate_emg:
-                await self.on_emg_data_aggregated(EMGDataSingle(emg.sample1))
-                await self.on_emg_data_aggregated(EMGDataSingle(emg.sample2))
+            if self.aggregate_all:
+                callback = self.on_data
+            elif self.sequence_emg:
+                callback = self._sequenced(handle)
+            elif self.aggregate_emg:
+                callback = self.on_emg_data_split
             else:
-                await self.on_emg_data(emg)
+                callback = self.on_emg_data
+            return EMGData, self._with_streams(handle, callback)
+        return None
+
+    def _sequenced(self, handle: Handle):
+        """
+        <> for sequence_emg: the callback passing the packets of handle through self.sequencer
+        """
+
+        async def on_emg_sequenced(emg: EMGData):
+            block = self.sequencer.push(self.clock(), handle, emg)
+            if len(block):
+                await self._emg_samples(block)
+
+        return on_emg_sequenced
+
+    def _resampled(self, kind, callback):
+        """
+        <> for resampler: wrap callback to also push the data of kind into self.resampler
+        """
+        if not self._resamples(kind):
+            return callback
+        from .resample import values
+
+        if not self._is_needed(callback):
+            callback = None
+
+        async def resample(data):
+            await self._push_frames(kind, values(data), self.clock())
+            if callback is not None:
+                await callback(data)
+
+        resample.__name__ = f"on_{kind}_resampled"
+        return resample
+
+    async def _push_frames(self, kind, x, t, index=None):
+        block = self.resampler.push(kind, x, t, index)
+        if len(block):
+            await self.on_frames(block)
+
+    def _is_needed(self, callback):
+        """
+        <> whether an on_* callback has to run: it feeds a configured stage (features,
+           resampler), or the user hook behind it is implemented
+        """
+        name = callback.__name__
+        if name == "on_emg_sequenced" and (self.features is not None or self._resamples("emg")):
+            return True
+        if name in ("on_fv_resampled", "on_imu_resampled"):
+            return True
+        return self._is_overridden(callback)
+
+    def _resamples(self, kind) -> bool:
+        return self.resampler is not None and kind in self.resampler.streams
+
+    def _is_overridden(self, callback):
+        """
+        <> whether the user hook behind an on_* callback is implemented by a subclass
+        """
+        name = _HOOKS.get(callback.__name__, callback.__name__)
+        return getattr(type(self), name) is not getattr(MyoClient, name)
+
+    def _with_streams(self, handle: Handle, callback):
+        """
+        <> wrap callback to also feed the stream buffers subscribed to handle
+        """
+        buffers = self._streams.get(handle.value)
+        if not buffers:
+            return callback
+        hook = callback.__name__
+        if not self._is_needed(callback):
+            callback = None
+
+        async def feed_streams(data):
+            item = (handle, self.clock(), data)
+            for buf in buffers:
+                if buf.policy == OverflowPolicy.BLOCK:
+                    await buf.put(item)
+                else:
+                    buf.put_nowait(item)
+            if callback is not None:
+                await callback(data)
+
+        feed_streams.__name__ = hook
+        return feed_streams
+
+    def _with_metrics(self, handle: Handle, callback):
+        """
+        <> wrap callback to record the arrival and the time spent in it
+        """
+        m = self.metrics.handle(handle, callback.__name__)
+        perf_counter = self.metrics.clock
+
+        async def measured(data):
+            t = perf_counter()
+            m.arrived(t)
+            await callback(data)
+            m.callback.record(perf_counter() - t)
+
+        return measured
+
+    def _refresh_dispatch(self, handles):
+        """
+        <> rebuild the dispatch entries of handles that are already subscribed
+        """
+        for h in handles:
+            if h.value in self._dispatch:
+                self._dispatch[h.value] = self._dispatch_entry(h)
+
+    def _remove_stream(self, stream: MyoStream):
+        for h in stream.handles:
+            buffers = self._streams.get(h.value, [])
+            if stream.buffer in buffers:
+                buffers.remove(stream.buffer)
+            if not buffers:
+                self._streams.pop(h.value, None)
+        self._refresh_dispatch(stream.handles)
+
+    async def notify_callback(self, sender: BleakGATTCharacteristic, data: bytearray):
+        """
+        <> invoke the on_* callbacks
+        """
+        handle = sender.handle
+        try:
+            decoder, callback = self._dispatch[handle]
+        except KeyError:
+            # not subscribed via start(), e.g. a manual start_notify
+            try:
+                entry = self._dispatch_entry(Handle(handle))
+            except ValueError:
+                logger.debug("notify_callback: ignoring unknown handle %s", handle)
+                return
+            if entry is None:
+                return
+            decoder, callback = self._dispatch[handle] = entry
+        self._notifications += 1
+        if self._awaiting_first_sample:
+            self._awaiting_first_sample = False
+            self._mark_startup("first_sample")
+        if self._gap is not None:
+            await self._end_gap()
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("notify_callback (%s): %s", Handle(handle), data)
+        if self.session is not None:
+            self.session.write(self.clock(), handle, data)
+        await callback(decoder(data))
+
+    async def on_emg_data_split(self, emg: EMGData):
+        """
+        <> for aggregate_emg: split EMGData into two EMGDataSingle
+        """
+        await self.on_emg_data_aggregated(EMGDataSingle(emg.sample1))
+        await self.on_emg_data_aggregated(EMGDataSingle(emg.sample2))
+
+    async def on_imu_processed(self, x):
+        """
+        <> for imu: pass a decoded IMU packet through self.imu
+        """
+        await self.on_imu_frames(self.imu.process(x, [self.clock()]))
+
+    async def record_session(self, path) -> SessionWriter:
+        """
+        <> record the raw notifications into a myo.session file (call after setup())
+        """
+        fw = (await self.get_device_info()).firmware_version
+        header = SessionHeader(
+            firmware=(fw.major, fw.minor, fw.patch, fw.hardware_rev.value),
+            emg_mode=self.emg_mode,
+            imu_mode=self.imu_mode,
+            classifier_mode=self.classifier_mode,
+        )
+        self.session = SessionWriter(path, header)
+        return self.session
 
     async def set_mode(self, classifier_mode: ClassifierMode, emg_mode: EMGMode, imu_mode: IMUMode):
         """
@@ -412,17 +954,21 @@ class MyoClient:
             - configures EMG, IMU, and Classifier modes
         """
         await self.m.set_mode(
-            client=self._client,
+            client=self.commands,
             classifier_mode=classifier_mode,
             emg_mode=emg_mode,
             imu_mode=imu_mode,
         )
+        self.classifier_mode = classifier_mode
+        self.emg_mode = emg_mode
+        self.imu_mode = imu_mode
 
     async def set_sleep_mode(self, sleep_mode):
         """
         Set Sleep Mode Command
         """
-        await self.m.set_sleep_mode(self._client, sleep_mode)
+        await self.m.set_sleep_mode(self.commands, sleep_mode)
+        self.sleep_mode = sleep_mode
 
     async def setup(
         self,
@@ -432,7 +978,21 @@ class MyoClient:
     ):
         """
         <> setup the myo device
+           with fast_start, only the sleep mode and set_mode commands are sent (in that order)
+           while the battery level is read alongside
         """
+        self.startup = {}
+        self._t_setup = time.perf_counter()
+        if self.fast_start:
+            logger.info(f"setting up the myo: {self.device.name}")
+            battery, _ = await asyncio.gather(
+                self.m.battery_level(self._client),
+                self._setup_modes(classifier_mode, emg_mode, imu_mode),
+            )
+            logger.info(f"remaining battery: {battery} %")
+            self._mark_startup("setup")
+            return
+
         await self.led(RGB_ORANGE)
         logger.info(f"setting up the myo: {self.device.name}")
         battery = await self.m.battery_level(self._client)
@@ -441,14 +1001,26 @@ class MyoClient:
         await self.vibrate(VibrationType.SHORT)
         await self.vibrate(VibrationType.SHORT)
         await self.vibrate(VibrationType.SHORT)
+        await self._setup_modes(classifier_mode, emg_mode, imu_mode)
+        await self.led(RGB_PINK)
+        self._mark_startup("setup")
+
+    async def _setup_modes(self, classifier_mode, emg_mode, imu_mode):
         # never sleep
         await self.set_sleep_mode(SleepMode.NEVER_SLEEP)
         # setup modes
         if self.aggregate_all:
-            # enforce the modes when aggregate_all
+            # enforce the modes when aggregate_all, raw EMG replaces FV if requested
             self.classifier_mode = ClassifierMode.DISABLED
-            self.emg_mode = EMGMode.SEND_FILT
+            raw_emg = emg_mode in [EMGMode.SEND_EMG, EMGMode.SEND_RAW]
+            self.emg_mode = emg_mode if raw_emg else EMGMode.SEND_FILT
             self.imu_mode = IMUMode.SEND_DATA
+            self.aggregator = Aggregator(
+                fv=not raw_emg,
+                emg=raw_emg,
+                tolerance=self.aggregate_tolerance,
+                missing=self.aggregate_missing,
+            )
         else:
             self.classifier_mode = classifier_mode
             self.emg_mode = emg_mode
@@ -459,7 +1031,6 @@ class MyoClient:
             emg_mode=self.emg_mode,
             imu_mode=self.imu_mode,
         )
-        await self.led(RGB_PINK)
 
     async def sleep(self):
         """
@@ -478,24 +1049,31 @@ class MyoClient:
         <> start notify/indicate
         """
         logger.info(f"start notifying from {self.device.name}")
-        # vibrate short
-        await self.vibrate(VibrationType.SHORT)
+        if self._t_setup is None:
+            self._t_setup = time.perf_counter()
+        self._awaiting_first_sample = True
+        if not self.fast_start:
+            # vibrate short
+            await self.vibrate(VibrationType.SHORT)
+        if self.sequence_emg:
+            # a new series, the samples are numbered from the first packet
+            self.sequencer.reset()
+            for stage in self.emg_stages:
+                stage.reset()
+            if self.features is not None:
+                self.features.reset()
+        if self.imu is not None:
+            self.imu.reset()
+        if self.resampler is not None:
+            self.resampler.reset()
         # subscribe for notify/indicate
-        if self.emg_mode in [EMGMode.SEND_EMG, EMGMode.SEND_RAW]:
-            await self.start_notify(Handle.EMG0_DATA.value, self.notify_callback)
-            await self.start_notify(Handle.EMG1_DATA.value, self.notify_callback)
-            await self.start_notify(Handle.EMG2_DATA.value, self.notify_callback)
-            await self.start_notify(Handle.EMG3_DATA.value, self.notify_callback)
-        elif self.emg_mode == EMGMode.SEND_FILT:
-            await self.start_notify(Handle.FV_DATA.value, self.notify_callback)
-        if self.imu_mode not in [IMUMode.NONE, IMUMode.SEND_EVENTS]:
-            await self.start_notify(Handle.IMU_DATA.value, self.notify_callback)
-        if self.imu_mode in [IMUMode.SEND_EVENTS, IMUMode.SEND_ALL]:
-            await self.start_notify(Handle.MOTION_EVENT.value, self.notify_callback)
-        if self.classifier_mode == ClassifierMode.ENABLED:
-            await self.start_notify(Handle.CLASSIFIER_EVENT.value, self.notify_callback)
+        self._build_dispatch()
+        await self._subscribe(list(self._dispatch))
+        self._streaming = True
+        self._mark_startup("start")
 
-        await self.led(RGB_CYAN)
+        if not self.fast_start:
+            await self.led(RGB_CYAN)
 
     async def start_notify(self, handle, callback):
         await self._client.start_notify(handle, callback)
@@ -505,19 +1083,32 @@ class MyoClient:
         <> stop notify/indicate
         """
         # unsubscribe from notify/indicate
-        if self.emg_mode in [EMGMode.SEND_EMG, EMGMode.SEND_RAW]:
-            await self.stop_notify(Handle.EMG0_DATA.value)
-            await self.stop_notify(Handle.EMG1_DATA.value)
-            await self.stop_notify(Handle.EMG2_DATA.value)
-            await self.stop_notify(Handle.EMG3_DATA.value)
-        elif self.emg_mode == EMGMode.SEND_FILT:
-            await self.stop_notify(Handle.FV_DATA.value)
-        if self.imu_mode not in [IMUMode.NONE, IMUMode.SEND_EVENTS]:
-            await self.stop_notify(Handle.IMU_DATA.value)
-        if self.imu_mode in [IMUMode.SEND_EVENTS, IMUMode.SEND_ALL]:
-            await self.stop_notify(Handle.MOTION_EVENT.value)
-        if self.classifier_mode == ClassifierMode.ENABLED:
-            await self.stop_notify(Handle.CLASSIFIER_EVENT.value)
+        self._streaming = False
+        self._awaiting_first_sample = False
+        if self.fast_start:
+            await asyncio.gather(*(self.stop_notify(h) for h in list(self._dispatch)))
+        else:
+            # a notification arriving meanwhile may add a handle to the dispatch table
+            for handle in list(self._dispatch):
+                await self.stop_notify(handle)
+        if self.aggregate_all:
+            for ad in self.aggregator.flush():
+                await self.on_aggregated_data(ad)
+        await self._flush_sequencer()
+        if self.inference is not None:
+            await self.inference.flush()
+        if self.resampler is not None:
+            block = self.resampler.flush()
+            if len(block):
+                await self.on_frames(block)
+        for sink in self.sinks:
+            await asyncio.to_thread(sink.sync)
+        if self.session is not None:
+            await asyncio.to_thread(self.session.sync)
+        self._t_setup = None
+        if self.fast_start:
+            logger.info(f"stopped notification from {self.device.name}")
+            return
 
         # vibrate short*2
         try:
@@ -532,32 +1123,230 @@ class MyoClient:
     async def stop_notify(self, handle):
         await self._client.stop_notify(handle)
 
+    async def _flush_sequencer(self):
+        if self.sequence_emg and not self.aggregate_all:
+            block = self.sequencer.flush()
+            if len(block):
+                await self._emg_samples(block)
+
+    async def _emg_samples(self, block: EMGBlock):
+        started = time.perf_counter()
+        for stage in self.emg_stages:
+            block = stage.process(block)
+        resampled = self._resamples("emg")
+        if resampled:
+            await self._push_frames("emg", block.emg, block.t, block.index)
+        if (self.features is None and not resampled) or self._is_overridden(self.on_emg_samples):
+            await self.on_emg_samples(block)
+        if self.features is None:
+            return
+        windows = self.features.process(block)
+        if not len(windows):
+            return
+        if self.inference is None or self._is_overridden(self.on_emg_features):
+            await self.on_emg_features(windows)
+        if self.inference is not None:
+            self.inference.submit(self, windows, started)
+
+    async def _subscribe(self, handles):
+        """
+        <> start_notify on handles, all at once with fast_start
+        """
+        if self.fast_start:
+            await asyncio.gather(*(self.start_notify(h, self.notify_callback) for h in handles))
+        else:
+            for handle in handles:
+                await self.start_notify(handle, self.notify_callback)
+
+    def _mark_startup(self, step):
+        if self._t_setup is not None:
+            self.startup[step] = time.perf_counter() - self._t_setup
+
+    @property
+    def time_to_first_sample(self):
+        """
+        <> seconds from setup() (or start() without it) to the first notification, None until then
+        """
+        return self.startup.get("first_sample")
+
+    def stream(
+        self,
+        kinds=("emg", "fv", "imu"),
+        batch_size=32,
+        max_latency=0.05,
+        maxsize=1024,
+        policy=OverflowPolicy.DROP_OLDEST,
+        buffer=None,
+    ) -> MyoStream:
+        """
+        <> subscribe to the decoded notifications of kinds (see myo.stream.STREAM_KINDS)
+           async for batch in client.stream(kinds=("fv", "imu")):
+               for handle, t, data in batch: ...
+           batches hold up to batch_size items and wait at most max_latency seconds to fill;
+           overridden on_* callbacks and the configured stages (sequence_emg, features,
+           resampler) keep running alongside the stream;
+           buffer replaces the StreamBuffer, e.g. a myo.stream.TaggedBuffer shared by several clients
+        """
+        for k in kinds:
+            if k not in STREAM_KINDS:
+                raise ValueError(f"unknown stream kind: {k}")
+        handles = [h for k in kinds for h in STREAM_KINDS[k]]
+        if buffer is None:
+            buffer = StreamBuffer(maxsize, policy)
+        s = MyoStream(self, handles, batch_size, max_latency, buffer)
+        for h in handles:
+            self._streams.setdefault(h.value, []).append(s.buffer)
+        self._refresh_dispatch(handles)
+        return s
+
+    def supervise(self, stall_timeout=2.0, retry_delay=0.5, max_retry_delay=8.0, rescan_after=3):
+        """
+        <> reconnect automatically when the device disconnects, or sends nothing for
+           stall_timeout seconds while started; the modes, sleep mode and subscriptions
+           are restored, and the time without data is reported as a Gap to on_gap(),
+           to the streams as a (None, t, Gap) item and to the sinks as a "gap" record
+           reconnects are retried with exponential backoff, scanning for the device
+           again after every rescan_after failed attempts
+        """
+        if self._supervisor is None:
+            self._supervisor = asyncio.create_task(
+                self._supervise(stall_timeout, retry_delay, max_retry_delay, rescan_after)
+            )
+        return self._supervisor
+
+    def _on_disconnected(self, client):
+        if client is self._client:
+            self._dropped.set()
+
+    async def _supervise(self, stall_timeout, retry_delay, max_retry_delay, rescan_after):
+        seen = self._notifications
+        while True:
+            try:
+                await asyncio.wait_for(self._dropped.wait(), stall_timeout)
+                start, reason = self.clock(), "disconnected"
+            except asyncio.TimeoutError:
+                if not self._streaming or self._notifications != seen:
+                    seen = self._notifications
+                    continue
+                start, reason = self.clock() - stall_timeout, "stalled"
+            logger.warning(f"{self.device.address} {reason}, reconnecting")
+            if self._gap is None:
+                # closed by the next notification; a drop before that extends it
+                self._gap = Gap(start, None, reason)
+            await self._reconnect(retry_delay, max_retry_delay, rescan_after)
+            seen = self._notifications
+
+    async def _reconnect(self, retry_delay, max_retry_delay, rescan_after):
+        delay = retry_delay
+        attempts = 0
+        while True:
+            old, self._client = self._client, None
+            if self.commands is not None:
+                await self.commands.close()
+                self.commands = None
+            if old is not None:
+                try:
+                    await old.disconnect()
+                except Exception:
+                    pass
+            self._dropped.clear()
+            try:
+                await self.connect()
+                await self._resume()
+                logger.info(f"reconnected to {self.device.address}")
+                return
+            except Exception as e:
+                attempts += 1
+                logger.warning(f"reconnect to {self.device.address} failed ({attempts}): {e}")
+            await asyncio.sleep(delay)
+            delay = min(2 * delay, max_retry_delay)
+            if attempts % rescan_after == 0:
+                m = await Myo.with_mac(self.device.address, backend=self.backend, cache=False)
+                if m is not None:
+                    self.m = m
+
+    async def _resume(self):
+        """
+        <> restore the state of the device before the drop-out
+        """
+        if self.sleep_mode is not None:
+            await self.set_sleep_mode(self.sleep_mode)
+        if self.emg_mode is not None:
+            await self.set_mode(
+                classifier_mode=self.classifier_mode,
+                emg_mode=self.emg_mode,
+                imu_mode=self.imu_mode,
+            )
+        if self._streaming:
+            await self._subscribe(list(self._dispatch))
+
+    async def _end_gap(self):
+        gap, self._gap = self._gap, None
+        gap.end = self.clock()
+        if self.aggregate_all:
+            # no frame spans the gap
+            for ad in self.aggregator.flush():
+                await self.on_aggregated_data(ad)
+        # the packets lost in the gap are numbered from the host time, as NaN rows with sequence_fill
+        await self._flush_sequencer()
+        item = (None, gap.end, gap)
+        for buf in {id(b): b for buffers in self._streams.values() for b in buffers}.values():
+            buf.put_marker(item)
+        for sink in self.sinks:
+            sink.write("gap", gap.to_dict())
+        await self.on_gap(gap)
+
     async def unlock(self, unlock_type):
         """
         Unlock Command
         """
-        await self.m.unlock(self._client, unlock_type)
+        await self.m.unlock(self.commands, unlock_type)
 
     async def user_action(self, user_action_type):
         """
         User Action Command
         """
-        await self.m.user_action(self._client, user_action_type)
+        await self.m.user_action(self.commands, user_action_type)
 
     async def vibrate(self, vibration_type):
         """
         Vibrate Command
         """
-        await self.m.vibrate(self._client, vibration_type)
+        await self.m.vibrate(self.commands, vibration_type)
 
     async def vibrate2(self, duration, strength):
         """
         Vibrate2 Command
         """
-        await self.m.vibrate2(self._client, duration, strength)
+        await self.m.vibrate2(self.commands, duration, strength)
 
 
-async def gatt_char_to_dict(client: BleakClient, char: BleakGATTCharacteristic):
+def _cache_for(backend, cache):
+    """
+    <> the DeviceCache used by Myo.with_mac/with_uuid
+    """
+    if cache is False:
+        return None
+    if cache is None:
+        # replayed devices are not worth remembering
+        return default_cache() if backend is None else None
+    return cache
+
+
+# the user hooks behind the callbacks MyoClient implements itself
+_HOOKS = {
+    "on_data": "on_aggregated_data",
+    "on_emg_data_split": "on_emg_data_aggregated",
+    "on_emg_sequenced": "on_emg_samples",
+    "on_imu_processed": "on_imu_frames",
+}
+
+
+async def gatt_char_to_dict(client: BleakClient, char: BleakGATTCharacteristic, value=None):
+    """
+    <> name, uuid, properties and value of a characteristic, value is read unless given
+       (a given falsy value such as battery level 0 is used as is)
+    """
     try:
         char_name = Handle(char.handle).name
     except Exception as e:
@@ -569,8 +1358,7 @@ async def gatt_char_to_dict(client: BleakClient, char: BleakGATTCharacteristic):
         "uuid": char.uuid,
         "properties": ",".join(char.properties),
     }
-    value = None
-    if "read" in char.properties:
+    if value is None and "read" in char.properties:
         blob = await client.read_gatt_char(char.handle)
         if char_name == Handle.MANUFACTURER_NAME_STRING.name:
             value = blob.decode("utf-8")
@@ -583,6 +1371,6 @@ async def gatt_char_to_dict(client: BleakClient, char: BleakGATTCharacteristic):
         else:
             value = binascii.b2a_hex(blob).decode("utf-8")
 
-    if value:
+    if value is not None:
         cd["value"] = value
     return cd
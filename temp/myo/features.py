@@ -0,0 +1,171 @@
+"""
+    myo.features
+    ------------
+    Classic time-domain EMG features (RMS, MAV, WL, ZC, SSC) over sliding windows,
+    streaming (FeatureExtractor) or over a whole recording (extract_features)
+"""
+import numpy as np
+
+from .sequence import EMGBlock
+
+FEATURES = ("rms", "mav", "wl", "zc", "ssc")
+
+# per-sample contributions, summed over the last window - _LAG[k] samples:
+# x^2, |x|, |x_i - x_i-1|, zero crossing at i, slope sign change at i - 1, missing (NaN) sample
+_SQ, _ABS, _WL, _ZC, _SSC, _MISSING = range(6)
+_LAG = np.array([0, 0, 1, 1, 2, 0])
+_KINDS = np.arange(6)
+
+
+def _contributions(x, prev, threshold):
+    """
+    <> (n, channels, 6) contributions of the samples x, prev: the 2 samples before x
+    """
+    missing = np.isnan(x)
+    x = np.where(missing, 0.0, x)
+    ext = np.concatenate([prev, x])
+    d = np.diff(ext, axis=0)  # d[k] = ext[k + 1] - ext[k]
+    c = np.empty(x.shape + (6,))
+    c[..., _SQ] = x * x
+    c[..., _ABS] = np.abs(x)
+    c[..., _WL] = np.abs(d[1:])
+    c[..., _ZC] = (ext[1:-1] * x < 0) & (np.abs(d[1:]) >= threshold)
+    c[..., _SSC] = -d[:-1] * d[1:] > threshold
+    c[..., _MISSING] = missing
+    return c, ext[-2:]
+
+
+def _values(sums, window, features):
+    """
+    <> window sums (..., 6) -> (..., len(features)) feature values
+    """
+    columns = [FEATURES.index(f) for f in features]  # the contribution of each feature
+    scale = np.array([1 / window if f in ("rms", "mav") else 1.0 for f in features])
+    values = sums[..., columns] * scale
+    if "rms" in features:
+        i = features.index("rms")
+        values[..., i] = np.sqrt(np.maximum(values[..., i], 0.0))
+    return values.astype(np.float32)
+
+
+class FeatureWindows:
+    """
+    <> feature values of consecutive windows
+       index: (n,) sample number of the last sample of each window, t: (n,) its host time,
+       features: (n, channels, len(names)) float32, gap: (n,) bool, the window has NaN samples
+    """
+
+    __slots__ = ("index", "t", "features", "gap", "names")
+
+    def __init__(self, index, t, features, gap, names=FEATURES):
+        self.index = index
+        self.t = t
+        self.features = features
+        self.gap = gap
+        self.names = names
+
+    def __len__(self):
+        return len(self.features)
+
+    def __str__(self):
+        return f"FeatureWindows({len(self)} x {self.features.shape[1:]}, {','.join(self.names)})"
+
+
+class FeatureExtractor:
+    """
+    <> RMS, MAV, WL, ZC and SSC of each channel over the last window samples, every hop samples
+
+       each feature is a running sum over the window: a sample adds its contribution
+       and the one leaving the window takes its own back, so a sample costs O(1) whatever
+       the window (the float sums are recomputed from the ring every resync samples).
+       ZC counts the sign changes with |x_i - x_i-1| >= threshold, SSC the turning points with
+       (x_i - x_i-1)(x_i - x_i+1) > threshold; NaN samples count as 0 and mark the window gap.
+       works on any (n, channels) series: raw/filtered EMG blocks or FV values
+    """
+
+    def __init__(self, window=40, hop=10, channels=8, features=FEATURES, threshold=0.0, resync=4096):
+        if not 3 <= window:
+            raise ValueError(f"a window needs at least 3 samples: {window}")
+        unknown = set(features) - set(FEATURES)
+        if unknown:
+            raise ValueError(f"unknown features: {sorted(unknown)}")
+        self.window = window
+        self.hop = hop
+        self.channels = channels
+        self.features = tuple(features)
+        self.threshold = threshold
+        self.resync = resync
+        self.reset()
+
+    def reset(self):
+        self.samples = 0  # samples seen
+        self._ring = np.zeros((self.window, self.channels, 6))  # contributions of sample i at i % window
+        self._sums = np.zeros((self.channels, 6))  # of the window ending at the newest sample
+        self._prev = np.zeros((2, self.channels))
+        self._synced = 0
+
+    def process(self, block):
+        """
+        <> add samples, an EMGBlock (-> FeatureWindows) or an (n, channels) array
+           (-> (n_windows, channels, n_features)), and return the windows they complete
+        """
+        if not isinstance(block, EMGBlock):
+            return self._process(np.asarray(block, dtype=np.float64))[0]
+        first = self.samples
+        features, sums, ends = self._process(block.emg)
+        local = ends - first
+        gap = (sums[:, :, _MISSING] > 0).any(axis=1)
+        return FeatureWindows(block.index[local], block.t[local], features, gap, self.features)
+
+    def _process(self, x):
+        n = len(x)
+        c, self._prev = _contributions(x, self._prev, self.threshold)
+        sums = np.empty((n, self.channels, 6))
+        # in chunks no longer than the shortest window, the leaving contributions are all in the ring
+        step = self.window - _LAG.max()
+        for i in range(0, n, step):
+            self._add(self.samples + i, c[i : i + step], sums[i : i + step])
+        ends = np.arange(self.samples, self.samples + n)
+        self.samples += n
+        if self.samples - self._synced >= self.resync:
+            self._resync()
+        # windows end at window - 1, window - 1 + hop, ...
+        done = (ends >= self.window - 1) & ((ends - self.window + 1) % self.hop == 0)
+        ends, sums = ends[done], sums[done]
+        return _values(sums, self.window, self.features), sums, ends
+
+    def _add(self, start, c, out):
+        positions = np.arange(start, start + len(c))
+        leaving = positions[:, None] - (self.window - _LAG)  # (n, 6)
+        old = self._ring[leaving % self.window, :, _KINDS]  # (n, 6, channels)
+        if start < self.window:
+            # nothing leaves the first window
+            old[leaving < 0] = 0.0
+        np.cumsum(c - old.transpose(0, 2, 1), axis=0, out=out)
+        out += self._sums
+        self._sums = out[-1].copy()
+        self._ring[positions % self.window] = c
+
+    def _resync(self):
+        """
+        <> recompute the sums from the ring, dropping the rounding error of the running sums
+        """
+        age = (self.samples - 1 - np.arange(self.window)) % self.window  # of the contribution in each slot
+        live = (age[:, None] < self.window - _LAG) & (age[:, None] < self.samples)
+        self._sums = np.einsum("wck,wk->ck", self._ring, live.astype(np.float64))
+        self._synced = self.samples
+
+
+def extract_features(x, window=40, hop=10, features=FEATURES, threshold=0.0) -> np.ndarray:
+    """
+    <> the windows of FeatureExtractor(window, hop, features=features, threshold=threshold)
+       over a whole (n, channels) recording at once, (n_windows, channels, n_features)
+    """
+    x = np.asarray(x, dtype=np.float64)
+    c, _ = _contributions(x, np.zeros((2, x.shape[1])), threshold)
+    prefix = np.concatenate([np.zeros((1,) + c.shape[1:]), np.cumsum(c, axis=0)])
+    ends = np.arange(window - 1, len(x), hop)
+    # the sum of contributions ends - (window - lag) + 1 .. ends
+    lo = ends[:, None] - (window - _LAG) + 1  # (n_windows, 6)
+    sums = prefix[ends + 1] - np.take_along_axis(prefix, lo[:, None, :].repeat(x.shape[1], axis=1), axis=0)
+    return _values(sums, window, features)
@@ -0,0 +1,179 @@
+"""
+    myo.filters
+    ------------
+    Stateful IIR filters for blocks of multi-channel EMG (high-/band-pass,
+    mains notch, rectification and envelope), see MyoClient.add_emg_stage
+"""
+import math
+
+import numpy as np
+
+from .constants import EMG_DEFAULT_STREAMING_RATE
+from .sequence import EMGBlock
+
+
+def _biquad(kind, freq, rate, q) -> np.ndarray:
+    """
+    <> one second-order section [b0, b1, b2, 1, a1, a2] (RBJ audio EQ cookbook)
+    """
+    if not 0 < freq < rate / 2:
+        raise ValueError(f"{freq} Hz is not between 0 and the Nyquist frequency {rate / 2} Hz")
+    w0 = 2 * math.pi * freq / rate
+    cos, alpha = math.cos(w0), math.sin(w0) / (2 * q)
+    if kind == "lowpass":
+        b = [(1 - cos) / 2, 1 - cos, (1 - cos) / 2]
+    elif kind == "highpass":
+        b = [(1 + cos) / 2, -(1 + cos), (1 + cos) / 2]
+    elif kind == "notch":
+        b = [1.0, -2 * cos, 1.0]
+    else:
+        raise ValueError(f"unknown section type: {kind}")
+    a0 = 1 + alpha
+    return np.array([b[0] / a0, b[1] / a0, b[2] / a0, 1.0, -2 * cos / a0, (1 - alpha) / a0])
+
+
+def butterworth(order, freq, rate, kind="lowpass") -> np.ndarray:
+    """
+    <> (order // 2, 6) second-order sections of a Butterworth low/high-pass, order must be even
+    """
+    if order < 2 or order % 2:
+        raise ValueError(f"the order must be a positive even number: {order}")
+    qs = [1 / (2 * math.cos((2 * k + 1) * math.pi / (2 * order))) for k in range(order // 2)]
+    return np.stack([_biquad(kind, freq, rate, q) for q in qs])
+
+
+def notch(freq, rate, q=30.0) -> np.ndarray:
+    """
+    <> (1, 6) second-order section rejecting freq, the bandwidth is freq / q
+    """
+    return _biquad("notch", freq, rate, q)[None]
+
+
+class SOSFilter:
+    """
+    <> cascaded second-order sections over (n, channels) blocks, the state carried across calls
+
+       a block of n samples is filtered with four matrix products instead of a loop
+       over the samples: for the cascade as a linear system with state z (2 per section),
+         y = T x + S z  and  z' = B x + A z
+       the matrices are derived once per block length (longer blocks go in chunks of chunk)
+    """
+
+    def __init__(self, sos, channels=8, chunk=64):
+        self.sos = np.atleast_2d(np.asarray(sos, dtype=np.float64))
+        self.channels = channels
+        self.chunk = chunk
+        self._z = np.zeros((2 * len(self.sos), channels))
+        self._matrices = {}  # block length -> (T, S, B, A)
+
+    def reset(self):
+        self._z[:] = 0.0
+
+    def process(self, x) -> np.ndarray:
+        """
+        <> filter x (n, channels), returns float64 (n, channels)
+        """
+        x = np.asarray(x, dtype=np.float64)
+        if len(x) > self.chunk:
+            return np.concatenate([self.process(x[i : i + self.chunk]) for i in range(0, len(x), self.chunk)])
+        if not len(x):
+            return np.empty((0, self.channels))
+        t, s, b, a = self._block_matrices(len(x))
+        y = t @ x + s @ self._z
+        self._z = b @ x + a @ self._z
+        return y
+
+    def _block_matrices(self, n):
+        m = self._matrices.get(n)
+        if m is None:
+            m = self._matrices[n] = self._derive(n)
+        return m
+
+    def _derive(self, n):
+        """
+        <> the block matrices from the responses to unit inputs and unit states
+        """
+        k = 2 * len(self.sos)
+        # probe columns: n unit impulses with a zero state, then k unit states with a zero input
+        x = np.zeros((n, n + k))
+        x[:, :n] = np.eye(n)
+        z = np.zeros((k, n + k))
+        z[:, n:] = np.eye(k)
+        y = np.empty_like(x)
+        for i in range(n):
+            y[i], z = _step(self.sos, x[i], z)
+        return y[:, :n], y[:, n:], z[:, :n], z[:, n:]
+
+
+def _step(sos, x, z):
+    """
+    <> one sample through the cascade (direct form II transposed), z: (2 * sections, ...)
+    """
+    z = z.copy()
+    for i, (b0, b1, b2, _, a1, a2) in enumerate(sos):
+        y = b0 * x + z[2 * i]
+        z[2 * i] = b1 * x - a1 * y + z[2 * i + 1]
+        z[2 * i + 1] = b2 * x - a2 * y
+        x = y
+    return x, z
+
+
+class EMGFilterBank:
+    """
+    <> the usual EMG conditioning, all channels at once:
+       high-pass (or band-pass with lowpass) -> mains notch -> full-wave rectification -> envelope
+
+       highpass/lowpass/envelope are corner frequencies in Hz and mains the notch frequency,
+       None skips the stage; mains is 50 Hz in east Japan/Europe, 60 Hz in west Japan/the Americas;
+       without envelope the output is the filtered (not rectified) signal.
+       the channels of several bands can go through one bank (channels=8 * bands)
+       for the cost of about one; NaN rows (dropped packets) are filtered as zeros
+       and come out as NaN rows again
+    """
+
+    def __init__(
+        self,
+        rate=EMG_DEFAULT_STREAMING_RATE,
+        channels=8,
+        highpass=20.0,
+        lowpass=None,
+        mains=50.0,
+        envelope=5.0,
+        order=4,
+    ):
+        self.rate = rate
+        self.channels = channels
+        self.envelope = envelope
+        sections = []
+        if highpass is not None:
+            sections.append(butterworth(order, highpass, rate, "highpass"))
+        if lowpass is not None:
+            sections.append(butterworth(order, lowpass, rate, "lowpass"))
+        # a notch at or above the Nyquist frequency has nothing to reject
+        if mains is not None and mains < rate / 2:
+            sections.append(notch(mains, rate))
+        self.band = SOSFilter(np.concatenate(sections), channels) if sections else None
+        self.smooth = SOSFilter(butterworth(2, envelope, rate), channels) if envelope is not None else None
+
+    def reset(self):
+        for f in (self.band, self.smooth):
+            if f is not None:
+                f.reset()
+
+    def process(self, block):
+        """
+        <> filter an EMGBlock (the same samples, new values) or an (n, channels) array
+        """
+        x = block.emg if isinstance(block, EMGBlock) else np.asarray(block, dtype=np.float64)
+        missing = np.isnan(x).any(axis=1)
+        if missing.any():
+            x = np.where(np.isnan(x), 0.0, x)
+        if self.band is not None:
+            x = self.band.process(x)
+        if self.smooth is not None:
+            x = self.smooth.process(np.abs(x))
+        x = x.astype(np.float32)
+        x[missing] = np.nan
+        if isinstance(block, EMGBlock):
+            return EMGBlock(block.index, block.t, x, block.gap)
+        return x
@@ -0,0 +1,185 @@
+"""
+    myo.group
+    ------------
+    Scan once and run several Myo armbands together (MyoGroup)
+"""
+import asyncio
+import logging
+import time
+
+from bleak import BleakScanner
+
+from .core import Myo, MyoClient
+from .profile import GATTProfile
+from .stream import MergedStream, OverflowPolicy, StreamBuffer
+from .types import ClassifierMode, EMGMode, IMUMode
+
+logger = logging.getLogger(__name__)
+
+
+async def discover(macs=None, count=None, timeout=10.0, backend=None) -> list:
+    """
+    <> scan once for Myo devices, by MAC address (in the order given) or by the Myo service UUID
+       the scan stops as soon as all macs, or count devices, are found, otherwise after timeout seconds
+    """
+    macs = [mac.lower() for mac in macs] if macs else None
+    wanted = len(macs) if macs else count
+
+    def match_myo(device, adv):
+        if macs:
+            return device.address.lower() in macs
+        return GATTProfile.MYO_SERVICE in [u.lower() for u in adv.service_uuids]
+
+    found = {}
+    if backend is not None:
+        for device, adv in (await backend.discover(timeout=timeout, return_adv=True)).values():
+            if match_myo(device, adv):
+                found[device.address.lower()] = device
+    else:
+        done = asyncio.Event()
+
+        def on_detection(device, adv):
+            if device.address.lower() not in found and match_myo(device, adv):
+                found[device.address.lower()] = device
+                if wanted and len(found) >= wanted:
+                    done.set()
+
+        async with BleakScanner(detection_callback=on_detection, cb=dict(use_bdaddr=True)):
+            try:
+                await asyncio.wait_for(done.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    if macs:
+        for mac in macs:
+            if mac not in found:
+                logger.error(f"could not find device with address {mac}")
+        return [found[mac] for mac in macs if mac in found]
+    devices = list(found.values())
+    return devices[:count] if count else devices
+
+
+class MyoGroup:
+    """
+    <> MyoClients driven together: connect, setup, start, stop and disconnect run
+       concurrently on all devices, and stream() merges their notifications
+       into one stream tagged with the device address
+    """
+
+    def __init__(self, clients):
+        self.clients = {c.device.address: c for c in clients}
+        self.timings = {a: {} for a in self.clients}  # address -> {step: seconds}
+        self._streams = []
+
+    @classmethod
+    async def with_devices(cls, macs=None, count=None, timeout=10.0, client_cls=MyoClient, backend=None, **kwargs):
+        """
+        <> scan once and connect to the devices found, see discover
+           kwargs are passed to client_cls, e.g. aggregate_all
+        """
+        devices = await discover(macs=macs, count=count, timeout=timeout, backend=backend)
+        clients = []
+        for device in devices:
+            # a replay fleet has one backend (and clock) per device
+            b = backend.backend_for(device) if hasattr(backend, "backend_for") else backend
+            client = client_cls(backend=b, **kwargs)
+            client.m = Myo.with_device(device)
+            clients.append(client)
+        self = cls(clients)
+        await self.connect()
+        return self
+
+    def __iter__(self):
+        return iter(self.clients.values())
+
+    def __len__(self):
+        return len(self.clients)
+
+    def __getitem__(self, address) -> MyoClient:
+        return self.clients[address]
+
+    @property
+    def addresses(self) -> list:
+        return list(self.clients)
+
+    async def _each(self, step, *args, **kwargs):
+        """
+        <> await client.step(...) on all clients at once, timing each one
+           every client finishes before the first failure, if any, is raised
+        """
+
+        async def timed(address, client):
+            t0 = time.perf_counter()
+            try:
+                return await getattr(client, step)(*args, **kwargs)
+            finally:
+                self.timings[address][step] = time.perf_counter() - t0
+
+        results = await asyncio.gather(
+            *(timed(a, c) for a, c in self.clients.items()),
+            return_exceptions=True,
+        )
+        for address, r in zip(self.clients, results):
+            if isinstance(r, BaseException):
+                logger.error(f"{step} failed on {address}: {r}")
+        for r in results:
+            if isinstance(r, BaseException):
+                raise r
+        return results
+
+    async def connect(self):
+        await self._each("connect")
+
+    async def setup(
+        self,
+        classifier_mode=ClassifierMode.DISABLED,
+        emg_mode=EMGMode.SEND_FILT,
+        imu_mode=IMUMode.NONE,
+    ):
+        await self._each("setup", classifier_mode=classifier_mode, emg_mode=emg_mode, imu_mode=imu_mode)
+
+    async def start(self):
+        await self._each("start")
+
+    async def stop(self):
+        await self._each("stop")
+
+    async def disconnect(self):
+        await self._each("disconnect")
+
+    def infer(self, stage):
+        """
+        <> decide the feature windows of all devices with one myo.inference.InferenceStage,
+           batched per tick; every client needs its own features extractor
+        """
+        for client in self:
+            client.inference = stage
+        return stage
+
+    def stream(
+        self,
+        kinds=("emg", "fv", "imu"),
+        batch_size=32,
+        max_latency=0.05,
+        maxsize=4096,
+        policy=OverflowPolicy.DROP_OLDEST,
+    ) -> MergedStream:
+        """
+        <> one stream of the notifications of all devices
+           async for batch in group.stream(kinds=("fv",)):
+               for address, handle, t, data in batch: ...
+        """
+        s = MergedStream(batch_size, max_latency, StreamBuffer(maxsize, policy))
+        for address, client in self.clients.items():
+            s.attach(address, client, kinds)
+        self._streams.append(s)
+        return s
+
+    def stats(self) -> dict:
+        """
+        <> address -> seconds taken by each step so far and items received by the group streams
+        """
+        return {
+            a: dict(self.timings[a], received=sum(s.received.get(a, 0) for s in self._streams))
+            for a in self.clients
+        }
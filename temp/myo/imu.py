@@ -0,0 +1,181 @@
+"""
+    myo.imu
+    ------------
+    Vectorized orientation processing of (N, 10) IMU blocks (myo.batch.decode_imu):
+    quaternion normalization, rotation matrices, Euler angles, gravity-compensated
+    linear acceleration and integrated angular deltas
+"""
+import json
+
+import numpy as np
+
+from .constants import DEFAULT_IMU_SAMPLE_RATE
+
+
+def normalize_quaternions(q, previous=None) -> np.ndarray:
+    """
+    <> (N, 4) w, x, y, z -> unit quaternions, each on the same hemisphere as the one
+       before it (q and -q are the same rotation), the first one as previous if given;
+       a zero quaternion becomes the identity
+    """
+    q = np.asarray(q, dtype=np.float64)
+    norm = np.linalg.norm(q, axis=1, keepdims=True)
+    q = np.where(norm > 0, q / np.where(norm > 0, norm, 1.0), [1.0, 0.0, 0.0, 0.0])
+    if not len(q):
+        return q
+    dots = np.einsum("ij,ij->i", q[1:], q[:-1])
+    first = 1.0 if previous is None or np.dot(q[0], previous) >= 0 else -1.0
+    # a flip carries over to all the quaternions after it
+    signs = np.cumprod(np.concatenate([[first], np.where(dots < 0, -1.0, 1.0)]))
+    return q * signs[:, None]
+
+
+def quaternion_to_matrix(q) -> np.ndarray:
+    """
+    <> (N, 4) unit quaternions -> (N, 3, 3) rotation matrices from the band to the world frame
+    """
+    w, x, y, z = np.asarray(q, dtype=np.float64).T
+    return np.stack(
+        [
+            np.stack([1 - 2 * (y * y + z * z), 2 * (x * y - w * z), 2 * (x * z + w * y)], axis=-1),
+            np.stack([2 * (x * y + w * z), 1 - 2 * (x * x + z * z), 2 * (y * z - w * x)], axis=-1),
+            np.stack([2 * (x * z - w * y), 2 * (y * z + w * x), 1 - 2 * (x * x + y * y)], axis=-1),
+        ],
+        axis=1,
+    )
+
+
+def quaternion_to_euler(q, degrees=True) -> np.ndarray:
+    """
+    <> (N, 4) unit quaternions -> (N, 3) roll, pitch, yaw (the z-y-x intrinsic rotations)
+    """
+    w, x, y, z = np.asarray(q, dtype=np.float64).T
+    roll = np.arctan2(2 * (w * x + y * z), 1 - 2 * (x * x + y * y))
+    pitch = np.arcsin(np.clip(2 * (w * y - x * z), -1.0, 1.0))
+    yaw = np.arctan2(2 * (w * z + x * y), 1 - 2 * (y * y + z * z))
+    euler = np.stack([roll, pitch, yaw], axis=-1)
+    return np.degrees(euler) if degrees else euler
+
+
+def linear_acceleration(rotation, accelerometer, gravity=1.0, frame="world") -> np.ndarray:
+    """
+    <> (N, 3) accelerometer (g) without gravity, in the world or the band frame
+       rotation: (N, 3, 3) from quaternion_to_matrix; at rest the band measures +gravity on world z
+    """
+    a = np.asarray(accelerometer, dtype=np.float64)
+    if frame == "world":
+        world = np.einsum("nij,nj->ni", rotation, a)
+        world[:, 2] -= gravity
+        return world
+    if frame == "band":
+        # world z seen from the band: the last row of the rotation
+        return a - gravity * rotation[:, 2, :]
+    raise ValueError(f"unknown frame: {frame}")
+
+
+def angular_deltas(gyroscope, rate=DEFAULT_IMU_SAMPLE_RATE, previous=None) -> np.ndarray:
+    """
+    <> (N, 3) gyroscope (deg/s) -> the rotation (deg) about each band axis since the sample
+       before, by the trapezoidal rule; previous: the gyroscope sample before the first one,
+       None gives the first sample no rotation
+    """
+    g = np.asarray(gyroscope, dtype=np.float64)
+    before = np.concatenate([g[:1] if previous is None else np.reshape(previous, (1, 3)), g[:-1]])
+    delta = (before + g) / (2 * rate)
+    if previous is None:
+        delta[:1] = 0.0
+    return delta
+
+
+class IMUFrames:
+    """
+    <> the output of an IMUProcessor for a block of N samples
+       orientation: (N, 4) unit quaternions, rotation: (N, 3, 3), euler: (N, 3) roll, pitch, yaw,
+       linear: (N, 3) acceleration without gravity, delta: (N, 3) rotation since the sample
+       before, angle: (N, 3) the deltas accumulated since the processor was reset
+    """
+
+    __slots__ = ("t", "orientation", "rotation", "euler", "linear", "delta", "angle")
+
+    def __init__(self, t, orientation, rotation, euler, linear, delta, angle):
+        self.t = t  # (N,) host time, None if not given
+        self.orientation = orientation
+        self.rotation = rotation
+        self.euler = euler
+        self.linear = linear
+        self.delta = delta
+        self.angle = angle
+
+    def __len__(self):
+        return len(self.orientation)
+
+    def __str__(self):
+        return f"IMUFrames({len(self)} samples)"
+
+    def json(self):
+        return json.dumps(self.to_dict())
+
+    def to_dict(self):
+        return {
+            "t": None if self.t is None else np.asarray(self.t).tolist(),
+            "orientation": self.orientation.tolist(),
+            "euler": self.euler.tolist(),
+            "linear": self.linear.tolist(),
+            "delta": self.delta.tolist(),
+            "angle": self.angle.tolist(),
+        }
+
+
+class IMUProcessor:
+    """
+    <> processes (N, 10) IMU blocks [w, x, y, z, accel x, y, z, gyro x, y, z] into IMUFrames,
+       live (client.imu = IMUProcessor() feeds on_imu_frames) or offline (process_imu);
+       the quaternion hemisphere, the last gyroscope sample and the accumulated angle are
+       carried between blocks, so any split of the samples gives the same frames
+
+       degrees: the unit of euler, delta and angle (radians otherwise); gravity: in g
+       linear is in the world frame unless frame="band"; rate: the IMU sample rate
+    """
+
+    def __init__(self, rate=DEFAULT_IMU_SAMPLE_RATE, gravity=1.0, frame="world", degrees=True):
+        if frame not in ("world", "band"):
+            raise ValueError(f"unknown frame: {frame}")
+        self.rate = rate
+        self.gravity = gravity
+        self.frame = frame
+        self.degrees = degrees
+        self.reset()
+
+    def reset(self):
+        self._quaternion = None  # the last orientation
+        self._gyroscope = None  # the last gyroscope sample
+        self._angle = np.zeros(3)
+
+    def process(self, x, t=None) -> IMUFrames:
+        x = np.asarray(x, dtype=np.float64).reshape(-1, 10)
+        q = normalize_quaternions(x[:, 0:4], self._quaternion)
+        rotation = quaternion_to_matrix(q)
+        delta = angular_deltas(x[:, 7:10], self.rate, self._gyroscope)
+        if not self.degrees:
+            delta = np.radians(delta)
+        angle = self._angle + np.cumsum(delta, axis=0)
+        if len(x):
+            self._quaternion = q[-1]
+            self._gyroscope = x[-1, 7:10]
+            self._angle = angle[-1]
+        return IMUFrames(
+            t,
+            q,
+            rotation,
+            quaternion_to_euler(q, self.degrees),
+            linear_acceleration(rotation, x[:, 4:7], self.gravity, self.frame),
+            delta,
+            angle,
+        )
+
+
+def process_imu(x, t=None, **kwargs) -> IMUFrames:
+    """
+    <> IMUFrames of a whole recording, e.g. process_imu(decode_imu(packets)); see IMUProcessor
+    """
+    return IMUProcessor(**kwargs).process(x, t)
@@ -0,0 +1,218 @@
+"""
+    myo.inference
+    ------------
+    Custom gesture recognition on the feature windows of one or more bands
+    (InferenceStage), with nearest-centroid and LDA models built in
+"""
+import asyncio
+import json
+import logging
+import time
+
+import numpy as np
+
+from .metrics import Histogram
+
+logger = logging.getLogger(__name__)
+
+
+class Gesture:
+    """
+    <> a decision of an InferenceStage, passed to MyoClient.on_gesture
+       t: host time of the last sample of the window, latency: seconds from it to the decision
+    """
+
+    __slots__ = ("label", "confidence", "t", "latency")
+
+    def __init__(self, label, confidence, t, latency):
+        self.label = label
+        self.confidence = confidence  # None if the model gives none
+        self.t = t
+        self.latency = latency
+
+    def __repr__(self):
+        return str((self.label, self.confidence))
+
+    def json(self):
+        return json.dumps(self.to_dict())
+
+    def to_dict(self):
+        return {
+            "label": self.label,
+            "confidence": self.confidence,
+            "t": self.t,
+            "latency": self.latency,
+        }
+
+
+def _softmax(scores):
+    e = np.exp(scores - scores.max(axis=1, keepdims=True))
+    return e / e.sum(axis=1, keepdims=True)
+
+
+class NearestCentroid:
+    """
+    <> the class with the nearest mean, on standardized features
+       decision(): -1/2 squared distances, i.e. the log-likelihoods of unit-variance Gaussians
+    """
+
+    def fit(self, x, y):
+        x = np.asarray(x, dtype=np.float64)
+        y = np.asarray(y)
+        self.classes = np.unique(y)
+        self.mean = x.mean(axis=0)
+        self.scale = x.std(axis=0)
+        self.scale[self.scale == 0] = 1.0
+        z = (x - self.mean) / self.scale
+        self.centroids = np.stack([z[y == c].mean(axis=0) for c in self.classes])
+        return self
+
+    def decision(self, x) -> np.ndarray:
+        z = (np.asarray(x, dtype=np.float64) - self.mean) / self.scale
+        d = (z * z).sum(axis=1)[:, None] - 2 * z @ self.centroids.T + (self.centroids**2).sum(axis=1)
+        return -0.5 * d
+
+    def predict(self, x) -> np.ndarray:
+        return self.classes[self.decision(x).argmax(axis=1)]
+
+
+class LDA:
+    """
+    <> linear discriminant analysis: Gaussian classes sharing one covariance,
+       shrunk towards its diagonal by shrinkage (0..1) for the few samples calibration gives
+       decision(): log posterior up to a constant
+    """
+
+    def __init__(self, shrinkage=0.1):
+        self.shrinkage = shrinkage
+
+    def fit(self, x, y):
+        x = np.asarray(x, dtype=np.float64)
+        y = np.asarray(y)
+        self.classes = np.unique(y)
+        means = np.stack([x[y == c].mean(axis=0) for c in self.classes])
+        centered = x - means[np.searchsorted(self.classes, y)]
+        cov = centered.T @ centered / max(len(x) - len(self.classes), 1)
+        cov = (1 - self.shrinkage) * cov + self.shrinkage * np.diag(np.diag(cov))
+        cov += 1e-9 * np.trace(cov) / len(cov) * np.eye(len(cov))
+        priors = np.array([np.mean(y == c) for c in self.classes])
+        self.coef = np.linalg.solve(cov, means.T).T  # (classes, features)
+        self.intercept = -0.5 * (self.coef * means).sum(axis=1) + np.log(priors)
+        return self
+
+    def decision(self, x) -> np.ndarray:
+        return np.asarray(x, dtype=np.float64) @ self.coef.T + self.intercept
+
+    def predict(self, x) -> np.ndarray:
+        return self.classes[self.decision(x).argmax(axis=1)]
+
+
+class InferenceStage:
+    """
+    <> runs model on the FeatureWindows of any number of MyoClients (client.inference = stage)
+       and passes a Gesture per window to each client's on_gesture
+
+       the windows submitted within one tick (seconds, 0: the current event loop iteration)
+       are decided in one batch, so several bands cost one model call.
+       model: an object with decision(x) -> (n, classes) scores and classes (softmax
+       confidences), or any callable x -> labels or (labels, confidences); x is
+       (n, channels * features). windows with dropped samples are skipped unless skip_gaps=False.
+       stats() reports the latency from the window's last sample to the decision (host clock),
+       the processing time from the block entering the client's pipeline to the decision,
+       and the model time per batch; processing over budget seconds is counted and logged
+    """
+
+    def __init__(self, model, tick=0.0, skip_gaps=True, budget=0.02):
+        self.model = model
+        self.tick = tick
+        self.skip_gaps = skip_gaps
+        self.budget = budget
+        self.decisions = 0
+        self.batches = 0
+        self.over_budget = 0
+        self.latency = Histogram()
+        self.processing = Histogram()
+        self.model_time = Histogram()
+        self._pending = []  # (client, FeatureWindows, perf_counter of the block)
+        self._flusher = None
+
+    def submit(self, client, windows, started=None):
+        """
+        <> queue the windows of client for the current tick, started: perf_counter()
+           when the samples completing them entered the client
+        """
+        if self.skip_gaps and windows.gap.any():
+            windows = _select(windows, ~windows.gap)
+        if not len(windows):
+            return
+        self._pending.append((client, windows, time.perf_counter() if started is None else started))
+        if self._flusher is None:
+            self._flusher = asyncio.create_task(self._next_tick())
+
+    async def flush(self):
+        """
+        <> decide the queued windows now
+        """
+        pending, self._pending = self._pending, []
+        if not pending:
+            return
+        x = np.concatenate([w.features.reshape(len(w), -1) for _, w, _ in pending])
+        t0 = time.perf_counter()
+        labels, confidences = self._decide(x)
+        self.model_time.record(time.perf_counter() - t0)
+        self.batches += 1
+
+        i = 0
+        for client, windows, started in pending:
+            now = client.clock()
+            elapsed = time.perf_counter() - started
+            self.processing.record(elapsed)
+            if elapsed > self.budget:
+                self.over_budget += 1
+                logger.warning(f"gesture decision took {elapsed * 1e3:.1f}ms (budget {self.budget * 1e3:.0f}ms)")
+            for t in windows.t:
+                g = Gesture(
+                    labels[i].item() if isinstance(labels[i], np.generic) else labels[i],
+                    None if confidences is None else float(confidences[i]),
+                    float(t),
+                    now - float(t),
+                )
+                self.latency.record(max(g.latency, 0.0))
+                self.decisions += 1
+                i += 1
+                await client.on_gesture(g)
+
+    def stats(self) -> dict:
+        return {
+            "decisions": self.decisions,
+            "batches": self.batches,
+            "over_budget": self.over_budget,
+            "latency": self.latency.to_dict(),
+            "processing": self.processing.to_dict(),
+            "model": self.model_time.to_dict(),
+        }
+
+    async def _next_tick(self):
+        await asyncio.sleep(self.tick)
+        # windows submitted from the on_gesture callbacks go to the next tick
+        self._flusher = None
+        try:
+            await self.flush()
+        except Exception:
+            logger.exception("gesture inference failed")
+
+    def _decide(self, x):
+        if hasattr(self.model, "decision"):
+            scores = self.model.decision(x)
+            best = scores.argmax(axis=1)
+            return self.model.classes[best], _softmax(scores)[np.arange(len(x)), best]
+        out = self.model(x)
+        if isinstance(out, tuple):
+            return out
+        return out, None
+
+
+def _select(windows, mask):
+    return type(windows)(
+        windows.index[mask], windows.t[mask], windows.features[mask], windows.gap[mask], windows.names
+    )
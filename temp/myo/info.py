@@ -0,0 +1,91 @@
+"""
+    myo.info
+    ------------
+    Device information read over GATT (DeviceInfo), with the static values
+    cached per device so repeated connects skip the reads
+"""
+import asyncio
+import json
+
+from .profile import Handle
+from .types import FirmwareInfo, FirmwareVersion
+
+# serial number -> (manufacturer, FirmwareInfo, FirmwareVersion), for this process
+_STATIC = {}
+# address -> serial number, the address is the serial number on most platforms
+_SERIALS = {}
+
+
+class DeviceInfo:
+    """
+    <> manufacturer, firmware info/version (static) and battery level (read every time)
+    """
+
+    __slots__ = ("manufacturer", "firmware_info", "firmware_version", "battery", "cached")
+
+    def __init__(self, manufacturer, firmware_info: FirmwareInfo, firmware_version: FirmwareVersion, battery, cached=False):
+        self.manufacturer = manufacturer
+        self.firmware_info = firmware_info
+        self.firmware_version = firmware_version
+        self.battery = battery
+        self.cached = cached  # the static values came from the cache
+
+    @property
+    def serial_number(self) -> str:
+        return self.firmware_info.serial_number
+
+    def __str__(self):
+        return f"DeviceInfo({self.serial_number}, {self.firmware_version}, battery {self.battery} %)"
+
+    def json(self):
+        return json.dumps(self.to_dict())
+
+    def to_dict(self):
+        return {
+            "manufacturer": self.manufacturer,
+            "firmware_info": self.firmware_info.to_dict(),
+            "firmware_version": str(self.firmware_version),
+            "battery": self.battery,
+        }
+
+    def values(self) -> dict:
+        """
+        <> int handle -> the value shown by MyoClient.get_services
+        """
+        return {
+            Handle.MANUFACTURER_NAME_STRING.value: self.manufacturer,
+            Handle.FIRMWARE_INFO.value: self.firmware_info.to_dict(),
+            Handle.FIRMWARE_VERSION.value: str(self.firmware_version),
+            Handle.BATTERY_LEVEL.value: self.battery,
+        }
+
+
+async def read_device_info(client, address=None, refresh=False) -> DeviceInfo:
+    """
+    <> read the device information, all characteristics at once; the static values
+       come from the cache when the device (by address or serial number) was read before
+    """
+    static = None
+    if not refresh and address is not None:
+        static = _STATIC.get(_SERIALS.get(address.upper(), address.upper()))
+    if static is not None:
+        battery = await client.read_gatt_char(Handle.BATTERY_LEVEL.value)
+        return DeviceInfo(*static, ord(battery), cached=True)
+
+    manufacturer, fw_info, fw_version, battery = await asyncio.gather(
+        client.read_gatt_char(Handle.MANUFACTURER_NAME_STRING.value),
+        client.read_gatt_char(Handle.FIRMWARE_INFO.value),
+        client.read_gatt_char(Handle.FIRMWARE_VERSION.value),
+        client.read_gatt_char(Handle.BATTERY_LEVEL.value),
+    )
+    static = (manufacturer.decode("utf-8"), FirmwareInfo(fw_info), FirmwareVersion(fw_version))
+    serial = static[1].serial_number
+    _STATIC[serial] = static
+    if address is not None:
+        _SERIALS[address.upper()] = serial
+    return DeviceInfo(*static, ord(battery))
+
+
+def clear_cache():
+    _STATIC.clear()
+    _SERIALS.clear()
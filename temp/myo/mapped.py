@@ -0,0 +1,188 @@
+"""
+    myo.mapped
+    ------------
+    Memory-mapped, time-indexed random access to myo.session files
+"""
+import os
+
+import numpy as np
+
+from .batch import FV_DTYPE
+from .constants import EMG_DEFAULT_STREAMING_RATE
+from .profile import Handle
+from .session import EPOCH_HANDLE, FORMAT_VERSION, HEADER_SIZE, MAX_PAYLOAD, SessionHeader
+
+RECORD_DTYPE = np.dtype(
+    [("ticks", "<u4"), ("handle", "u1"), ("length", "u1"), ("payload", "u1", (MAX_PAYLOAD,))]
+)
+EMG_HANDLES = np.array(
+    [Handle.EMG0_DATA.value, Handle.EMG1_DATA.value, Handle.EMG2_DATA.value, Handle.EMG3_DATA.value],
+    dtype=np.uint8,
+)
+INDEX_SUFFIX = ".idx.npz"
+
+
+class MappedSession:
+    """
+    <> random access to a session file without reading it
+
+       a coarse index (the ticks of every index_stride-th record) maps time to record
+       offsets; it is built with one strided pass over the mapping and cached next to
+       the session in a {path}.idx.npz sidecar. A [t0, t1) query binary-searches the
+       index, refines inside one stride of the mapping and decodes only that range.
+       The records store uint32 ticks; the 64-bit ticks are rebuilt from the epoch records
+       (format version 2, one per ~11.9 hours), found with one pass over the handles
+       that is cached in the sidecar as well
+    """
+
+    def __init__(self, path, index_stride=1024, sidecar=True):
+        self.path = path
+        self.index_stride = index_stride
+        with open(path, "rb") as f:
+            self.header = SessionHeader.unpack(f.read(HEADER_SIZE))
+        if self.header.version > FORMAT_VERSION:
+            raise ValueError(f"unsupported myo session format version {self.header.version}")
+        if self.header.record_size != RECORD_DTYPE.itemsize:
+            raise ValueError(f"unsupported record size {self.header.record_size}")
+        n = (os.path.getsize(path) - self.header.header_size) // RECORD_DTYPE.itemsize
+        if n:
+            self.records = np.memmap(path, dtype=RECORD_DTYPE, mode="r", offset=self.header.header_size, shape=(n,))
+        else:
+            self.records = np.zeros(0, dtype=RECORD_DTYPE)
+        self._tps = self.header.ticks_per_second
+        self._epochs = None  # (2, k) int64: record number and epoch of the epoch records
+        self._index = self._load_index() if sidecar else None
+        if self._index is None:
+            self._epochs = self._find_epochs()
+            self._index = self._ticks(np.arange(0, len(self.records), index_stride))
+            if sidecar:
+                self._save_index()
+
+    def __len__(self):
+        return len(self.records)
+
+    @property
+    def duration(self) -> float:
+        n = len(self.records)
+        return float(self._ticks(np.array([n - 1]))[0]) / self._tps if n else 0.0
+
+    def times(self, r0=0, r1=None) -> np.ndarray:
+        """
+        <> (n,) float64 seconds since the first record of the records [r0, r1)
+        """
+        r1 = len(self.records) if r1 is None else r1
+        return self._ticks(np.arange(r0, r1)) / self._tps
+
+    def locate(self, t) -> int:
+        """
+        <> the first record at or after t seconds
+        """
+        tick = t * self._tps
+        k = int(np.searchsorted(self._index, tick, side="left"))
+        if k == 0:
+            return 0
+        lo = (k - 1) * self.index_stride
+        hi = min(len(self.records), k * self.index_stride + 1)
+        return lo + int(np.searchsorted(self._ticks(np.arange(lo, hi)), tick, side="left"))
+
+    def slice(self, t0=0.0, t1=None):
+        """
+        <> the records in [t0, t1) as a view of the mapping, with the stored uint32 ticks
+           (see times for seconds)
+        """
+        r0 = self.locate(t0)
+        r1 = len(self.records) if t1 is None else self.locate(t1)
+        return self.records[r0:r1]
+
+    def emg(self, t0=0.0, t1=None, channels=None):
+        """
+        <> (t (2n,) float64, (2n, c) int8) raw EMG samples in [t0, t1), sample1 dated 1/200s before its packet
+        """
+        rec, t = self._select(t0, t1, EMG_HANDLES)
+        t = np.repeat(t, 2)
+        t[0::2] -= 1.0 / EMG_DEFAULT_STREAMING_RATE
+        data = rec["payload"][:, :16].reshape(-1, 8).view(np.int8)
+        return t, data if channels is None else data[:, channels]
+
+    def fv(self, t0=0.0, t1=None, channels=None):
+        """
+        <> (t (n,) float64, (n, c) uint16) filtered values in [t0, t1)
+        """
+        rec, t = self._select(t0, t1, Handle.FV_DATA.value)
+        fv = np.ascontiguousarray(rec["payload"][:, : FV_DTYPE.itemsize]).view(FV_DTYPE)[:, 0]["fv"]
+        return t, fv if channels is None else fv[:, channels]
+
+    def imu(self, t0=0.0, t1=None, columns=None):
+        """
+        <> (t (n,) float64, (n, k) float32) IMU values in [t0, t1), scaled with the header scales:
+           [w, x, y, z, accel x, y, z, gyro x, y, z]
+        """
+        rec, t = self._select(t0, t1, Handle.IMU_DATA.value)
+        raw = np.ascontiguousarray(rec["payload"]).view("<i2")
+        o, a, g = self.header.scales
+        scales = np.array([o] * 4 + [a] * 3 + [g] * 3, dtype=np.float32)
+        if columns is not None:
+            raw, scales = raw[:, columns], scales[columns]
+        return t, raw.astype(np.float32) / scales
+
+    def _select(self, t0, t1, handles):
+        """
+        <> (records, t seconds) of handles in [t0, t1)
+        """
+        r0 = self.locate(t0)
+        r1 = len(self.records) if t1 is None else self.locate(t1)
+        rec = self.records[r0:r1]
+        mask = np.isin(rec["handle"], handles)
+        return rec[mask], self.times(r0, r1)[mask]
+
+    def _find_epochs(self):
+        if self.header.version < 2 or not len(self.records):
+            return np.zeros((2, 0), dtype=np.int64)
+        at = np.flatnonzero(self.records["handle"] == EPOCH_HANDLE)
+        epoch = self.records["payload"][at, :4].copy().view("<u4")[:, 0] if len(at) else np.zeros(0)
+        return np.stack([at, epoch]).astype(np.int64)
+
+    def _ticks(self, records) -> np.ndarray:
+        """
+        <> the 64-bit ticks of the record numbers records (sorted)
+        """
+        ticks = self.records["ticks"][records].astype(np.int64)
+        at, epoch = self._epochs
+        if len(at):
+            # an epoch record applies to itself and the records after it
+            k = np.searchsorted(at, records, side="right") - 1
+            ticks += np.where(k >= 0, epoch[np.maximum(k, 0)] << 32, 0)
+        return ticks
+
+    def _index_path(self):
+        return self.path + INDEX_SUFFIX
+
+    def _load_index(self):
+        try:
+            with np.load(self._index_path()) as z:
+                if (
+                    int(z["records"]) == len(self.records)
+                    and int(z["stride"]) == self.index_stride
+                    and int(z["mtime"]) == os.stat(self.path).st_mtime_ns
+                ):
+                    self._epochs = z["epochs"]
+                    return z["ticks"]
+        except (OSError, KeyError, ValueError):
+            pass
+        return None
+
+    def _save_index(self):
+        try:
+            with open(self._index_path(), "wb") as f:
+                np.savez(
+                    f,
+                    ticks=self._index,
+                    epochs=self._epochs,
+                    stride=self.index_stride,
+                    records=len(self.records),
+                    mtime=os.stat(self.path).st_mtime_ns,
+                )
+        except OSError:
+            # a read-only location just means rebuilding the index next time
+            pass
+
@@ -0,0 +1,155 @@
+"""
+    myo.metrics
+    ------------
+    Opt-in runtime metrics of the notification path, see MyoClient.enable_metrics
+"""
+import math
+import time
+
+BUCKETS = 32  # bucket i counts durations in [2^(i-1), 2^i) microseconds
+
+
+class Histogram:
+    """
+    <> log2-bucketed durations in seconds, O(1) record and fixed memory
+    """
+
+    __slots__ = ("counts", "count", "total", "max")
+
+    def __init__(self):
+        self.counts = [0] * BUCKETS
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds):
+        i = math.frexp(seconds * 1e6)[1]
+        self.counts[min(max(i, 0), BUCKETS - 1)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def percentile(self, p) -> float:
+        """
+        <> the upper bound (seconds) of the bucket holding the p-th percentile
+        """
+        if not self.count:
+            return 0.0
+        rank = p / 100 * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank and n:
+                return min(2.0**i * 1e-6, self.max)
+        return self.max
+
+    def to_dict(self):
+        return {
+            "count": self.count,
+            "mean": self.total / self.count if self.count else 0.0,
+            "p50": self.percentile(50),
+            "p90": self.percentile(90),
+            "p99": self.percentile(99),
+            "max": self.max,
+        }
+
+
+class HandleMetrics:
+    """
+    <> arrivals of one handle: count, inter-arrival mean/jitter (Welford) and the callback times
+    """
+
+    __slots__ = ("hook", "packets", "last", "_n", "_mean", "_m2", "max_interval", "callback", "_snapshot")
+
+    def __init__(self, hook, clock=time.perf_counter):
+        self.hook = hook  # name of the on_* callback
+        self.packets = 0
+        self.last = None
+        self._n = 0
+        self._mean = 0.0
+        self._m2 = 0.0
+        self.max_interval = 0.0
+        self.callback = Histogram()
+        self._snapshot = (clock(), 0)  # (time, packets) of the previous snapshot
+
+    def arrived(self, t):
+        self.packets += 1
+        last, self.last = self.last, t
+        if last is None:
+            return
+        dt = t - last
+        self._n += 1
+        delta = dt - self._mean
+        self._mean += delta / self._n
+        self._m2 += delta * (dt - self._mean)
+        if dt > self.max_interval:
+            self.max_interval = dt
+
+    @property
+    def interval(self) -> float:
+        return self._mean
+
+    @property
+    def jitter(self) -> float:
+        """
+        <> standard deviation of the inter-arrival time
+        """
+        return math.sqrt(self._m2 / (self._n - 1)) if self._n > 1 else 0.0
+
+    def snapshot(self, now) -> dict:
+        t0, packets0 = self._snapshot
+        self._snapshot = (now, self.packets)
+        return {
+            "hook": self.hook,
+            "packets": self.packets,
+            "rate": (self.packets - packets0) / (now - t0) if now > t0 else 0.0,
+            "interval": self.interval,
+            "jitter": self.jitter,
+            "max_interval": self.max_interval,
+            "callback": self.callback.to_dict(),
+        }
+
+
+class Metrics:
+    """
+    <> per-handle metrics of a MyoClient, filled by the wrappers its dispatch table gets
+       while metrics are enabled; all times are read from clock (seconds)
+    """
+
+    def __init__(self, clock=time.perf_counter):
+        self.clock = clock
+        self.handles = {}  # Handle -> HandleMetrics
+        self.started = clock()
+
+    def handle(self, handle, hook) -> HandleMetrics:
+        m = self.handles.get(handle)
+        if m is None:
+            m = self.handles[handle] = HandleMetrics(hook, self.clock)
+        return m
+
+    def snapshot(self) -> dict:
+        """
+        <> handle name -> metrics; rate counts the packets since the previous snapshot
+        """
+        now = self.clock()
+        return {h.name: m.snapshot(now) for h, m in self.handles.items()}
+
+
+def summary(snapshot) -> str:
+    """
+    <> one log line from MyoClient.metrics_snapshot()
+    """
+    parts = []
+    for name, m in snapshot["handles"].items():
+        cb = m["callback"]
+        parts.append(
+            f"{name} {m['rate']:.1f}/s jitter {m['jitter'] * 1e3:.2f}ms "
+            f"{m['hook']} p50 {cb['p50'] * 1e6:.0f}us p99 {cb['p99'] * 1e6:.0f}us"
+        )
+    streams = snapshot["streams"]
+    parts.append(
+        f"streams depth {sum(s['depth'] for s in streams)} dropped {sum(s['dropped'] for s in streams)}"
+    )
+    parts.append(f"commands queued {snapshot['commands']}")
+    return " | ".join(parts)
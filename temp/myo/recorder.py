@@ -0,0 +1,137 @@
+"""
+    myo.recorder
+    ------------
+    A buffered JSONL recording sink: one file handle per stream,
+    encoding and disk writes happen on a background thread
+"""
+import json
+import logging
+import os
+import threading
+
+
+logger = logging.getLogger(__name__)
+
+
+class RecordingSink:
+    """
+    <> append records to {directory}/{prefix}_{stream}.json, one JSON document per line
+
+       write() only queues the record, so it is safe to call from the notification handler;
+       the flusher thread encodes and writes every flush_interval seconds or as soon as
+       flush_records records are pending. sync() waits for the pending records to reach the
+       disk (fsync), close() also closes the files
+    """
+
+    def __init__(self, directory, prefix, flush_records=512, flush_interval=1.0):
+        self.directory = directory
+        self.prefix = prefix
+        self.flush_records = flush_records
+        self.flush_interval = flush_interval
+        self.written = 0
+        os.makedirs(directory, exist_ok=True)
+        self._files = {}  # stream -> file object, only touched by the flusher thread
+        self._pending = []  # (stream, dict)
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._synced = threading.Condition(self._lock)
+        self._sync_requests = 0
+        self._sync_done = 0
+        self._closed = False
+        self._error = None
+        self._thread = threading.Thread(target=self._run, name=f"RecordingSink-{prefix}", daemon=True)
+        self._thread.start()
+
+    def path(self, stream) -> str:
+        return os.path.join(self.directory, f"{self.prefix}_{stream}.json")
+
+    def write(self, stream, record):
+        """
+        <> queue a record (a dict or anything with to_dict()) for the stream
+        """
+        if self._closed:
+            raise ValueError(f"write to a closed RecordingSink: {self.prefix}")
+        if not isinstance(record, dict):
+            record = record.to_dict()
+        with self._lock:
+            self._pending.append((stream, record))
+            n = len(self._pending)
+        if n >= self.flush_records:
+            self._wake.set()
+
+    def sync(self):
+        """
+        <> block until everything written so far is flushed and fsync'ed
+        """
+        with self._lock:
+            if self._closed and not self._thread.is_alive():
+                return
+            self._sync_requests += 1
+            ticket = self._sync_requests
+            self._wake.set()
+            while self._sync_done < ticket and self._thread.is_alive():
+                self._synced.wait(0.1)
+        if self._error is not None:
+            raise self._error
+
+    def close(self):
+        """
+        <> flush, fsync and close the files; the sink can't be written afterwards
+        """
+        if self._closed:
+            return
+        self._closed = True
+        self._wake.set()
+        self._thread.join()
+        if self._error is not None:
+            raise self._error
+
+    def _run(self):
+        try:
+            while True:
+                self._wake.wait(self.flush_interval)
+                self._wake.clear()
+                with self._lock:
+                    pending, self._pending = self._pending, []
+                    ticket = self._sync_requests
+                    closing = self._closed
+                self._write(pending)
+                if ticket > self._sync_done or closing:
+                    self._fsync()
+                    with self._lock:
+                        self._sync_done = ticket
+                        self._synced.notify_all()
+                if closing:
+                    with self._lock:
+                        pending, self._pending = self._pending, []
+                    self._write(pending)
+                    self._fsync()
+                    break
+        except Exception as e:
+            logger.error(f"recording sink {self.prefix} failed: {e}")
+            self._error = e
+        finally:
+            for f in self._files.values():
+                f.close()
+            self._files.clear()
+            with self._lock:
+                self._synced.notify_all()
+
+    def _write(self, pending):
+        if not pending:
+            return
+        chunks = {}
+        for stream, record in pending:
+            chunks.setdefault(stream, []).append(json.dumps(record))
+        for stream, lines in chunks.items():
+            f = self._files.get(stream)
+            if f is None:
+                f = self._files[stream] = open(self.path(stream), "a")
+            f.write("\n".join(lines))
+            f.write("\n")
+        self.written += len(pending)
+
+    def _fsync(self):
+        for f in self._files.values():
+            f.flush()
+            os.fsync(f.fileno())
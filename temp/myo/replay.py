@@ -0,0 +1,481 @@
+"""
+    myo.replay
+    ------------
+    A fake BLE transport standing in for BleakScanner/BleakClient,
+    fed from recorded sessions or synthetic generators
+
+    backend = ReplayBackend(synthetic_source(), speed=10)
+    client = await MyoClient.with_device(backend=backend)
+"""
+import asyncio
+import inspect
+import json
+import math
+import random
+
+from .constants import (
+    ACCELEROMETER_SCALE,
+    DEFAULT_IMU_SAMPLE_RATE,
+    EMG_DEFAULT_STREAMING_RATE,
+    GYROSCOPE_SCALE,
+    ORIENTATION_SCALE,
+)
+from .profile import GATTProfile, Handle
+from .types import (
+    _EMG_DATA,
+    _FV_DATA,
+    _IMU_DATA,
+    EMGMode,
+    IMUMode,
+)
+
+EMG_HANDLES = (Handle.EMG0_DATA, Handle.EMG1_DATA, Handle.EMG2_DATA, Handle.EMG3_DATA)
+
+# static characteristic values served by read_gatt_char
+DEFAULT_READS = {
+    Handle.MANUFACTURER_NAME_STRING: b"Thalmic Labs",
+    Handle.BATTERY_LEVEL: bytes((100,)),
+    Handle.FIRMWARE_INFO: bytes.fromhex("8e3294853bd20500000001000000000000000000"),
+    Handle.FIRMWARE_VERSION: bytes.fromhex("01000500b2070200"),
+}
+
+# (service, [(characteristic, uuid, properties)]) as reported by the band
+SERVICES = (
+    (
+        Handle.DEVICE_INFORMATION,
+        GATTProfile.DEVICE_INFORMATION,
+        [(Handle.MANUFACTURER_NAME_STRING, GATTProfile.MANUFACTURER_NAME_STRING, ["read"])],
+    ),
+    (
+        Handle.BATTERY_SERVICE,
+        GATTProfile.BATTERY_SERVICE,
+        [(Handle.BATTERY_LEVEL, GATTProfile.BATTERY_LEVEL, ["read", "notify"])],
+    ),
+    (
+        Handle.CONTROL_SERVICE,
+        GATTProfile.CONTROL_SERVICE,
+        [
+            (Handle.FIRMWARE_INFO, GATTProfile.FIRMWARE_INFO, ["read"]),
+            (Handle.FIRMWARE_VERSION, GATTProfile.FIRMWARE_VERSION, ["read"]),
+            (Handle.COMMAND, GATTProfile.COMMAND, ["write"]),
+        ],
+    ),
+    (
+        Handle.IMU_SERVICE,
+        GATTProfile.IMU_SERVICE,
+        [
+            (Handle.IMU_DATA, GATTProfile.IMU_DATA, ["notify"]),
+            (Handle.MOTION_EVENT, GATTProfile.MOTION_EVENT, ["indicate"]),
+        ],
+    ),
+    (
+        Handle.CLASSIFIER_SERVICE,
+        GATTProfile.CLASSIFIER_SERVICE,
+        [(Handle.CLASSIFIER_EVENT, GATTProfile.CLASSIFIER_EVENT, ["indicate"])],
+    ),
+    (
+        Handle.FV_SERVICE,
+        GATTProfile.FV_SERVICE,
+        [(Handle.FV_DATA, GATTProfile.FV_DATA, ["notify"])],
+    ),
+    (
+        Handle.EMG_SERVICE,
+        GATTProfile.EMG_SERVICE,
+        [
+            (Handle.EMG0_DATA, GATTProfile.EMG0_DATA, ["notify"]),
+            (Handle.EMG1_DATA, GATTProfile.EMG1_DATA, ["notify"]),
+            (Handle.EMG2_DATA, GATTProfile.EMG2_DATA, ["notify"]),
+            (Handle.EMG3_DATA, GATTProfile.EMG3_DATA, ["notify"]),
+        ],
+    ),
+)
+
+
+def emg_packet(sample1, sample2) -> bytes:
+    """
+    <> encode two 8-channel EMG samples as a myohw_emg_data_t payload
+    """
+    return _EMG_DATA.pack(*sample1, *sample2)
+
+
+def fv_packet(fv, mask=0) -> bytes:
+    """
+    <> encode 8 filtered values as an FV_DATA payload
+    """
+    return _FV_DATA.pack(*fv, mask)
+
+
+def imu_packet(orientation, accelerometer, gyroscope) -> bytes:
+    """
+    <> encode scaled IMU values (as in IMUData) as a myohw_imu_data_t payload
+       orientation: (w, x, y, z)
+    """
+    raw = [round(v * ORIENTATION_SCALE) for v in orientation]
+    raw += [round(v * ACCELEROMETER_SCALE) for v in accelerometer]
+    raw += [round(v * GYROSCOPE_SCALE) for v in gyroscope]
+    return _IMU_DATA.pack(*(max(-32768, min(32767, v)) for v in raw))
+
+
+def synthetic_source(duration=None, seed=0):
+    """
+    <> generate (t, Handle, payload) events at the device rates:
+       200Hz EMG as 2-sample packets round-robin over EMG0-3, 50Hz FV and 50Hz IMU
+       duration: seconds of data, None for an endless stream
+    """
+    rng = random.Random(seed)
+    emg_dt = 2.0 / EMG_DEFAULT_STREAMING_RATE
+    imu_dt = 1.0 / DEFAULT_IMU_SAMPLE_RATE
+    per_tick = round(imu_dt / emg_dt)
+    tick = 0
+    while duration is None or tick * imu_dt < duration:
+        t = tick * imu_dt
+        # a slow contraction envelope shared by all channels
+        envelope = 0.5 + 0.5 * math.sin(2 * math.pi * 0.5 * t)
+        for i in range(per_tick):
+            samples = [
+                [max(-128, min(127, round(rng.gauss(0, 10 + 50 * envelope)))) for _ in range(8)] for _ in range(2)
+            ]
+            n = tick * per_tick + i
+            yield t + i * emg_dt, EMG_HANDLES[n % 4], emg_packet(*samples)
+            if i == 0:
+                yield t, Handle.FV_DATA, fv_packet([round(100 + 800 * envelope * (1 + 0.1 * c)) for c in range(8)])
+                angle = 2 * math.pi * 0.1 * t
+                yield t, Handle.IMU_DATA, imu_packet(
+                    (math.cos(angle / 2), 0.0, 0.0, math.sin(angle / 2)),
+                    (0.0, 0.0, 1.0),
+                    (0.0, 0.0, math.degrees(2 * math.pi * 0.1)),
+                )
+        tick += 1
+
+
+def jsonl_source(path, rate=DEFAULT_IMU_SAMPLE_RATE, loop=False):
+    """
+    <> replay a JSONL recording of AggregatedData.to_dict() (e.g. EMG_data/*.json)
+       as (t, Handle, payload) events, one frame every 1/rate seconds
+    """
+    emg_dt = 1.0 / EMG_DEFAULT_STREAMING_RATE
+    offset = 0.0
+    n = emg_n = 0
+    while True:
+        with open(path, "r") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                d = json.loads(line)
+                t = offset + n / rate
+                if d.get("fvd") is not None:
+                    yield t, Handle.FV_DATA, fv_packet(d["fvd"]["fv"], d["fvd"]["mask"])
+                if d.get("imu") is not None:
+                    o = d["imu"]["orientation"]
+                    yield t, Handle.IMU_DATA, imu_packet(
+                        (o["w"], o["x"], o["y"], o["z"]),
+                        d["imu"]["accelerometer"],
+                        d["imu"]["gyroscope"],
+                    )
+                emg = d.get("emg") or []
+                for i in range(0, len(emg) - 1, 2):
+                    yield t + (i + 1) * emg_dt, EMG_HANDLES[emg_n % 4], emg_packet(emg[i], emg[i + 1])
+                    emg_n += 1
+                n += 1
+        if not loop:
+            return
+        offset = n / rate
+
+
+class ReplayAdvertisement:
+    __slots__ = ("local_name", "service_uuids", "rssi")
+
+    def __init__(self, local_name, service_uuids, rssi=-50):
+        self.local_name = local_name
+        self.service_uuids = service_uuids
+        self.rssi = rssi
+
+
+class ReplayCharacteristic:
+    __slots__ = ("handle", "uuid", "properties")
+
+    def __init__(self, handle, uuid, properties):
+        self.handle = handle
+        self.uuid = uuid
+        self.properties = properties
+
+
+class ReplayDevice:
+    __slots__ = ("address", "name", "details")
+
+    def __init__(self, address, name="Myo", details=None):
+        self.address = address
+        self.name = name
+        self.details = details
+
+
+class ReplayService:
+    __slots__ = ("handle", "uuid", "characteristics")
+
+    def __init__(self, handle, uuid, characteristics):
+        self.handle = handle
+        self.uuid = uuid
+        self.characteristics = characteristics
+
+
+class _Source:
+    """
+    <> iterator over (t, handle, data) events that can put back the events it handed out
+    """
+
+    def __init__(self, events):
+        self._events = iter(events)
+        self._back = []
+
+    @classmethod
+    def of(cls, source):
+        return source if isinstance(source, cls) else cls(source)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self._back:
+            return self._back.pop()
+        return next(self._events)
+
+    def put_back(self, event):
+        self._back.append(event)
+
+
+class ReplayClient:
+    """
+    <> the subset of BleakClient used by Myo/MyoClient
+
+       events from the source are emitted on subscribed handles that the
+       current SetMode enables, paced at t / speed (speed=None: as fast as possible)
+       async notify callbacks are awaited, so slow consumers slow the replay down
+    """
+
+    def __init__(self, device, source, speed=1.0, latency=0.0, reads=None, disconnected_callback=None):
+        self.device = device
+        self.speed = speed
+        self.latency = latency  # simulated round trip of requests with a response
+        self.reads = dict(DEFAULT_READS if reads is None else reads)
+        self.writes = []  # (handle, bytes, response)
+        self.sent = {}  # int handle -> notifications emitted
+        self.now = 0.0  # source time of the last emitted event
+        self.emg_mode = EMGMode.NONE
+        self.imu_mode = IMUMode.NONE
+        self._source = _Source.of(source)  # consumed once, even if source is a list
+        self._disconnected_callback = disconnected_callback
+        self._callbacks = {}
+        self._connected = False
+        self._task = None
+        self._chars = {}
+        self.services = []
+        for handle, uuid, chars in SERVICES:
+            cs = []
+            for h, u, props in chars:
+                self._chars[h.value] = ReplayCharacteristic(h.value, u, props)
+                cs.append(self._chars[h.value])
+            self.services.append(ReplayService(handle.value, uuid, cs))
+
+    @property
+    def is_connected(self):
+        return self._connected
+
+    async def connect(self, **kwargs):
+        await self._round_trip()
+        self._connected = True
+        return True
+
+    async def disconnect(self):
+        connected, self._connected = self._connected, False
+        await self._cancel()
+        if connected and self._disconnected_callback is not None:
+            self._disconnected_callback(self)
+        return True
+
+    async def drop(self, lost=0.0):
+        """
+        <> simulate a radio drop-out: disconnect without being asked to,
+           and skip the next lost seconds of the source
+        """
+        await self.stall(lost)
+        await self.disconnect()
+
+    async def stall(self, lost=0.0):
+        """
+        <> stop notifying while staying connected, skipping the next lost seconds of the source
+           the first event after them is put back, start_notify resumes with it
+        """
+        await self._cancel()
+        until = self.now + lost
+        if lost > 0:
+            for event in self._source:
+                if event[0] >= until:
+                    self._source.put_back(event)
+                    break
+
+    async def read_gatt_char(self, char_specifier, **kwargs) -> bytearray:
+        await self._round_trip()
+        return bytearray(self.reads[Handle(_handle_of(char_specifier))])
+
+    async def start_notify(self, char_specifier, callback, **kwargs):
+        await self._round_trip()
+        self._callbacks[_handle_of(char_specifier)] = callback
+        if self._task is None:
+            # the source starts with the first subscription, as a device only notifies once subscribed
+            self._task = asyncio.create_task(self._run())
+
+    async def stop_notify(self, char_specifier):
+        await self._round_trip()
+        self._callbacks.pop(_handle_of(char_specifier), None)
+
+    async def wait_done(self):
+        """
+        <> wait until a finite source is exhausted
+        """
+        if self._task is not None:
+            await asyncio.shield(self._task)
+
+    async def write_gatt_char(self, char_specifier, data, response=None):
+        if response:
+            await self._round_trip()
+        handle = _handle_of(char_specifier)
+        data = bytes(data)
+        self.writes.append((handle, data, bool(response)))
+        # myohw_command_set_mode_t: header, emg_mode, imu_mode, classifier_mode
+        if handle == Handle.COMMAND.value and data[0] == 0x01:
+            self.emg_mode = EMGMode(data[2])
+            self.imu_mode = IMUMode(data[3])
+
+    async def _cancel(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def _enabled(self, handle):
+        if handle in EMG_HANDLES:
+            return self.emg_mode in [EMGMode.SEND_EMG, EMGMode.SEND_RAW]
+        if handle == Handle.FV_DATA:
+            return self.emg_mode == EMGMode.SEND_FILT
+        if handle == Handle.IMU_DATA:
+            return self.imu_mode not in [IMUMode.NONE, IMUMode.SEND_EVENTS]
+        return True
+
+    async def _round_trip(self):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        t0 = loop.time()
+        start = None  # a shared source resumes where the previous client left it
+        n = 0
+        for event in self._source:
+            t, handle, data = event
+            if start is None:
+                start = t
+            try:
+                if self.speed:
+                    delay = t0 + (t - start) / self.speed - loop.time()
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                else:
+                    # unpaced: still let the rest of the event loop run now and then
+                    n += 1
+                    if n % 64 == 0:
+                        await asyncio.sleep(0)
+            except asyncio.CancelledError:
+                # stopped before its time: the event is not sent, keep it for the next run
+                self._source.put_back(event)
+                raise
+            self.now = t
+            callback = self._callbacks.get(handle.value)
+            if callback is None or not self._enabled(handle):
+                continue
+            self.sent[handle.value] = self.sent.get(handle.value, 0) + 1
+            r = callback(self._chars[handle.value], bytearray(data))
+            if inspect.isawaitable(r):
+                await r
+
+
+class ReplayBackend:
+    """
+    <> stands in for BleakScanner (find_device_by_filter) and BleakClient (client)
+    """
+
+    def __init__(self, source, speed=1.0, latency=0.0, address="D2:3B:85:94:32:8E", name="Myo"):
+        self.source = _Source.of(source)  # shared by the clients of reconnects
+        self.speed = speed
+        self.latency = latency
+        self.device = ReplayDevice(address, name)
+        self.advertisement = ReplayAdvertisement(name, [GATTProfile.MYO_SERVICE])
+        self.clients = []
+
+    async def discover(self, timeout=5.0, return_adv=False, **kwargs):
+        if return_adv:
+            return {self.device.address: (self.device, self.advertisement)}
+        return [self.device]
+
+    async def find_device_by_filter(self, filterfunc, timeout=10.0, **kwargs):
+        if filterfunc(self.device, self.advertisement):
+            return self.device
+        return None
+
+    def clock(self) -> float:
+        """
+        <> the source time of the event being replayed, used by MyoClient in place of time.monotonic
+           so timestamp-based processing behaves the same at any speed
+        """
+        return self.clients[-1].now if self.clients else 0.0
+
+    def client(self, device, disconnected_callback=None, **kwargs) -> ReplayClient:
+        c = ReplayClient(
+            device,
+            self.source,
+            speed=self.speed,
+            latency=self.latency,
+            disconnected_callback=disconnected_callback,
+        )
+        self.clients.append(c)
+        return c
+
+
+class ReplayFleet:
+    """
+    <> several ReplayBackend armbands visible to one scanner, for myo.group
+    """
+
+    def __init__(self, backends):
+        self.backends = {b.device.address: b for b in backends}
+
+    async def discover(self, timeout=5.0, return_adv=False, **kwargs):
+        found = {a: (b.device, b.advertisement) for a, b in self.backends.items()}
+        if return_adv:
+            return found
+        return [d for d, _ in found.values()]
+
+    async def find_device_by_filter(self, filterfunc, timeout=10.0, **kwargs):
+        for b in self.backends.values():
+            if filterfunc(b.device, b.advertisement):
+                return b.device
+        return None
+
+    def backend_for(self, device) -> ReplayBackend:
+        """
+        <> the backend replaying device, whose clock its MyoClient should use
+        """
+        return self.backends[device.address]
+
+    def client(self, device, **kwargs) -> ReplayClient:
+        return self.backend_for(device).client(device, **kwargs)
+
+
+def _handle_of(char_specifier) -> int:
+    if isinstance(char_specifier, int):
+        return char_specifier
+    if isinstance(char_specifier, Handle):
+        return char_specifier.value
+    return char_specifier.handle
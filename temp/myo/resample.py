@@ -0,0 +1,345 @@
+"""
+    myo.resample
+    ------------
+    Streaming polyphase resampling of the 200Hz EMG and the 50Hz FV/IMU onto
+    one fixed-rate clock (FrameResampler), placed by the host timestamps
+"""
+import json
+import math
+
+import numpy as np
+
+from .constants import DEFAULT_IMU_SAMPLE_RATE, EMG_DEFAULT_STREAMING_RATE
+from .types import FVData, IMUData
+
+# kind -> (sample rate, channels) of the streams a MyoClient can feed
+STREAMS = {
+    "emg": (EMG_DEFAULT_STREAMING_RATE, 8),
+    "fv": (DEFAULT_IMU_SAMPLE_RATE, 8),
+    "imu": (DEFAULT_IMU_SAMPLE_RATE, 10),
+}
+
+
+def kernel(d, fc, half, beta=8.0) -> np.ndarray:
+    """
+    <> the Kaiser-windowed sinc lowpass at d input samples from its center
+       fc: cutoff in cycles per input sample * 2 (1: the input Nyquist), half: support in samples
+    """
+    d = np.asarray(d, dtype=np.float64)
+    window = np.i0(beta * np.sqrt(np.clip(1 - (d / half) ** 2, 0.0, None))) / np.i0(beta)
+    return np.where(np.abs(d) < half, fc * np.sinc(fc * d) * window, 0.0)
+
+
+def polyphase_table(fc, half, phases=256, beta=8.0) -> np.ndarray:
+    """
+    <> (phases + 1, 2 * half) taps of kernel for the fractional positions 0, 1/phases, .., 1,
+       each phase with unit DC gain; tap m weighs sample floor(p) - half + 1 + m
+    """
+    frac = np.arange(phases + 1)[:, None] / phases
+    h = kernel(frac + half - 1 - np.arange(2 * half), fc, half, beta)
+    return h / h.sum(axis=1, keepdims=True)
+
+
+def values(data) -> np.ndarray:
+    """
+    <> the (n, channels) rows of FVData, IMUData ([w, x, y, z, accel, gyro] as in
+       myo.batch.decode_imu) or an array
+    """
+    if isinstance(data, FVData):
+        return np.asarray(data.fv, dtype=np.float64)[None, :]
+    if isinstance(data, IMUData):
+        o = data.orientation
+        return np.array([[o.w, o.x, o.y, o.z, *data.accelerometer, *data.gyroscope]])
+    return np.asarray(data, dtype=np.float64)
+
+
+class SampleClock:
+    """
+    <> the host time of the samples of a stream: a least-squares line through (index, host time),
+       forgetting exponentially over window seconds, so the jitter of the BLE arrival times
+       averages out and the drift of the band clock is followed; the period stays within 10%
+       of the nominal one
+    """
+
+    def __init__(self, rate, window=10.0):
+        self.rate = rate
+        self.window = window
+        self._decay = math.exp(-1.0 / (window * rate))
+        self.reset()
+
+    def reset(self):
+        self._origin = None  # (index, t) of the first sample, the sums are relative to it
+        self._sums = np.zeros(5)  # weight, i, t, i*i, i*t
+
+    def push(self, index, t):
+        if self._origin is None:
+            self._origin = (int(index[0]), float(t[0]))
+        i = np.asarray(index, dtype=np.float64) - self._origin[0]
+        u = np.asarray(t, dtype=np.float64) - self._origin[1]
+        w = self._decay ** np.arange(len(i) - 1, -1, -1, dtype=np.float64)
+        block = np.array([w.sum(), w @ i, w @ u, w @ (i * i), w @ (i * u)])
+        self._sums = self._sums * self._decay ** len(i) + block
+
+    def _line(self):
+        weight, si, st, sii, sit = self._sums
+        mi, mt = si / weight, st / weight
+        var = sii / weight - mi * mi
+        period = 1.0 / self.rate
+        if var > 1e-9:
+            period = min(max((sit / weight - mi * mt) / var, 0.9 / self.rate), 1.1 / self.rate)
+        return period, mt - period * mi
+
+    def time(self, index):
+        period, offset = self._line()
+        return self._origin[1] + offset + period * (np.asarray(index, dtype=np.float64) - self._origin[0])
+
+    def position(self, t):
+        """
+        <> the fractional sample index at host time t
+        """
+        period, offset = self._line()
+        return self._origin[0] + (np.asarray(t, dtype=np.float64) - self._origin[1] - offset) / period
+
+
+class Resampler:
+    """
+    <> one stream of a FrameResampler: its samples by index and the polyphase anti-aliasing
+       filter reading them at any host time
+
+       the filter is a windowed sinc with zeros zero crossings per side, cut at cutoff of the
+       lower Nyquist of rate_in and rate_out; each output interpolates between the two nearest
+       of phases precomputed phases. missing samples (lost packets, NaN rows) count as 0 and
+       mark the outputs they reach as gaps
+    """
+
+    def __init__(self, rate_in, rate_out, channels, zeros=8, cutoff=0.9, phases=256, window=10.0):
+        self.rate_in = rate_in
+        self.channels = channels
+        self.fc = cutoff * min(1.0, rate_out / rate_in)
+        self.half = math.ceil(zeros / self.fc)
+        self.phases = phases
+        self.table = polyphase_table(self.fc, self.half, phases)
+        self.clock = SampleClock(rate_in, window)
+        self.reset()
+
+    def reset(self):
+        self.clock.reset()
+        self._buffer = np.zeros((0, self.channels))
+        self._start = None  # index of _buffer[0]
+        self._first = None  # index of the first sample since reset
+        self.received = 0
+
+    @property
+    def started(self) -> bool:
+        return self._start is not None
+
+    @property
+    def last(self) -> int:
+        return self._start + len(self._buffer) - 1
+
+    def push(self, x, t, index=None):
+        """
+        <> x: (n, channels) samples, t: their (n,) host times or the time of the last one,
+           index: their (n,) sample numbers (e.g. EMGBlock.index), None for the next ones
+        """
+        x = np.asarray(x, dtype=np.float64).reshape(-1, self.channels)
+        n = len(x)
+        if not n:
+            return
+        if index is None:
+            index = (0 if self._start is None else self.last + 1) + np.arange(n)
+        index = np.asarray(index, dtype=np.int64)
+        t = np.asarray(t, dtype=np.float64).reshape(-1)
+        if len(t) != n:
+            t = t[-1] - (n - 1 - np.arange(n)) / self.rate_in
+        if self._start is not None and abs(index[0] - self.last) > 10 * self.rate_in:
+            # a new series (e.g. the sequencer restarted) or a long outage
+            self.reset()
+        if self._start is not None:
+            # late samples fill their holes, unless they were trimmed already
+            kept = index >= self._start
+            x, t, index = x[kept], t[kept], index[kept]
+            if not len(x):
+                return
+        else:
+            self._start = self._first = int(index[0])
+        self.clock.push(index, t)
+        self.received += len(x)
+        size = int(index.max()) - self._start + 1
+        if size > len(self._buffer):
+            grown = np.full((size - len(self._buffer), self.channels), np.nan)
+            self._buffer = np.concatenate([self._buffer, grown])
+        self._buffer[index - self._start] = x
+
+    def first_time(self) -> float:
+        """
+        <> the host time from which every output has all its samples
+        """
+        return float(self.clock.time(self._first + self.half - 1))
+
+    def ready_until(self) -> float:
+        """
+        <> the host time up to which every output has all its samples
+        """
+        return float(self.clock.time(self.last - self.half))
+
+    def read(self, t):
+        """
+        <> ((k, channels) values, (k,) gap) at the host times t; NaN outside the samples so far
+        """
+        t = np.asarray(t, dtype=np.float64)
+        if self._start is None:
+            return np.full((len(t), self.channels), np.nan), np.ones(len(t), dtype=bool)
+        p = self.clock.position(t)
+        base = np.floor(p)
+        j = base.astype(np.int64)[:, None] - self.half + 1 + np.arange(2 * self.half)
+        taps = self._buffer[np.clip(j - self._start, 0, len(self._buffer) - 1)]
+        missing = np.isnan(taps) | ((j < self._first) | (j > self.last))[:, :, None]
+        phase = (p - base) * self.phases
+        k = np.minimum(phase.astype(np.int64), self.phases - 1)
+        a = (phase - k)[:, None]
+        w = self.table[k] * (1 - a) + self.table[k + 1] * a
+        y = np.einsum("kt,ktc->kc", w, np.where(missing, 0.0, taps))
+        outside = (p < self._first) | (p > self.last)
+        y[outside] = np.nan
+        return y, missing.any(axis=(1, 2)) | outside
+
+    def trim(self, t):
+        """
+        <> drop the samples no output from host time t on needs
+        """
+        if self._start is None:
+            return
+        keep = int(math.floor(self.clock.position(t))) - self.half
+        drop = min(max(keep - self._start, 0), len(self._buffer))
+        if drop:
+            self._buffer = self._buffer[drop:]
+            self._start += drop
+
+
+class FrameBlock:
+    """
+    <> frames on the fixed clock of a FrameResampler
+       t: (k,) host times, x: (k, columns) float32 of all the streams side by side
+       (block["emg"] for one), gap: (k,) whether a missing sample reached the frame
+    """
+
+    __slots__ = ("t", "x", "gap", "columns")
+
+    def __init__(self, t, x, gap, columns):
+        self.t = t
+        self.x = x
+        self.gap = gap
+        self.columns = columns  # kind -> slice of x
+
+    def __len__(self):
+        return len(self.t)
+
+    def __getitem__(self, kind) -> np.ndarray:
+        return self.x[:, self.columns[kind]]
+
+    def __str__(self):
+        return f"FrameBlock({len(self)} frames, {', '.join(self.columns)})"
+
+    def json(self):
+        return json.dumps(self.to_dict())
+
+    def to_dict(self):
+        return {
+            "t": self.t.tolist(),
+            "gap": self.gap.tolist(),
+            **{kind: self[kind].tolist() for kind in self.columns},
+        }
+
+
+class FrameResampler:
+    """
+    <> resamples any number of streams onto one clock of rate Hz and joins them into FrameBlocks
+
+         frames = FrameResampler(rate=100)  # emg, fv and imu (see STREAMS)
+         block = frames.push("imu", decode_imu(packets), t)
+
+       every stream is placed on the host clock by its SampleClock, so the frames at t are the
+       streams' values at t whatever the jitter of the arrivals. a frame is emitted once every
+       stream has the samples its filter needs; a stream more than max_delay seconds behind the
+       others (or not started by then) is not waited for and reads NaN.
+       client.resampler = FrameResampler() feeds MyoClient.on_frames
+    """
+
+    def __init__(self, rate=100.0, streams=None, zeros=8, cutoff=0.9, window=10.0, max_delay=0.5):
+        self.rate = rate
+        self.max_delay = max_delay
+        self.streams = {
+            kind: Resampler(r, rate, c, zeros=zeros, cutoff=cutoff, window=window)
+            for kind, (r, c) in (STREAMS if streams is None else streams).items()
+        }
+        self.columns = {}
+        start = 0
+        for kind, s in self.streams.items():
+            self.columns[kind] = slice(start, start + s.channels)
+            start += s.channels
+        self.width = start
+        self.emitted = 0
+        self.gaps = 0
+        self.reset()
+
+    def reset(self):
+        for s in self.streams.values():
+            s.reset()
+        self._t0 = None  # host time of the first frame
+        self._count = 0  # frames since _t0
+
+    def push(self, kind, x, t, index=None) -> FrameBlock:
+        """
+        <> add samples of kind (see Resampler.push), return the frames that became ready
+        """
+        self.streams[kind].push(x, t, index)
+        return self._emit()
+
+    def flush(self) -> FrameBlock:
+        """
+        <> the frames up to the newest sample of any stream
+        """
+        return self._emit(flush=True)
+
+    def stats(self) -> dict:
+        return {
+            "frames": self.emitted,
+            "gaps": self.gaps,
+            "received": {kind: s.received for kind, s in self.streams.items()},
+            "rates": {kind: 1.0 / s.clock._line()[0] for kind, s in self.streams.items() if s.started},
+        }
+
+    def _emit(self, flush=False) -> FrameBlock:
+        started = [s for s in self.streams.values() if s.started]
+        if not started:
+            return self._empty()
+        ready = [s.ready_until() for s in started]
+        newest = max(ready)
+        if self._t0 is None:
+            firsts = [s.first_time() for s in started]
+            if len(started) < len(self.streams) and newest - min(firsts) < self.max_delay and not flush:
+                return self._empty()
+            self._t0 = max(firsts)
+        if flush:
+            until = newest
+        else:
+            until = min(r for r in ready if newest - r <= self.max_delay)
+        k = math.floor((until - self._t0) * self.rate) + 1 - self._count
+        if k <= 0:
+            return self._empty()
+        t = self._t0 + (self._count + np.arange(k)) / self.rate
+        self._count += k
+        x = np.empty((k, self.width), dtype=np.float32)
+        gap = np.zeros(k, dtype=bool)
+        for kind, s in self.streams.items():
+            x[:, self.columns[kind]], g = s.read(t)
+            gap |= g
+            s.trim(t[-1] + 1.0 / self.rate)
+        self.emitted += k
+        self.gaps += int(gap.sum())
+        return FrameBlock(t, x, gap, self.columns)
+
+    def _empty(self) -> FrameBlock:
+        x = np.zeros((0, self.width), dtype=np.float32)
+        return FrameBlock(np.zeros(0), x, np.zeros(0, dtype=bool), self.columns)
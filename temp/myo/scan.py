@@ -0,0 +1,186 @@
+"""
+    myo.scan
+    ------------
+    A cache of recently seen devices and a shared background scanner,
+    so known bands are found without a full scan
+"""
+import asyncio
+import json
+import logging
+import os
+import time
+
+from bleak import BleakScanner
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_PATH = os.path.join(
+    os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache"),
+    "dl-myo",
+    "devices.json",
+)
+
+
+class CachedDevice:
+    """
+    <> a device known only from the cache file: BleakClient connects to it by address
+    """
+
+    __slots__ = ("address", "name")
+
+    def __init__(self, address, name=None):
+        self.address = address
+        self.name = name
+
+    def __repr__(self):
+        return f"CachedDevice({self.address}, {self.name})"
+
+
+class DeviceCache:
+    """
+    <> devices seen within the last ttl seconds, by address
+
+       the BLEDevice objects are kept for this process; the JSON file at path
+       (None: memory only) keeps address, name and the time each device was last
+       seen, so another process can connect to a known band by address
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, ttl=600.0):
+        self.path = path
+        self.ttl = ttl
+        self._entries = {}  # lower address -> {"address", "name", "seen"}
+        self._devices = {}  # lower address -> BLEDevice
+        self._load()
+
+    def __contains__(self, address):
+        return self.get(address) is not None
+
+    def __len__(self):
+        return len(self._entries)
+
+    def put(self, device):
+        """
+        <> remember device as seen now
+        """
+        key = device.address.lower()
+        self._entries[key] = {"address": device.address, "name": device.name, "seen": time.time()}
+        if not isinstance(device, CachedDevice):
+            self._devices[key] = device
+        self.save()
+
+    def get(self, address):
+        """
+        <> the device with address if it was seen within ttl, else None
+        """
+        key = address.lower()
+        entry = self._entries.get(key)
+        if entry is None or time.time() - entry["seen"] > self.ttl:
+            return None
+        return self._devices.get(key) or CachedDevice(entry["address"], entry["name"])
+
+    def latest(self):
+        """
+        <> the most recently seen device within ttl, else None
+        """
+        if not self._entries:
+            return None
+        entry = max(self._entries.values(), key=lambda e: e["seen"])
+        return self.get(entry["address"])
+
+    def forget(self, address):
+        key = address.lower()
+        self._devices.pop(key, None)
+        if self._entries.pop(key, None) is not None:
+            self.save()
+
+    def save(self):
+        if self.path is None:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp = self.path + ".tmp"
+            with open(tmp, "w") as f:
+                json.dump(list(self._entries.values()), f)
+            os.replace(tmp, self.path)
+        except OSError as e:
+            # an unwritable location only costs a scan next time
+            logger.debug(f"could not save the device cache {self.path}: {e}")
+
+    def _load(self):
+        if self.path is None:
+            return
+        try:
+            with open(self.path, "r") as f:
+                entries = json.load(f)
+            for e in entries:
+                self._entries[e["address"].lower()] = {"address": e["address"], "name": e["name"], "seen": e["seen"]}
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+
+
+class SharedScanner:
+    """
+    <> one BleakScanner serving any number of concurrent find_device_by_filter lookups
+
+       the scanner runs while at least one lookup is pending; every advertisement
+       is offered to all pending filters, and each lookup resolves on its first match
+    """
+
+    def __init__(self, scanner_cls=BleakScanner):
+        self._scanner_cls = scanner_cls
+        self._scanner = None
+        self._pending = []  # (filterfunc, future)
+        self._lock = asyncio.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._scanner is not None
+
+    async def find_device_by_filter(self, filterfunc, timeout=10.0, **kwargs):
+        fut = asyncio.get_running_loop().create_future()
+        lookup = (filterfunc, fut)
+        self._pending.append(lookup)
+        try:
+            await self._start()
+            return await asyncio.wait_for(fut, timeout)
+        except asyncio.TimeoutError:
+            return None
+        finally:
+            self._pending.remove(lookup)
+            await self._stop()
+
+    def _on_detection(self, device, adv):
+        for filterfunc, fut in self._pending:
+            if not fut.done() and filterfunc(device, adv):
+                fut.set_result(device)
+
+    async def _start(self):
+        async with self._lock:
+            if self._scanner is None:
+                scanner = self._scanner_cls(detection_callback=self._on_detection, cb=dict(use_bdaddr=True))
+                await scanner.start()
+                self._scanner = scanner
+
+    async def _stop(self):
+        async with self._lock:
+            if self._scanner is not None and not self._pending:
+                scanner, self._scanner = self._scanner, None
+                await scanner.stop()
+
+
+_shared_scanner = None
+_default_cache = None
+
+
+def shared_scanner() -> SharedScanner:
+    global _shared_scanner
+    if _shared_scanner is None:
+        _shared_scanner = SharedScanner()
+    return _shared_scanner
+
+
+def default_cache() -> DeviceCache:
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = DeviceCache()
+    return _default_cache
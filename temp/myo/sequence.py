@@ -0,0 +1,263 @@
+"""
+    myo.sequence
+    ------------
+    Sample order and packet loss of the raw EMG stream, reconstructed from
+    the EMG0-3 characteristic rotation and the host timestamps
+"""
+import math
+
+import numpy as np
+
+from .constants import EMG_DEFAULT_STREAMING_RATE
+from .profile import Handle
+from .types import EMGData
+
+# the band sends the 2-sample packets round-robin over EMG0, EMG1, EMG2, EMG3
+_SLOTS = {
+    Handle.EMG0_DATA: 0,
+    Handle.EMG1_DATA: 1,
+    Handle.EMG2_DATA: 2,
+    Handle.EMG3_DATA: 3,
+}
+
+
+class EMGBlock:
+    """
+    <> consecutive samples of the uniform EMG series
+       index: (n,) sample number, t: (n,) host time, emg: (n, 8) float32,
+       gap: (n,) bool, True for the NaN rows standing in for a dropped packet
+    """
+
+    __slots__ = ("index", "t", "emg", "gap")
+
+    def __init__(self, index, t, emg, gap):
+        self.index = index
+        self.t = t
+        self.emg = emg
+        self.gap = gap
+
+    def __len__(self):
+        return len(self.index)
+
+    def __str__(self):
+        if not len(self):
+            return "EMGBlock()"
+        return f"EMGBlock({self.index[0]}..{self.index[-1]}, {int(self.gap.sum())} gap rows)"
+
+    @classmethod
+    def empty(cls):
+        return cls(np.empty(0, np.int64), np.empty(0), np.empty((0, 8), np.float32), np.empty(0, bool))
+
+
+class EMGSequencer:
+    """
+    <> numbers the raw EMG packets (SEND_EMG/SEND_RAW) and emits their samples in order
+
+       the packets carry no sequence number, so a packet's number n (n % 4 is its
+       characteristic) is inferred from the host time t of its arrival; with t0 the time
+       of packet 0 at the least latency seen so far, a packet arrives at t >= t0 + n * period,
+       where period is fitted to the least-latency arrivals over window seconds (the band
+       clock drifts from the nominal rate; the nominal period is used until the fit spans
+       window / 10 seconds) and the least latency slowly forgets a fast one:
+         - the characteristics skipped since the newest packet are dropped packets
+         - a packet arriving before its time is from the rotation before: it fills the
+           hole it left if that is not emitted yet, else it is dropped as late
+         - when the newest depth packets all arrived a rotation (4 packets) or more after
+           their time, whole rotations were dropped and they are renumbered; a host that
+           is only stalled delivers the backlog at once and catches up instead
+       the newest depth packets are held back for the above; holes are then skipped,
+       or emitted as NaN rows with fill=True so the output is a uniform rate-Hz series
+    """
+
+    def __init__(self, rate=EMG_DEFAULT_STREAMING_RATE, depth=4, fill=False, window=10.0):
+        self.rate = rate
+        self.depth = depth
+        self.fill = fill
+        self.period = 2.0 / rate  # one packet per 2 samples, nominal
+        self.window = window
+        self._decay = math.exp(-self.period / window)
+        # the n variance of packets spread evenly over window / 10 seconds
+        self._min_var = (window / 10 / self.period) ** 2 / 12
+        self.reset()
+
+    def reset(self):
+        """
+        <> start a new series, numbered from the next packet
+        """
+        self.packets = 0
+        self.dropped = 0
+        self.reordered = 0
+        self.duplicates = 0
+        self.late = 0  # arrived after their hole was emitted
+        self._pending = {}  # packet number -> 16 values, sample1 + sample2
+        self._first = None  # number of the first packet
+        self._next = None  # the next packet number to emit
+        self._newest = None  # the highest packet number received
+        self._origin = None  # (number, host time) of the first packet, the fit is relative to it
+        self._fit = [0.0] * 5  # weight, n, t, n*n, n*t of the least-latency arrivals
+        self._floor = 0.0  # the least latency seen, above the fitted line
+        self._nominal_floor = 0.0  # the least latency seen, above the nominal line through the first packet
+        self._behind = []  # (number, lateness) of the newest packets, all a rotation late
+        self._t_first = None
+        self._t_last = None
+
+    def push(self, t, handle, emg) -> EMGBlock:
+        """
+        <> add a packet from handle (Handle or int) received at host time t,
+           emg: EMGData or its 16 values; returns the samples that became final
+        """
+        slot = _SLOTS[Handle(handle)]
+        if isinstance(emg, EMGData):
+            emg = emg.sample1 + emg.sample2
+        self.packets += 1
+        self._t_last = t
+        if self._newest is None:
+            self._first = self._next = self._newest = slot
+            self._origin = (slot, t)
+            self._fit_point(slot, t)
+            self._t_first = t
+            self._pending[slot] = emg
+            return EMGBlock.empty()
+
+        n = self._number(t, slot)
+        if n is None:
+            self.late += 1
+            return EMGBlock.empty()
+        if n in self._pending:
+            self.duplicates += 1
+            return EMGBlock.empty()
+        self._pending[n] = emg
+        lateness = t - self._time(n)
+        nominal = t - self._origin[1] - self.period * (n - self._origin[0])
+        # near the floor of either line: a fit gone wrong still gets the points to correct itself
+        if lateness < self.period or nominal - self._nominal_floor < self.period:
+            self._fit_point(n, t)
+        # forgets 1ms per second, for the fitted line moving after a stall
+        self._floor = min(self._floor + self.period * 1e-3, t - self._line(n))
+        self._nominal_floor = min(self._nominal_floor + self.period * 1e-3, nominal)
+        if n > self._newest:
+            self._newest = n
+            self._track(n, lateness)
+        return self._emit(self._newest - self.depth)
+
+    def flush(self) -> EMGBlock:
+        """
+        <> emit everything held back for late packets
+        """
+        if self._newest is None:
+            return EMGBlock.empty()
+        return self._emit(self._newest)
+
+    @property
+    def effective_rate(self) -> float:
+        """
+        <> samples per second actually received
+        """
+        if self._t_first is None or self._t_last <= self._t_first:
+            return 0.0
+        return 2 * (self.packets - self.duplicates - self.late) / (self._t_last - self._t_first)
+
+    def stats(self) -> dict:
+        received = self.packets - self.duplicates - self.late
+        return {
+            "packets": self.packets,
+            "dropped": self.dropped,
+            "reordered": self.reordered,
+            "duplicates": self.duplicates,
+            "late": self.late,
+            "loss": self.dropped / (self.dropped + received) if self.dropped + received else 0.0,
+            "effective_rate": self.effective_rate,
+        }
+
+    @property
+    def fitted_period(self) -> float:
+        """
+        <> seconds per packet of the band clock, within 5% of the nominal period
+           (the nominal period until the fitted arrivals span window / 10 seconds)
+        """
+        weight, sn, st, snn, snt = self._fit
+        if weight == 0:
+            return self.period
+        mn = sn / weight
+        var = snn / weight - mn * mn
+        if var < self._min_var:
+            return self.period
+        slope = (snt / weight - mn * st / weight) / var
+        return min(max(slope, 0.95 * self.period), 1.05 * self.period)
+
+    def _fit_point(self, n, t):
+        n, t = n - self._origin[0], t - self._origin[1]
+        d = self._decay
+        f = self._fit
+        self._fit = [f[0] * d + 1, f[1] * d + n, f[2] * d + t, f[3] * d + n * n, f[4] * d + n * t]
+
+    def _line(self, n):
+        """
+        <> host time of packet n on the line fitted through the least-latency arrivals
+        """
+        weight, sn, st = self._fit[:3]
+        period = self.fitted_period
+        return self._origin[1] + st / weight + period * (n - self._origin[0] - sn / weight)
+
+    def _time(self, n):
+        """
+        <> host time of packet n at the least latency
+        """
+        return self._line(n) + self._floor
+
+    def _number(self, t, slot):
+        """
+        <> the number of a packet from slot arriving at t, None for a late one
+        """
+        newest = self._newest
+        n = newest + 1 + (slot - newest - 1) % 4
+        if t - self._time(n) < -self.period / 2:
+            hole = n - 4
+            if self._next <= hole and hole not in self._pending:
+                self.reordered += 1
+                return hole
+            if self._first <= hole < self._next:
+                return None
+        return n
+
+    def _track(self, n, lateness):
+        """
+        <> renumber the newest depth packets if they are all a rotation or more late
+        """
+        rotation = 4 * self.period
+        if lateness < rotation - self.period:
+            self._behind = []
+            return
+        # the emitted ones keep their numbers
+        self._behind = [b for b in self._behind if b[0] >= self._next]
+        self._behind.append((n, lateness))
+        if len(self._behind) < max(self.depth, 1):
+            return
+        shift = 4 * math.floor((min(late for _, late in self._behind) + self.period) / rotation)
+        for n, _ in reversed(self._behind):
+            self._pending[n + shift] = self._pending.pop(n)
+        self._newest += shift
+        self._behind = []
+
+    def _emit(self, until) -> EMGBlock:
+        if self._next > until:
+            return EMGBlock.empty()
+        span = range(self._next, until + 1)
+        received = [n for n in span if n in self._pending]
+        self.dropped += len(span) - len(received)
+        self._next = until + 1
+        numbers = span if self.fill else received
+        if not numbers:
+            return EMGBlock.empty()
+
+        emg = np.full((len(numbers), 16), np.nan, dtype=np.float32)
+        gap = np.ones(len(numbers), dtype=bool)
+        for i, n in enumerate(numbers):
+            values = self._pending.pop(n, None)
+            if values is not None:
+                emg[i] = values
+                gap[i] = False
+        index = (2 * np.array(numbers, dtype=np.int64)[:, None] + np.arange(2)).ravel()
+        # the second sample of packet n is the newest at its arrival
+        t = self._time((index - 1) / 2)
+        return EMGBlock(index, t, emg.reshape(-1, 8), np.repeat(gap, 2))
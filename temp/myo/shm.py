@@ -0,0 +1,118 @@
+"""
+    myo.shm
+    ------------
+    A single-writer shared-memory ring buffer of fixed-width frames,
+    for handing samples from the acquisition process to a plotting process
+"""
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+_HEADER_BYTES = 64  # int64 write count and claimed count, padded to a cache line
+
+
+class SharedRing:
+    """
+    <> capacity frames of width values (dtype) with a float64 timestamp each
+
+       the writer claims the slots, fills them and then publishes the total number of
+       frames written; readers remember the count they have seen and copy whatever is new.
+       A reader that falls more than capacity frames behind loses the oldest frames
+    """
+
+    def __init__(self, shm, capacity, width, dtype, owner):
+        self._shm = shm
+        self._owner = owner
+        self.capacity = capacity
+        self.width = width
+        self.dtype = np.dtype(dtype)
+        buf = shm.buf
+        self._count = np.ndarray((1,), dtype=np.int64, buffer=buf, offset=0)
+        self._claimed = np.ndarray((1,), dtype=np.int64, buffer=buf, offset=8)  # frames written or being written
+        self._t = np.ndarray((capacity,), dtype=np.float64, buffer=buf, offset=_HEADER_BYTES)
+        self._data = np.ndarray(
+            (capacity, width), dtype=self.dtype, buffer=buf, offset=_HEADER_BYTES + 8 * capacity
+        )
+
+    @staticmethod
+    def nbytes(capacity, width, dtype) -> int:
+        return _HEADER_BYTES + 8 * capacity + np.dtype(dtype).itemsize * capacity * width
+
+    @classmethod
+    def create(cls, capacity=4096, width=8, dtype=np.float32, name=None):
+        shm = shared_memory.SharedMemory(name=name, create=True, size=cls.nbytes(capacity, width, dtype))
+        ring = cls(shm, capacity, width, dtype, owner=True)
+        ring._count[0] = 0
+        ring._claimed[0] = 0
+        return ring
+
+    @classmethod
+    def attach(cls, name, capacity=4096, width=8, dtype=np.float32):
+        try:
+            shm = shared_memory.SharedMemory(name=name, track=False)
+        except TypeError:
+            # python < 3.13 registers attached segments too, and would unlink them on exit
+            shm = shared_memory.SharedMemory(name=name)
+            resource_tracker.unregister(shm._name, "shared_memory")
+        return cls(shm, capacity, width, dtype, owner=False)
+
+    @property
+    def name(self) -> str:
+        return self._shm.name
+
+    @property
+    def count(self) -> int:
+        """
+        <> total number of frames written so far
+        """
+        return int(self._count[0])
+
+    def write(self, t, frame):
+        """
+        <> append one frame
+        """
+        n = int(self._count[0])
+        i = n % self.capacity
+        self._claimed[0] = n + 1
+        self._data[i] = frame
+        self._t[i] = t
+        self._count[0] = n + 1
+
+    def write_many(self, t, frames):
+        """
+        <> append (k,) timestamps and (k, width) frames
+        """
+        frames = np.asarray(frames)
+        k = len(frames)
+        n = int(self._count[0])
+        self._claimed[0] = n + k
+        if k > self.capacity:
+            t, frames = t[-self.capacity :], frames[-self.capacity :]
+            n += k - self.capacity
+            k = self.capacity
+        idx = (n + np.arange(k)) % self.capacity
+        self._data[idx] = frames
+        self._t[idx] = t
+        self._count[0] = n + k
+
+    def read_since(self, seen):
+        """
+        <> (count, t, frames) for the frames written after the first `seen` ones
+           the copies are checked against concurrent overwrites by the writer
+        """
+        count = int(self._count[0])
+        start = max(seen, count - self.capacity)
+        idx = np.arange(start, count) % self.capacity
+        t = self._t[idx]
+        frames = self._data[idx]
+        # slots the writer claimed while we copied, including the ones still being written, are no longer valid
+        overwritten = int(self._claimed[0]) - self.capacity - start
+        if overwritten > 0:
+            t, frames = t[overwritten:], frames[overwritten:]
+        return count, t, frames
+
+    def close(self):
+        self._count = self._t = self._data = None
+        self._shm.close()
+        if self._owner:
+            self._shm.unlink()
@@ -0,0 +1,291 @@
+"""
+    myo.stream
+    ------------
+    A bounded buffer between the notification handler and
+    the consumers of MyoClient.stream()
+"""
+import asyncio
+from collections import deque
+from enum import Enum
+
+from .profile import Handle
+
+
+# kinds accepted by MyoClient.stream() and the handles they subscribe to
+STREAM_KINDS = {
+    "classifier": (Handle.CLASSIFIER_EVENT,),
+    "emg": (Handle.EMG0_DATA, Handle.EMG1_DATA, Handle.EMG2_DATA, Handle.EMG3_DATA),
+    "fv": (Handle.FV_DATA,),
+    "imu": (Handle.IMU_DATA,),
+    "motion": (Handle.MOTION_EVENT,),
+}
+
+
+# fmt: off
+class OverflowPolicy(Enum):
+    BLOCK = "block"              # the producer waits for room (stalls the notification handler)
+    DROP_OLDEST = "drop-oldest"  # evict the oldest buffered item
+    DROP_NEWEST = "drop-newest"  # discard the incoming item
+# fmt: on
+
+
+class StreamBuffer:
+    """
+    <> bounded FIFO with an overflow policy and batched, latency-bounded reads
+    """
+
+    def __init__(self, maxsize=1024, policy=OverflowPolicy.DROP_OLDEST):
+        if maxsize < 1:
+            raise ValueError(f"maxsize must be positive: {maxsize}")
+        self.maxsize = maxsize
+        self.policy = OverflowPolicy(policy)
+        self.received = 0
+        self.dropped = 0
+        self._items = deque()
+        self._closed = False
+        self._wanted = 1  # wake the consumer once this many items are buffered
+        self._ready = asyncio.Event()
+        self._room = asyncio.Event()
+
+    def __len__(self):
+        return len(self._items)
+
+    @property
+    def closed(self):
+        return self._closed
+
+    def close(self):
+        """
+        <> stop accepting items; consumers drain what is left
+        """
+        self._closed = True
+        self._ready.set()
+        self._room.set()
+
+    def put_nowait(self, item) -> bool:
+        """
+        <> append item unless the buffer is full under BLOCK, return whether it was accepted
+        """
+        if self._closed:
+            return False
+        self.received += 1
+        items = self._items
+        if len(items) >= self.maxsize:
+            if self.policy == OverflowPolicy.DROP_OLDEST:
+                items.popleft()
+                self.dropped += 1
+            elif self.policy == OverflowPolicy.DROP_NEWEST:
+                self.dropped += 1
+                return True
+            else:
+                self.received -= 1
+                return False
+        items.append(item)
+        if len(items) >= self._wanted:
+            self._ready.set()
+        return True
+
+    def put_marker(self, item) -> bool:
+        """
+        <> append item whatever the policy, past maxsize if the buffer is full,
+           for the markers (e.g. myo.core.Gap) a consumer must not miss
+        """
+        if self._closed:
+            return False
+        self.received += 1
+        self._items.append(item)
+        self._ready.set()
+        return True
+
+    async def put(self, item):
+        """
+        <> append item, waiting for room under BLOCK
+        """
+        while not self.put_nowait(item):
+            if self._closed:
+                return
+            self._room.clear()
+            await self._room.wait()
+
+    async def get_batch(self, batch_size=1, max_latency=None) -> list:
+        """
+        <> wait for at least one item, then up to max_latency seconds for batch_size items
+           returns [] once the buffer is closed and drained
+        """
+        items = self._items
+        while not items:
+            if self._closed:
+                return []
+            self._wanted = 1
+            self._ready.clear()
+            await self._ready.wait()
+
+        if len(items) < batch_size and max_latency:
+            loop = asyncio.get_running_loop()
+            deadline = loop.time() + max_latency
+            self._wanted = batch_size
+            try:
+                while len(items) < batch_size and not self._closed:
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        break
+                    self._ready.clear()
+                    try:
+                        await asyncio.wait_for(self._ready.wait(), remaining)
+                    except asyncio.TimeoutError:
+                        break
+            finally:
+                self._wanted = 1
+
+        n = min(batch_size, len(items))
+        batch = [items.popleft() for _ in range(n)]
+        self._room.set()
+        return batch
+
+
+class MyoStream:
+    """
+    <> async iterator over batches of (Handle, host monotonic time, decoded data)
+    """
+
+    def __init__(self, client, handles, batch_size, max_latency, buffer: StreamBuffer):
+        self._client = client
+        self.handles = handles
+        self.batch_size = batch_size
+        self.max_latency = max_latency
+        self.buffer = buffer
+
+    @property
+    def dropped(self):
+        return self.buffer.dropped
+
+    @property
+    def received(self):
+        return self.buffer.received
+
+    def close(self):
+        """
+        <> detach from the client and end the iteration after the buffered items
+        """
+        self._client._remove_stream(self)
+        self.buffer.close()
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        batch = await self.buffer.get_batch(self.batch_size, self.max_latency)
+        if not batch:
+            self.close()
+            raise StopAsyncIteration
+        return batch
+
+
+class TaggedBuffer:
+    """
+    <> one client's feed into a MergedStream: items become (tag, Handle, host time, data)
+    """
+
+    def __init__(self, merged, tag):
+        self.tag = tag
+        self.received = 0
+        self._merged = merged
+        self._closed = False
+
+    @property
+    def policy(self):
+        return self._merged.buffer.policy
+
+    @property
+    def closed(self):
+        return self._closed
+
+    def put_nowait(self, item) -> bool:
+        if self._closed:
+            return False
+        buf = self._merged.buffer
+        received = buf.received
+        accepted = buf.put_nowait((self.tag,) + item)
+        self.received += buf.received - received
+        return accepted
+
+    def put_marker(self, item) -> bool:
+        if self._closed:
+            return False
+        self.received += 1
+        return self._merged.buffer.put_marker((self.tag,) + item)
+
+    async def put(self, item):
+        if self._closed:
+            return
+        buf = self._merged.buffer
+        received = buf.received
+        await buf.put((self.tag,) + item)
+        self.received += buf.received - received
+
+    def close(self):
+        """
+        <> stop feeding; the merged stream ends once all of its feeds are closed
+        """
+        if not self._closed:
+            self._closed = True
+            self._merged._feed_closed()
+
+
+class MergedStream:
+    """
+    <> async iterator over batches of (tag, Handle, host time, decoded data) from several clients
+       sharing one StreamBuffer, see myo.group.MyoGroup.stream
+    """
+
+    def __init__(self, batch_size, max_latency, buffer: StreamBuffer):
+        self.batch_size = batch_size
+        self.max_latency = max_latency
+        self.buffer = buffer
+        self.streams = {}  # tag -> MyoStream
+
+    def attach(self, tag, client, kinds):
+        """
+        <> feed the notifications of kinds from client into this stream, tagged with tag
+        """
+        if tag in self.streams:
+            raise ValueError(f"duplicate stream tag: {tag}")
+        self.streams[tag] = client.stream(
+            kinds=kinds,
+            batch_size=self.batch_size,
+            max_latency=self.max_latency,
+            buffer=TaggedBuffer(self, tag),
+        )
+
+    @property
+    def dropped(self):
+        return self.buffer.dropped
+
+    @property
+    def received(self) -> dict:
+        """
+        <> tag -> number of items received
+        """
+        return {tag: s.buffer.received for tag, s in self.streams.items()}
+
+    def close(self):
+        """
+        <> detach from all clients and end the iteration after the buffered items
+        """
+        for s in self.streams.values():
+            s.close()
+        self.buffer.close()
+
+    def _feed_closed(self):
+        if all(s.buffer.closed for s in self.streams.values()):
+            self.buffer.close()
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        batch = await self.buffer.get_batch(self.batch_size, self.max_latency)
+        if not batch:
+            self.close()
+            raise StopAsyncIteration
+        return batch
@@ -16,6 +16,16 @@ from .constants import (
     ORIENTATION_SCALE,
 )
 
+# precompiled decoders, unpack_from reads the notification buffer in place
+_CLASSIFIER_EVENT = struct.Struct("<6B")
+_CLASSIFIER_POSE = struct.Struct("<H")  # at offset 1 of myohw_classifier_event_t
+_EMG_DATA = struct.Struct("<16b")  # 2 samples * 8 channels
+_FV_DATA = struct.Struct("<8Hb")
+_FW_INFO = struct.Struct("<6BH12B")  # 20 bytes
+_FW_VERSION = struct.Struct("<4H")  # 4x uint16_t
+_IMU_DATA = struct.Struct("<10h")
+_MOTION_EVENT = struct.Struct("<3b")
+
 
 class Arm(Enum):
     RIGHT = 0x01
@@ -25,20 +35,19 @@ class Arm(Enum):
 
 # -> myohw_classifier_event_t
 class ClassifierEvent:
+    __slots__ = ("t", "arm", "x_direction", "pose", "sync_result")
+
     def __init__(self, data):
         # ClassifierEvent is a union
-        t = struct.unpack('<6B', data)[0]
-        self.t = ClassifierEventType(t)
+        u = _CLASSIFIER_EVENT.unpack_from(data)
+        self.t = ClassifierEventType(u[0])
         if self.t == ClassifierEventType.ARM_SYNCED:
-            _, a, x, _, _, _ = struct.unpack("<6B", data)
-            self.arm = Arm(a)
-            self.x_direction = XDirection(x)
+            self.arm = Arm(u[1])
+            self.x_direction = XDirection(u[2])
         elif self.t == ClassifierEventType.POSE:
-            _, p, _, _, _ = struct.unpack("<BH3B", data)
-            self.pose = Pose(p)
+            self.pose = Pose(_CLASSIFIER_POSE.unpack_from(data, 1)[0])
         elif self.t == ClassifierEventType.SYNC_FAILED:
-            _, s, _, _, _, _ = struct.unpack("<6B", data)
-            self.sync_result = SyncResult(s)
+            self.sync_result = SyncResult(u[1])
 
     def __repr__(self):
         if self.t == ClassifierEventType.ARM_SYNCED:
@@ -93,9 +102,12 @@ class ClassifierModelType(Enum):
 
 # -> myohw_emg_data_t (Raw EMG data received in a myohw_att_handle_emg_data_#)
 class EMGData:
+    __slots__ = ("sample1", "sample2")
+
     def __init__(self, data):
-        self.sample1 = struct.unpack("<8b", data[:8])
-        self.sample2 = struct.unpack("<8b", data[8:])
+        u = _EMG_DATA.unpack_from(data)
+        self.sample1 = u[:8]
+        self.sample2 = u[8:]
 
     def __str__(self):
         return str(self.sample1 + self.sample2)
@@ -110,8 +122,10 @@ class EMGData:
 # for the FV_DATA in the old firmware versions (?)
 # cf. https://github.com/dzhu/myo-raw/blob/6873d04d647702b304b0592ee25994d196659bb0/myo_raw.py#LL276C11-L276C11
 class FVData:
+    __slots__ = ("fv", "mask")
+
     def __init__(self, data):
-        u = struct.unpack('<8Hb', data)
+        u = _FV_DATA.unpack_from(data)
         self.fv = u[:8]
         self.mask = u[8]
 
@@ -141,8 +155,19 @@ class EMGMode(Enum):
 
 # -> myohw_fw_info_t
 class FirmwareInfo:
+    __slots__ = (
+        "_serial_number",
+        "_unlock_pose",
+        "_active_classifier_type",
+        "_active_classifier_index",
+        "_has_custom_classifier",
+        "_stream_indicating",
+        "_sku",
+        "_reserved",
+    )
+
     def __init__(self, data):
-        u = struct.unpack("<6BH12B", data)  # 20 bytes
+        u = _FW_INFO.unpack_from(data)
         ser = list(u[:6])
         ser.reverse()
         ser = [hex(i)[-2:] for i in ser]
@@ -155,6 +180,10 @@ class FirmwareInfo:
         self._sku = SKU(u[11]).name
         self._reserved = u[12:]
 
+    @property
+    def serial_number(self):
+        return self._serial_number
+
     def to_dict(self):
         return {
             "serial_number": self._serial_number,
@@ -169,13 +198,31 @@ class FirmwareInfo:
 
 # -> myohw_fw_version_t
 class FirmwareVersion:
+    __slots__ = ("_major", "_minor", "_patch", "_hardware_rev")
+
     def __init__(self, data):
-        u = struct.unpack("<4H", data)  # 4x uint16_t
+        u = _FW_VERSION.unpack_from(data)
         self._major = u[0]
         self._minor = u[1]
         self._patch = u[2]
         self._hardware_rev = HardwareRev(u[3])
 
+    @property
+    def major(self):
+        return self._major
+
+    @property
+    def minor(self):
+        return self._minor
+
+    @property
+    def patch(self):
+        return self._patch
+
+    @property
+    def hardware_rev(self):
+        return self._hardware_rev
+
     def __str__(self):
         return f"{self._major}.{self._minor}.{self._patch}.{self._hardware_rev.name}"
 
@@ -191,6 +238,8 @@ class HardwareRev(Enum):
 # -> myohw_imu_data_t
 class IMUData:
     class Orientation:
+        __slots__ = ("w", "x", "y", "z")
+
         def __init__(self, w, x, y, z):
             self.w = w / ORIENTATION_SCALE
             self.x = x / ORIENTATION_SCALE
@@ -203,11 +252,13 @@ class IMUData:
         def to_dict(self):
             return {"w": self.w, "x": self.x, "y": self.y, "z": self.z}
 
+    __slots__ = ("orientation", "accelerometer", "gyroscope")
+
     def __init__(self, data):
-        u = struct.unpack("<10h", data)
+        u = _IMU_DATA.unpack_from(data)
         self.orientation = self.Orientation(u[0], u[1], u[2], u[3])
-        self.accelerometer = [v / ACCELEROMETER_SCALE for v in u[4:7]]
-        self.gyroscope = [v / GYROSCOPE_SCALE for v in u[7:10]]
+        self.accelerometer = [u[4] / ACCELEROMETER_SCALE, u[5] / ACCELEROMETER_SCALE, u[6] / ACCELEROMETER_SCALE]
+        self.gyroscope = [u[7] / GYROSCOPE_SCALE, u[8] / GYROSCOPE_SCALE, u[9] / GYROSCOPE_SCALE]
 
     def __repr__(self):
         return str(
@@ -248,12 +299,13 @@ class IMUMode(Enum):
 
 # -> myohw_motion_event_t
 class MotionEvent:
+    __slots__ = ("t", "tap_direction", "tap_count")
+
     def __init__(self, data):
-        t, _, _ = struct.unpack("<3b", data)
+        t, td, tc = _MOTION_EVENT.unpack_from(data)
         self.t = MotionEventType(t)
         # MotionEvent is a union
         if self.t == MotionEventType.TAP:
-            _, td, tc = struct.unpack("<3b", data)
             self.tap_direction = td
             self.tap_count = tc
 
@@ -0,0 +1,72 @@
+import pytest
+from myo.aggregator import Aggregator, MissingPolicy
+from myo.types import EMGData, FVData, IMUData
+
+EMG = EMGData(bytes.fromhex('090d01fefefefa0206e9fcfdfcfe0502'))
+FV = FVData(bytes.fromhex('5203ce0061007901d80062006f00730100'))
+IMU = IMUData(bytes.fromhex('3e2eab2be5f824004e01bd0757000300f5fffcff'))
+
+
+def test_fv_imu_nearest_partner():
+    agg = Aggregator(tolerance=0.005)
+    fv_late = FVData(bytes.fromhex('9b017a03d201cc000c01c4007201fc0100'))
+    assert agg.push(0.000, FV) == []
+    assert agg.push(0.010, IMU) == []
+    # the FV packet arriving 2ms after the IMU tick is nearer than the one 10ms before it
+    assert agg.push(0.012, fv_late) == []
+    frames = agg.push(0.030, IMU)
+    assert len(frames) == 1
+    assert frames[0].fvd is fv_late and frames[0].timestamp == 0.010
+    assert agg.unused_fv == 1
+    assert frames[0].to_dict().keys() == {"fvd", "imu"}
+
+
+@pytest.mark.parametrize(
+    "missing,frames,dropped",
+    [
+        (MissingPolicy.DROP, 1, 1),
+        (MissingPolicy.HOLD, 2, 0),
+        (MissingPolicy.EMPTY, 2, 0),
+    ],
+)
+def test_missing_policy(missing, frames, dropped):
+    agg = Aggregator(tolerance=0.005, missing=missing)
+    out = agg.push(0.000, FV)
+    out += agg.push(0.001, IMU)
+    out += agg.push(0.021, IMU)  # no FV near this tick
+    out += agg.push(0.040, FV) + agg.flush()
+    assert len(out) == frames
+    assert agg.dropped_frames == dropped
+    assert agg.missing_fv == 1
+    if missing == MissingPolicy.HOLD:
+        assert out[1].fvd is FV
+    elif missing == MissingPolicy.EMPTY:
+        assert out[1].fvd is None
+
+
+def test_emg_window():
+    agg = Aggregator(fv=False, emg=True, tolerance=0.002)
+    t = 0.0
+    out = []
+    # 200Hz EMG in 2-sample packets (100Hz) and a 50Hz IMU
+    for i in range(10):
+        out += agg.push(t + 0.01 * i, EMG)
+        if i % 2 == 1:
+            out += agg.push(t + 0.01 * i, IMU)
+    out += agg.flush()
+    assert len(out) == 5
+    assert all(len(ad.emg) == 4 for ad in out)
+    assert out[0].emg == (EMG.sample1, EMG.sample2, EMG.sample1, EMG.sample2)
+    assert out[0].to_dict()["emg"][0] == list(EMG.sample1)
+
+
+def test_partners_are_trimmed_without_imu():
+    agg = Aggregator(emg=True, tolerance=0.005)
+    # the IMU stream is missing: nothing would drain the FV and EMG packets
+    for i in range(1000):
+        assert agg.push(0.01 * i, FV) == [] and agg.push(0.01 * i, EMG) == []
+    assert len(agg._fv) <= 2 and len(agg._emg) <= agg.emg_window + 2
+    assert agg.unused_fv >= 998 and agg.unused_emg >= 2000 - agg.emg_window - 2
+    # a late IMU tick still finds its partners
+    frames = agg.push(9.99, IMU) + agg.flush()
+    assert len(frames) == 1 and frames[0].fvd is FV and len(frames[0].emg) == 4
@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+from myo.batch import decode_emg, decode_fv, decode_imu
+from myo.types import EMGData, FVData, IMUData
+
+EMG_BLOBS = [
+    bytes.fromhex('090d01fefefefa0206e9fcfdfcfe0502'),
+    bytes.fromhex('fe0200ff0000ff0304110000fefe0304'),
+    bytes.fromhex('05fe00000204151ef2f3fffe02fc01ed'),
+]
+FV_BLOBS = [
+    bytes.fromhex('5203ce0061007901d80062006f00730100'),
+    bytes.fromhex('ffffffffffffffffffffffffffffffff00'),
+]
+IMU_BLOBS = [
+    bytes.fromhex('3e2eab2be5f824004e01bd0757000300f5fffcff'),
+    bytes.fromhex('5c2d9e2c23f99cff03fc1a06eaf94900feffe3ff'),
+]
+
+
+@pytest.mark.parametrize("as_buffer", [False, True])
+def test_decode_emg(as_buffer):
+    arr = decode_emg(b"".join(EMG_BLOBS) if as_buffer else EMG_BLOBS)
+    assert arr.shape == (6, 8) and arr.dtype == np.int8
+    expected = []
+    for blob in EMG_BLOBS:
+        emg = EMGData(blob)
+        expected += [emg.sample1, emg.sample2]
+    assert arr.tolist() == [list(s) for s in expected]
+
+
+def test_decode_fv():
+    fv, mask = decode_fv(FV_BLOBS)
+    assert fv.shape == (2, 8) and fv.dtype == np.uint16
+    assert fv.tolist() == [list(FVData(b).fv) for b in FV_BLOBS]
+    assert mask.tolist() == [FVData(b).mask for b in FV_BLOBS]
+
+
+def test_decode_imu():
+    arr = decode_imu(bytearray(b"".join(IMU_BLOBS)))
+    assert arr.shape == (2, 10) and arr.dtype == np.float32
+    for row, blob in zip(arr, IMU_BLOBS):
+        imu = IMUData(blob)
+        o = imu.orientation
+        expected = [o.w, o.x, o.y, o.z] + imu.accelerometer + imu.gyroscope
+        np.testing.assert_allclose(row, expected, rtol=1e-6)
+
+
+def test_decode_bad_length():
+    with pytest.raises(ValueError):
+        decode_emg(EMG_BLOBS[0][:15])
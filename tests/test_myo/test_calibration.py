@@ -0,0 +1,127 @@
+import asyncio
+
+import numpy as np
+import pytest
+from myo import MyoClient
+from myo.calibration import (
+    CalibrationProfile,
+    Calibrator,
+    QuantileSketch,
+    RunningStats,
+    load_profile,
+)
+from myo.filters import EMGFilterBank
+from myo.info import clear_cache
+from myo.replay import ReplayBackend, synthetic_source
+from myo.sequence import EMGBlock
+from myo.types import ClassifierMode, EMGMode, IMUMode
+
+
+@pytest.fixture
+def x():
+    rng = np.random.default_rng(0)
+    return rng.normal(100, 20, (5000, 8)) * np.arange(1, 9)
+
+
+def test_running_stats(x):
+    stats = RunningStats()
+    y = x.copy()
+    y[10:20, 3] = np.nan
+    for i in range(0, len(y), 37):
+        stats.push(y[i : i + 37])
+    assert stats.n.tolist() == [5000, 5000, 5000, 4990, 5000, 5000, 5000, 5000]
+    assert np.allclose(stats.mean, np.nanmean(y, axis=0))
+    assert np.allclose(stats.std, np.nanstd(y, axis=0, ddof=1))
+    assert np.allclose(stats.max, np.nanmax(y, axis=0))
+
+
+def test_sketch_within_alpha(x):
+    sketch = QuantileSketch(alpha=0.01)
+    signed = x - 300
+    for i in range(0, len(signed), 100):
+        sketch.push(signed[i : i + 100])
+    for p in (1, 50, 99):
+        exact = np.percentile(signed, p, method="lower", axis=0)
+        assert np.all(np.abs(sketch.percentile(p) - exact) <= 0.011 * np.abs(exact) + 1e-3)
+    assert np.isnan(QuantileSketch(channels=2).percentile(50)).all()
+
+
+def test_calibrate_and_normalize(tmp_path):
+    rng = np.random.default_rng(1)
+    cal = Calibrator("8e3294853bd2", channels=2)
+    gain = np.array([10.0, 300.0])
+    cal.begin("rest")
+    rest = rng.uniform(0.9, 1.1, (400, 2)) * gain * 0.1
+    # no profile yet: "mvc" passes the samples through, as float32 like the normalized ones
+    passed = cal.process(rest)
+    assert passed.dtype == np.float32 and np.array_equal(passed, rest.astype(np.float32))
+    # a reconnect in the middle of the calibration keeps its statistics
+    cal.reset()
+    assert cal.phase == "rest" and cal.stats["rest"].n.tolist() == [400, 400]
+    cal.begin("mvc")
+    cal.process(rng.uniform(0, 1, (400, 2)) * gain)
+    profile = cal.end()
+    assert profile.baseline == pytest.approx(gain * 0.1, rel=0.05)
+    assert profile.mvc == pytest.approx(gain * 0.99, rel=0.03)
+
+    y = cal.process(np.stack([gain * 0.1, gain]))
+    assert y.dtype == np.float32
+    assert y == pytest.approx(np.array([[0, 0], [1, 1]]), abs=0.05)
+
+    profile.save(str(tmp_path))
+    loaded = load_profile("8e3294853bd2", directory=str(tmp_path))
+    assert np.array_equal(loaded.mvc, profile.mvc)
+    assert np.array_equal(loaded.percentiles[99], profile.percentiles[99])
+    assert load_profile("8e3294853bd2", "fv", str(tmp_path)) is None
+
+
+def test_zscore_is_live():
+    cal = Calibrator(channels=1, mode="zscore")
+    cal.begin("rest")
+    cal.process(np.array([[1.0], [3.0]]))
+    block = EMGBlock(np.arange(2), np.zeros(2), np.array([[2.0], [np.nan]], np.float32), np.array([False, True]))
+    out = cal.process(block)
+    assert out.index.tolist() == [0, 1]
+    assert out.emg[0, 0] == pytest.approx(0.0)
+    assert np.isnan(out.emg[1, 0])
+    with pytest.raises(ValueError):
+        Calibrator(mode="minmax")
+
+
+class SampleClient(MyoClient):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.blocks = []
+
+    async def on_emg_samples(self, block):
+        self.blocks.append(block)
+
+
+def test_client_profile(tmp_path):
+    clear_cache()
+    profile = CalibrationProfile("D2:3B:85:94:32:8E", "emg", [0] * 8, [1] * 8, [0] * 8, [2] * 8, {})
+    profile.save(str(tmp_path))
+
+    async def run():
+        backend = ReplayBackend(synthetic_source(duration=1.0), speed=None)
+        client = await SampleClient.with_device(backend=backend, sequence_emg=True)
+        client.add_emg_stage(EMGFilterBank(envelope=None))
+        cal = await client.add_calibrator(directory=str(tmp_path))
+        await client.setup(classifier_mode=ClassifierMode.DISABLED, emg_mode=EMGMode.SEND_RAW, imu_mode=IMUMode.NONE)
+        await client.start()
+        await client._client.wait_done()
+        await client.stop()
+        await client.disconnect()
+        return client, cal
+
+    client, cal = asyncio.run(run())
+    assert cal.serial_number == "D2:3B:85:94:32:8E"
+    assert cal.profile.mvc.tolist() == [2.0] * 8
+    emg = np.concatenate([b.emg for b in client.blocks])
+    assert len(emg) == 200
+    filtered = EMGFilterBank(envelope=None).process(
+        np.frombuffer(
+            b"".join(p for _, h, p in synthetic_source(duration=1.0) if h.name.startswith("EMG")), dtype=np.int8
+        ).reshape(-1, 8)
+    )
+    assert np.allclose(emg, filtered / 2, atol=1e-3)
@@ -0,0 +1,93 @@
+import asyncio
+
+import pytest
+from myo.commands import LED, SetMode, SetSleepMode, Vibrate, encode
+from myo.constants import RGB_CYAN, RGB_GREEN, RGB_ORANGE, RGB_PINK
+from myo.control import CommandQueue
+from myo.replay import ReplayClient, ReplayDevice
+from myo.types import ClassifierMode, EMGMode, IMUMode, SleepMode, VibrationType
+
+
+async def connected(latency=0.01):
+    client = ReplayClient(ReplayDevice("D2:3B:85:94:32:8E"), iter(()), latency=latency)
+    await client.connect()
+    return client
+
+
+def test_data_and_encode():
+    class Counting(SetSleepMode):
+        calls = 0
+
+        @property
+        def payload(self):
+            Counting.calls += 1
+            return super().payload
+
+    assert Counting(SleepMode.NEVER_SLEEP).data == bytearray([0x09, 0x01, 0x01])
+    assert Counting.calls == 1
+    a = encode(SetMode(ClassifierMode.DISABLED, EMGMode.SEND_FILT, IMUMode.NONE))
+    b = encode(SetMode(ClassifierMode.DISABLED, EMGMode.SEND_FILT, IMUMode.NONE))
+    assert a is b and a == bytes([0x01, 0x03, 0x01, 0x00, 0x00])
+    assert encode(LED(RGB_PINK, RGB_PINK)) == bytes([0x06, 0x06] + RGB_PINK * 2)
+
+
+def test_led_burst_is_coalesced():
+    async def run():
+        client = await connected()
+        queue = CommandQueue(client)
+        loop = asyncio.get_running_loop()
+        t0 = loop.time()
+        await queue.send(SetSleepMode(SleepMode.NEVER_SLEEP))
+        waited = loop.time() - t0
+        # a UI burst while a mode change is in flight
+        mode = asyncio.create_task(queue.send(SetMode(ClassifierMode.DISABLED, EMGMode.SEND_FILT, IMUMode.NONE)))
+        await asyncio.sleep(0)
+        t0 = loop.time()
+        for color in [RGB_ORANGE, RGB_PINK, RGB_CYAN, RGB_GREEN]:
+            await queue.send(LED(color, color))
+        await queue.send(Vibrate(VibrationType.SHORT))
+        burst = loop.time() - t0
+        await mode
+        await queue.join()
+        return client.writes, queue, waited, burst
+
+    writes, queue, waited, burst = asyncio.run(run())
+    assert waited >= 0.01 and burst < 0.005
+    assert [w[1] for w in writes] == [
+        bytes([0x09, 0x01, 0x01]),
+        bytes([0x01, 0x03, 0x01, 0x00, 0x00]),
+        bytes([0x06, 0x06] + RGB_GREEN * 2),
+        bytes([0x03, 0x01, 0x01]),
+    ]
+    assert queue.coalesced == 3 and queue.written == 4
+    # the Myo command characteristic only advertises "write"
+    assert not queue.without_response and all(w[2] for w in writes)
+
+
+def test_write_without_response():
+    async def run():
+        client = await connected()
+        queue = CommandQueue(client, without_response=True)
+        await queue.send(LED(RGB_PINK, RGB_PINK))
+        await queue.send(SetSleepMode(SleepMode.NORMAL))
+        return client.writes
+
+    assert [w[2] for w in asyncio.run(run())] == [False, True]
+
+
+def test_close_fails_pending():
+    async def run():
+        client = await connected()
+        client.latency = 1.0
+        queue = CommandQueue(client)
+        first = queue.submit(SetSleepMode(SleepMode.NEVER_SLEEP))
+        second = queue.submit(SetSleepMode(SleepMode.NORMAL))
+        await asyncio.sleep(0)
+        # first is being written
+        await queue.close()
+        for fut in (first, second):
+            with pytest.raises(ConnectionError):
+                await asyncio.wait_for(fut, 0.1)
+        return queue
+
+    assert len(asyncio.run(run())) == 0
@@ -0,0 +1,89 @@
+import asyncio
+import os
+import subprocess
+import sys
+
+from myo import Handle, MyoClient
+from myo.types import ClassifierMode, EMGMode, IMUMode
+
+
+class Sender:
+    def __init__(self, handle):
+        self.handle = handle
+
+
+class RecordingClient(MyoClient):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.received = []
+
+    async def on_emg_data(self, emg):
+        self.received.append(("emg", emg.sample1 + emg.sample2))
+
+    async def on_emg_data_aggregated(self, eds):
+        self.received.append(("emg_single", eds.data))
+
+    async def on_imu_data(self, imu):
+        self.received.append(("imu", imu.gyroscope))
+
+
+def make_client(**kwargs):
+    client = RecordingClient(**kwargs)
+    client.classifier_mode = ClassifierMode.DISABLED
+    client.emg_mode = EMGMode.SEND_RAW
+    client.imu_mode = IMUMode.SEND_DATA
+    return client
+
+
+def test_build_dispatch_from_modes():
+    client = make_client()
+    client._build_dispatch()
+    assert list(client._dispatch) == [
+        Handle.EMG0_DATA.value,
+        Handle.EMG1_DATA.value,
+        Handle.EMG2_DATA.value,
+        Handle.EMG3_DATA.value,
+        Handle.IMU_DATA.value,
+    ]
+
+
+def test_notify_callback_dispatch():
+    client = make_client(aggregate_emg=True)
+    client._build_dispatch()
+    emg = bytes.fromhex('090d01fefefefa0206e9fcfdfcfe0502')
+    imu = bytes.fromhex('3e2eab2be5f824004e01bd0757000300f5fffcff')
+
+    async def run():
+        await client.notify_callback(Sender(Handle.EMG2_DATA.value), emg)
+        await client.notify_callback(Sender(Handle.IMU_DATA.value), imu)
+
+    asyncio.run(run())
+    assert client.received == [
+        ("emg_single", (9, 13, 1, -2, -2, -2, -6, 2)),
+        ("emg_single", (6, -23, -4, -3, -4, -2, 5, 2)),
+        ("imu", [0.1875, -0.6875, -0.25]),
+    ]
+
+
+def test_notify_callback_without_start():
+    # handles subscribed manually fall back to a lazily built entry
+    client = make_client()
+    emg = bytes.fromhex('fe0200ff0000ff0304110000fefe0304')
+    asyncio.run(client.notify_callback(Sender(Handle.EMG0_DATA.value), emg))
+    assert client.received == [("emg", (-2, 2, 0, -1, 0, 0, -1, 3, 4, 17, 0, 0, -2, -2, 3, 4))]
+    assert Handle.EMG0_DATA.value in client._dispatch
+
+
+def test_notify_callback_unknown_handle():
+    # a characteristic outside of myo.profile.Handle subscribed by hand
+    client = make_client()
+    asyncio.run(client.notify_callback(Sender(0x11), b"\x50"))
+    assert client.received == [] and 0x11 not in client._dispatch
+
+
+def test_import_without_numpy():
+    # numpy is only needed by the stages that use it
+    code = "import sys; sys.modules['numpy'] = None; import myo; myo.MyoClient(aggregate_all=True)"
+    path = os.path.dirname(os.path.dirname(os.path.abspath(__import__("myo").__file__)))
+    env = dict(os.environ, PYTHONPATH=path)
+    subprocess.run([sys.executable, "-c", code], check=True, env=env)
@@ -0,0 +1,119 @@
+import asyncio
+
+import numpy as np
+import pytest
+from myo import MyoClient
+from myo.features import FEATURES, FeatureExtractor, extract_features
+from myo.replay import ReplayBackend, synthetic_source
+from myo.sequence import EMGBlock
+from myo.types import ClassifierMode, EMGMode, IMUMode
+
+
+def reference(w, threshold=0.0):
+    """
+    <> the textbook definitions over one (window, channels) window
+    """
+    d = np.diff(w, axis=0)
+    return np.stack(
+        [
+            np.sqrt(np.mean(w * w, axis=0)),
+            np.mean(np.abs(w), axis=0),
+            np.sum(np.abs(d), axis=0),
+            np.sum((w[:-1] * w[1:] < 0) & (np.abs(d) >= threshold), axis=0),
+            np.sum(-d[:-1] * d[1:] > threshold, axis=0),
+        ],
+        axis=-1,
+    )
+
+
+@pytest.fixture
+def emg():
+    return np.random.default_rng(0).normal(0, 30, (1003, 8)).round()
+
+
+def test_offline_matches_definitions(emg):
+    out = extract_features(emg, window=40, hop=10, threshold=5)
+    assert out.shape == (97, 8, len(FEATURES))
+    for i in (0, 1, 50, 96):
+        w = emg[i * 10 : i * 10 + 40]
+        assert np.allclose(out[i], reference(w, threshold=5), rtol=1e-5)
+
+
+@pytest.mark.parametrize("features", [FEATURES, ("ssc", "rms")])
+def test_streaming_matches_offline(emg, features):
+    fx = FeatureExtractor(window=40, hop=10, features=features, threshold=5, resync=100)
+    out, i = [], 0
+    for n in [2, 1, 3, 64, 2, 150] * 20:
+        out.append(fx.process(emg[i : i + n]))
+        i += n
+        if i >= len(emg):
+            break
+    assert np.array_equal(np.concatenate(out), extract_features(emg, 40, 10, features, threshold=5))
+
+
+def test_windows_of_block():
+    fx = FeatureExtractor(window=4, hop=2, channels=1)
+    x = np.arange(1, 11, dtype=np.float32)[:, None]
+    x[6] = np.nan
+    block = EMGBlock(np.arange(100, 110), np.arange(10) * 0.005, x, np.isnan(x[:, 0]))
+    windows = fx.process(block)
+    assert windows.index.tolist() == [103, 105, 107, 109]
+    assert windows.t == pytest.approx([0.015, 0.025, 0.035, 0.045])
+    assert windows.gap.tolist() == [False, False, True, True]
+    assert windows.features[0, 0, FEATURES.index("mav")] == pytest.approx(2.5)
+
+
+def test_invalid():
+    with pytest.raises(ValueError):
+        FeatureExtractor(window=2)
+    with pytest.raises(ValueError):
+        FeatureExtractor(features=("rms", "mean"))
+
+
+class FeatureClient(MyoClient):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.windows = []
+
+    async def on_emg_features(self, windows):
+        self.windows.append(windows)
+
+
+def test_client_features():
+    async def run():
+        backend = ReplayBackend(synthetic_source(duration=1.0), speed=None)
+        client = await FeatureClient.with_device(backend=backend, sequence_emg=True)
+        client.features = FeatureExtractor(window=40, hop=20)
+        await client.setup(classifier_mode=ClassifierMode.DISABLED, emg_mode=EMGMode.SEND_RAW, imu_mode=IMUMode.NONE)
+        await client.start()
+        await client._client.wait_done()
+        await client.stop()
+        await client.disconnect()
+        return client
+
+    client = asyncio.run(run())
+    index = np.concatenate([w.index for w in client.windows])
+    assert index.tolist() == list(range(39, 200, 20))
+    assert np.concatenate([w.features for w in client.windows]).shape == (9, 8, 5)
+
+
+def test_features_alongside_stream():
+    async def run():
+        backend = ReplayBackend(synthetic_source(duration=1.0), speed=None)
+        client = await FeatureClient.with_device(backend=backend, sequence_emg=True)
+        client.features = FeatureExtractor(window=40, hop=20)
+        await client.setup(classifier_mode=ClassifierMode.DISABLED, emg_mode=EMGMode.SEND_RAW, imu_mode=IMUMode.NONE)
+        # on_emg_samples is not overridden, the sequencer still has to feed the features
+        s = client.stream(kinds=("emg",), maxsize=1000)
+        await client.start()
+        await client._client.wait_done()
+        await client.stop()
+        received = s.received
+        s.close()
+        await client.disconnect()
+        return client, received
+
+    client, received = asyncio.run(run())
+    assert received == 100
+    assert client.sequencer.stats()["packets"] == 100
+    assert sum(len(w) for w in client.windows) == 9
@@ -0,0 +1,119 @@
+import asyncio
+
+import numpy as np
+import pytest
+from myo import MyoClient
+from myo.filters import EMGFilterBank, SOSFilter, butterworth, notch
+from myo.replay import ReplayBackend, synthetic_source
+from myo.sequence import EMGBlock
+from myo.types import ClassifierMode, EMGMode, IMUMode
+
+RATE = 200
+
+
+def sine(freq, seconds=2.0, amplitude=1.0, channels=8):
+    t = np.arange(int(seconds * RATE)) / RATE
+    return np.repeat(amplitude * np.sin(2 * np.pi * freq * t)[:, None], channels, axis=1)
+
+
+def gain(f, x, settle=RATE):
+    y = f.process(x)
+    return np.sqrt(np.mean(y[settle:] ** 2) / np.mean(x[settle:] ** 2))
+
+
+@pytest.mark.parametrize(
+    "sos,freq,expected",
+    [
+        (butterworth(4, 20, RATE, "highpass"), 60, 1.0),
+        (butterworth(4, 20, RATE, "highpass"), 20, 1 / np.sqrt(2)),
+        (butterworth(4, 20, RATE, "highpass"), 5, 0.0),
+        (butterworth(2, 5, RATE), 5, 1 / np.sqrt(2)),
+        (notch(50, RATE), 50, 0.0),
+        (notch(50, RATE), 30, 1.0),
+    ],
+)
+def test_response(sos, freq, expected):
+    assert gain(SOSFilter(sos), sine(freq)) == pytest.approx(expected, abs=0.02)
+
+
+def test_state_across_blocks():
+    x = np.random.default_rng(0).normal(0, 30, (500, 8))
+    whole = SOSFilter(np.concatenate([butterworth(4, 20, RATE, "highpass"), notch(50, RATE)]), chunk=1000)
+    expected = whole.process(x)
+    f = SOSFilter(whole.sos)
+    sizes = [1, 2, 3, 2, 7, 100, 2]  # including blocks longer than the chunk
+    out, i = [], 0
+    while i < len(x):
+        for n in sizes:
+            out.append(f.process(x[i : i + n]))
+            i += n
+    assert np.allclose(np.concatenate(out), expected)
+    f.reset()
+    assert np.allclose(f.process(x[:10]), expected[:10])
+
+
+def test_invalid_design():
+    with pytest.raises(ValueError):
+        butterworth(3, 20, RATE)
+    with pytest.raises(ValueError):
+        notch(100, RATE)
+
+
+def test_envelope():
+    bank = EMGFilterBank()
+    y = bank.process(sine(60, seconds=3.0, amplitude=40))
+    # the mean of a rectified sine
+    assert y[-100:].mean() == pytest.approx(2 * 40 / np.pi, rel=0.05)
+    assert y.dtype == np.float32
+
+
+def test_mains_rejected():
+    bank = EMGFilterBank(envelope=None)
+    x = sine(60, amplitude=20) + sine(50, amplitude=50)
+    assert gain(bank, x) == pytest.approx(20 / np.sqrt(20**2 + 50**2), abs=0.03)
+
+
+def test_gap_rows():
+    bank = EMGFilterBank()
+    emg = np.ones((4, 8), np.float32)
+    emg[2:] = np.nan
+    gap = np.array([False, False, True, True])
+    block = bank.process(EMGBlock(np.arange(4), np.arange(4) * 0.005, emg, gap))
+    assert block.gap is gap
+    assert not np.isnan(block.emg[:2]).any() and np.isnan(block.emg[2:]).all()
+    # the state is not poisoned by the gap
+    assert not np.isnan(bank.process(np.ones((2, 8)))).any()
+
+
+def test_bands_in_one_bank():
+    x = np.random.default_rng(1).normal(0, 30, (100, 8))
+    one = EMGFilterBank().process(x)
+    three = EMGFilterBank(channels=24).process(np.tile(x, 3))
+    assert np.allclose(three[:, 16:], one, atol=1e-4)
+
+
+class FilteredClient(MyoClient):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.blocks = []
+
+    async def on_emg_samples(self, block):
+        self.blocks.append(block)
+
+
+def test_client_stage():
+    async def run():
+        backend = ReplayBackend(synthetic_source(duration=1.0), speed=None)
+        client = await FilteredClient.with_device(backend=backend, sequence_emg=True)
+        client.add_emg_stage(EMGFilterBank())
+        await client.setup(classifier_mode=ClassifierMode.DISABLED, emg_mode=EMGMode.SEND_RAW, imu_mode=IMUMode.NONE)
+        await client.start()
+        await client._client.wait_done()
+        await client.stop()
+        await client.disconnect()
+        return client
+
+    client = asyncio.run(run())
+    emg = np.concatenate([b.emg for b in client.blocks])
+    assert emg.shape == (200, 8)
+    assert not np.isnan(emg).any() and emg[-50:].mean() > 1
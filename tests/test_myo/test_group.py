@@ -0,0 +1,76 @@
+import asyncio
+import time
+
+from myo import Handle, MyoClient, MyoGroup
+from myo.replay import ReplayBackend, ReplayFleet, synthetic_source
+from myo.types import ClassifierMode, EMGMode, IMUMode
+
+ADDRESSES = ["D2:3B:85:94:32:8E", "C8:2F:84:E5:88:AF", "E0:49:C2:1A:8F:05", "F3:7A:10:6B:22:D4"]
+
+
+class QuietClient(MyoClient):
+    async def on_fv_data(self, fvd):
+        pass
+
+
+def fleet(n, duration=0.5, speed=None, latency=0.0):
+    return ReplayFleet(
+        [
+            ReplayBackend(synthetic_source(duration=duration, seed=i), speed=speed, latency=latency, address=a)
+            for i, a in enumerate(ADDRESSES[:n])
+        ]
+    )
+
+
+async def bring_up(n, latency):
+    t0 = time.perf_counter()
+    group = await MyoGroup.with_devices(count=n, client_cls=QuietClient, backend=fleet(n, latency=latency))
+    await group.setup(classifier_mode=ClassifierMode.DISABLED, emg_mode=EMGMode.SEND_FILT, imu_mode=IMUMode.NONE)
+    await group.start()
+    elapsed = time.perf_counter() - t0
+    await group.disconnect()
+    return elapsed
+
+
+def test_discover_by_mac():
+    async def run():
+        backend = fleet(3)
+        group = await MyoGroup.with_devices(macs=[ADDRESSES[2].lower(), ADDRESSES[0]], backend=backend)
+        addresses = group.addresses
+        await group.disconnect()
+        return addresses
+
+    assert asyncio.run(run()) == [ADDRESSES[2], ADDRESSES[0]]
+
+
+def test_merged_stream():
+    async def run():
+        group = await MyoGroup.with_devices(backend=fleet(2))
+        await group.setup(emg_mode=EMGMode.SEND_FILT, imu_mode=IMUMode.SEND_DATA)
+        s = group.stream(kinds=("fv", "imu"), batch_size=64, max_latency=0.01)
+        await group.start()
+        await asyncio.gather(*(c._client.wait_done() for c in group))
+        await group.stop()
+        await group.disconnect()
+        items = []
+        async for batch in s:
+            items += batch
+        return group, s, items
+
+    group, s, items = asyncio.run(run())
+    stats = group.stats()
+    for address in ADDRESSES[:2]:
+        mine = [(h, data) for a, h, _, data in items if a == address]
+        # 0.5s of 50Hz FV and IMU per band
+        assert sum(h == Handle.FV_DATA for h, _ in mine) == 25
+        assert sum(h == Handle.IMU_DATA for h, _ in mine) == 25
+        assert stats[address]["received"] == len(mine) == s.received[address]
+        assert set(stats[address]) >= {"connect", "setup", "start", "stop", "disconnect"}
+    assert s.dropped == 0
+
+
+def test_concurrent_bring_up():
+    one = asyncio.run(bring_up(1, latency=0.01))
+    four = asyncio.run(bring_up(4, latency=0.01))
+    # every step is a round trip per band; run concurrently they overlap
+    assert four < 2 * one
@@ -0,0 +1,121 @@
+import asyncio
+import math
+
+import numpy as np
+import pytest
+from myo import MyoClient
+from myo.batch import decode_imu
+from myo.imu import (
+    IMUProcessor,
+    normalize_quaternions,
+    process_imu,
+    quaternion_to_euler,
+    quaternion_to_matrix,
+)
+from myo.replay import ReplayBackend, imu_packet, synthetic_source
+from myo.types import ClassifierMode, EMGMode, IMUData, IMUMode
+
+
+def euler_quaternion(roll, pitch, yaw):
+    cr, sr = math.cos(roll / 2), math.sin(roll / 2)
+    cp, sp = math.cos(pitch / 2), math.sin(pitch / 2)
+    cy, sy = math.cos(yaw / 2), math.sin(yaw / 2)
+    return [
+        cr * cp * cy + sr * sp * sy,
+        sr * cp * cy - cr * sp * sy,
+        cr * sp * cy + sr * cp * sy,
+        cr * cp * sy - sr * sp * cy,
+    ]
+
+
+@pytest.fixture
+def angles():
+    rng = np.random.default_rng(0)
+    return np.stack([rng.uniform(-3, 3, 100), rng.uniform(-1.5, 1.5, 100), rng.uniform(-3, 3, 100)], axis=1)
+
+
+def test_euler_roundtrip(angles):
+    q = np.array([euler_quaternion(*a) for a in angles])
+    assert np.allclose(quaternion_to_euler(q, degrees=False), angles)
+    # the intrinsic z-y-x rotations
+    r = quaternion_to_matrix(q)
+    for a, m in zip(angles[:5], r[:5]):
+        c, s = np.cos(a), np.sin(a)
+        rx = np.array([[1, 0, 0], [0, c[0], -s[0]], [0, s[0], c[0]]])
+        ry = np.array([[c[1], 0, s[1]], [0, 1, 0], [-s[1], 0, c[1]]])
+        rz = np.array([[c[2], -s[2], 0], [s[2], c[2], 0], [0, 0, 1]])
+        assert np.allclose(m, rz @ ry @ rx)
+
+
+def test_normalize_hemisphere():
+    q = np.array([[2.0, 0, 0, 0], [0, 0, 0, 0], [-1, 0, 0, 0.1], [-1, 0, 0, 0.2]])
+    out = normalize_quaternions(q)
+    assert np.allclose(np.linalg.norm(out, axis=1), 1)
+    assert (out[:, 0] > 0).all()
+    unit = q[2:] / np.linalg.norm(q[2:], axis=1)[:, None]
+    assert np.allclose(normalize_quaternions(q[2:], previous=[-1, 0, 0, 0]), unit)
+
+
+def test_gravity_removed(angles):
+    q = np.array([euler_quaternion(*a) for a in angles])
+    r = quaternion_to_matrix(q)
+    # at rest the band measures gravity, world z in its own frame
+    accel = r[:, 2, :] + np.array([0.5, 0, 0]) @ r
+    x = np.concatenate([q, accel, np.zeros((len(q), 3))], axis=1)
+    assert np.allclose(process_imu(x).linear, [0.5, 0, 0])
+    assert np.allclose(process_imu(x, frame="band").linear, np.array([0.5, 0, 0]) @ r)
+
+
+def test_streaming_matches_offline():
+    rng = np.random.default_rng(1)
+    x = rng.normal(0, 1, (500, 10))
+    whole = process_imu(x, rate=50)
+    p = IMUProcessor(rate=50)
+    parts = [p.process(x[i : i + n]) for i, n in zip(range(0, 500, 7), [7] * 72)]
+    for name in ("orientation", "euler", "linear", "delta", "angle"):
+        assert np.allclose(np.concatenate([getattr(f, name) for f in parts]), getattr(whole, name))
+    # constant rotation at 36 deg/s
+    gyro = np.zeros((50, 10))
+    gyro[:, 0] = 1
+    gyro[:, 9] = 36
+    assert process_imu(gyro).angle[-1] == pytest.approx([0, 0, 36 * 49 / 50])
+
+
+def test_matches_objects():
+    packets = [imu_packet((0.9, 0.1, -0.2, 0.3), (0.1, 0.2, 1.1), (10, -20, 30)) for _ in range(3)]
+    frames = process_imu(decode_imu(packets))
+    imu = IMUData(packets[0])
+    o = imu.orientation
+    q = normalize_quaternions([[o.w, o.x, o.y, o.z]])
+    assert frames.euler[0] == pytest.approx(quaternion_to_euler(q)[0])
+    assert frames.delta[1] == pytest.approx(np.array(imu.gyroscope) / 50, abs=1e-4)
+
+
+class FramesClient(MyoClient):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.frames = []
+
+    async def on_imu_frames(self, frames):
+        self.frames.append(frames)
+
+
+def test_client_frames():
+    async def run():
+        backend = ReplayBackend(synthetic_source(duration=1.0), speed=None)
+        client = await FramesClient.with_device(backend=backend)
+        client.imu = IMUProcessor()
+        await client.setup(classifier_mode=ClassifierMode.DISABLED, emg_mode=EMGMode.NONE, imu_mode=IMUMode.SEND_DATA)
+        await client.start()
+        await client._client.wait_done()
+        await client.stop()
+        await client.disconnect()
+        return client
+
+    client = asyncio.run(run())
+    assert len(client.frames) == 50
+    yaw = np.concatenate([f.euler[:, 2] for f in client.frames])
+    # the synthetic band turns about z at 36 deg/s
+    assert yaw[:10] == pytest.approx(np.arange(10) * 36 / 50, abs=0.05)
+    assert client.frames[-1].angle[0, 2] == pytest.approx(36 * 49 / 50, abs=0.1)
+    assert np.abs(np.concatenate([f.linear for f in client.frames])).max() < 1e-3
@@ -0,0 +1,111 @@
+import asyncio
+
+import numpy as np
+import pytest
+from myo import MyoClient, MyoGroup
+from myo.features import FeatureExtractor, FeatureWindows
+from myo.inference import LDA, InferenceStage, NearestCentroid
+from myo.replay import ReplayBackend, ReplayFleet, synthetic_source
+from myo.types import ClassifierMode, EMGMode, IMUMode
+
+ADDRESSES = ["D2:3B:85:94:32:8E", "C8:2F:84:E5:88:AF"]
+
+
+def dataset(n=300, d=16, seed=0):
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(0, 3, (3, d))
+    y = rng.integers(0, 3, n)
+    # correlated noise, where LDA beats nearest centroid
+    mixing = rng.normal(0, 1, (d, d))
+    x = centers[y] + rng.normal(0, 1, (n, d)) @ mixing * 0.5
+    return x, np.array(["fist", "open", "rest"])[y]
+
+
+@pytest.mark.parametrize("model", [NearestCentroid(), LDA()])
+def test_models(model):
+    x, y = dataset()
+    xt, yt = dataset(seed=0)
+    model.fit(x, y)
+    assert list(model.classes) == ["fist", "open", "rest"]
+    assert np.mean(model.predict(xt) == yt) > 0.9
+    assert model.decision(xt).shape == (len(xt), 3)
+
+
+def windows(features, t0=0.0, gap=None):
+    n = len(features)
+    gap = np.zeros(n, bool) if gap is None else np.asarray(gap)
+    return FeatureWindows(np.arange(n), t0 + np.arange(n) * 0.05, features.reshape(n, 8, 2), gap, ("rms", "mav"))
+
+
+class GestureClient(MyoClient):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.gestures = []
+
+    async def on_gesture(self, gesture):
+        self.gestures.append(gesture)
+
+
+def test_batched_across_clients():
+    x, y = dataset()
+    stage = InferenceStage(LDA().fit(x, y))
+    a, b = GestureClient(), GestureClient()
+    a.clock = b.clock = lambda: 1.0
+
+    async def run():
+        stage.submit(a, windows(x[:3]))
+        stage.submit(b, windows(x[3:5], gap=[True, False]))
+        await asyncio.sleep(0.01)
+
+    asyncio.run(run())
+    assert stage.batches == 1 and stage.decisions == 4
+    assert [g.label for g in a.gestures + b.gestures] == list(y[[0, 1, 2, 4]])
+    assert all(0 < g.confidence <= 1 for g in a.gestures)
+    assert a.gestures[1].latency == pytest.approx(0.95)
+    assert stage.stats()["processing"]["count"] == 2
+
+
+def test_callable_model():
+    stage = InferenceStage(lambda x: np.where(x[:, 0] > 0, "up", "down"))
+    client = GestureClient()
+
+    async def run():
+        stage.submit(client, windows(np.array([[1.0] * 16, [-1.0] * 16])))
+        await stage.flush()
+
+    asyncio.run(run())
+    assert [(g.label, g.confidence) for g in client.gestures] == [("up", None), ("down", None)]
+
+
+def test_group_inference():
+    class RestModel:
+        classes = np.array(["rest", "fist"])
+
+        def decision(self, x):
+            return np.stack([np.zeros(len(x)), np.ones(len(x))], axis=1)
+
+    async def run():
+        backend = ReplayFleet(
+            [
+                ReplayBackend(synthetic_source(duration=1.0, seed=i), speed=10.0, address=a)
+                for i, a in enumerate(ADDRESSES)
+            ]
+        )
+        group = await MyoGroup.with_devices(count=2, client_cls=GestureClient, backend=backend, sequence_emg=True)
+        for client in group:
+            client.features = FeatureExtractor(window=40, hop=20)
+        stage = group.infer(InferenceStage(RestModel()))
+        await group.setup(classifier_mode=ClassifierMode.DISABLED, emg_mode=EMGMode.SEND_RAW, imu_mode=IMUMode.NONE)
+        await group.start()
+        await asyncio.gather(*(c._client.wait_done() for c in group))
+        await group.stop()
+        await group.disconnect()
+        return group, stage
+
+    group, stage = asyncio.run(run())
+    for client in group:
+        assert len(client.gestures) == 9
+        assert {g.label for g in client.gestures} == {"fist"}
+    stats = stage.stats()
+    assert stats["decisions"] == 18
+    assert stats["processing"]["p99"] < 0.02
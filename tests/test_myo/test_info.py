@@ -0,0 +1,74 @@
+import asyncio
+import json
+
+from myo import Handle, MyoClient
+from myo.info import clear_cache
+from myo.replay import ReplayBackend, synthetic_source
+
+
+async def connect(latency):
+    backend = ReplayBackend(synthetic_source(duration=0.1), latency=latency)
+    client = await MyoClient.with_device(backend=backend)
+    reads = []
+    read_gatt_char = client._client.read_gatt_char
+
+    async def counting_read(char_specifier, **kwargs):
+        reads.append(char_specifier)
+        return await read_gatt_char(char_specifier, **kwargs)
+
+    client._client.read_gatt_char = counting_read
+    return client, reads
+
+
+def test_device_info_is_cached():
+    clear_cache()
+
+    async def run():
+        loop = asyncio.get_running_loop()
+        first, first_reads = await connect(latency=0.02)
+        t0 = loop.time()
+        services = json.loads(await first.get_services())
+        elapsed = loop.time() - t0
+        await first.disconnect()
+
+        second, second_reads = await connect(latency=0.02)
+        info = await second.get_device_info()
+        await second.disconnect()
+        return services, elapsed, first_reads, first.device_info, second_reads, info
+
+    services, elapsed, first_reads, first_info, second_reads, info = asyncio.run(run())
+    # the four reads go out together
+    assert sorted(first_reads) == sorted(
+        h.value
+        for h in [Handle.MANUFACTURER_NAME_STRING, Handle.FIRMWARE_INFO, Handle.FIRMWARE_VERSION, Handle.BATTERY_LEVEL]
+    )
+    assert elapsed < 0.06
+    chars = {c["name"]: c.get("value") for s in services["services"].values() for c in s["chars"].values()}
+    assert chars["MANUFACTURER_NAME_STRING"] == "Thalmic Labs"
+    assert chars["FIRMWARE_VERSION"] == "1.5.1970.REVD"
+    assert chars["BATTERY_LEVEL"] == 100
+    assert not first_info.cached
+
+    # only the battery is read again
+    assert second_reads == [Handle.BATTERY_LEVEL.value]
+    assert info.cached and info.serial_number == "D2:3B:85:94:32:8E"
+    assert info.firmware_version.major == 1 and info.battery == 100
+
+
+def test_services_keep_falsy_values():
+    clear_cache()
+
+    async def run():
+        client, reads = await connect(latency=0.0)
+        client._client.reads[Handle.BATTERY_LEVEL] = bytes((0,))
+        services = json.loads(await client.get_services())
+        await client.disconnect()
+        return services, reads, client.device_info
+
+    services, reads, info = asyncio.run(run())
+    chars = {c["name"]: c for s in services["services"].values() for c in s["chars"].values()}
+    # battery 0 is a value, not a cache miss: read once and shown
+    assert chars["BATTERY_LEVEL"]["value"] == 0
+    assert reads.count(Handle.BATTERY_LEVEL.value) == 1
+    # the DeviceInfo behind the JSON
+    assert info.battery == 0 and info.serial_number == "D2:3B:85:94:32:8E"
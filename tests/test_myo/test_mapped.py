@@ -0,0 +1,83 @@
+import os
+
+import numpy as np
+from myo.batch import decode_emg, decode_fv, decode_imu
+from myo.mapped import INDEX_SUFFIX, MappedSession
+from myo.profile import Handle
+from myo.replay import EMG_HANDLES, fv_packet, synthetic_source
+from myo.session import EPOCH_HANDLE, SessionHeader, SessionReader, SessionWriter
+
+
+def write_session(path, seconds):
+    events = list(synthetic_source(duration=seconds))
+    with SessionWriter(path) as w:
+        for t, handle, payload in events:
+            w.write(t, handle, payload)
+    return events
+
+
+def test_time_slices(tmp_path):
+    path = str(tmp_path / "s.myo")
+    events = write_session(path, 10.0)
+    ms = MappedSession(path, index_stride=64)
+    assert len(ms) == len(events)
+    assert os.path.exists(path + INDEX_SUFFIX)
+
+    t0, t1 = 2.5, 4.0
+
+    def select(handles):
+        return [p for t, h, p in events if t0 <= t < t1 and h in handles]
+
+    t, emg = ms.emg(t0, t1)
+    np.testing.assert_array_equal(emg, decode_emg(select(EMG_HANDLES)))
+    assert len(t) == len(emg) and t[1] >= t0
+
+    t, fv = ms.fv(t0, t1, channels=[0, 3])
+    np.testing.assert_array_equal(fv, decode_fv(select((Handle.FV_DATA,)))[0][:, [0, 3]])
+    assert t.min() >= t0 and t.max() < t1
+
+    t, imu = ms.imu(t0, t1, columns=slice(7, 10))
+    np.testing.assert_allclose(imu, decode_imu(select((Handle.IMU_DATA,)))[:, 7:10])
+
+
+def test_sidecar_reused_and_invalidated(tmp_path):
+    path = str(tmp_path / "s.myo")
+    write_session(path, 1.0)
+    ms = MappedSession(path, index_stride=16)
+    assert ms._load_index() is not None
+    n = len(ms)
+    del ms
+    write_session(path, 2.0)  # the sidecar no longer matches
+    ms = MappedSession(path, index_stride=16)
+    assert len(ms) > n
+    assert ms.locate(ms.duration + 1) == len(ms)
+    assert ms.locate(0) == 0
+
+
+def test_ticks_wrap(tmp_path):
+    # 13 hours of one FV packet per 100s: the uint32 ticks wrap after ~11.9 hours
+    path = str(tmp_path / "s.myo")
+    times = np.arange(0.0, 46001.0, 100.0)
+    with SessionWriter(path) as w:
+        for i, t in enumerate(times):
+            w.write(t, Handle.FV_DATA, fv_packet([i % 1000] * 8))
+    expected = [t for t, _, _ in SessionReader(path).records()]
+    for _ in range(2):  # built, then from the sidecar
+        ms = MappedSession(path, index_stride=16)
+        assert ms.duration == 46000.0
+        t, fv = ms.fv(43000, 47000)
+        assert t.tolist() == times[times >= 43000].tolist() and fv[:, 0].tolist() == list(range(430, 461))
+        assert ms.fv()[0].tolist() == expected
+        # the epoch record carries the ticks of the record after it
+        assert ms.locate(43000) == 430 and ms.slice(43000, 43001)["handle"].tolist() == [EPOCH_HANDLE, Handle.FV_DATA.value]
+
+
+def test_version_1(tmp_path):
+    path = str(tmp_path / "s.myo")
+    events = list(synthetic_source(duration=1.0))
+    with SessionWriter(path, SessionHeader(version=1)) as w:
+        for t, handle, payload in events:
+            w.write(t, handle, payload)
+    ms = MappedSession(path)
+    assert ms.header.version == 1 and len(ms) == len(events)
+    assert ms.duration == events[-1][0]
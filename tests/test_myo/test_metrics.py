@@ -0,0 +1,79 @@
+import asyncio
+import logging
+
+import pytest
+from myo import Handle, MyoClient
+from myo.metrics import Histogram
+from myo.replay import ReplayBackend, synthetic_source
+from myo.types import ClassifierMode, EMGMode, IMUMode
+
+
+class FakeClock:
+    """
+    <> the replay source time plus the time the callbacks pretend to spend
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.spent = 0.0
+
+    def __call__(self):
+        return self.backend.clock() + self.spent
+
+
+class SlowClient(MyoClient):
+    async def on_fv_data(self, fvd):
+        pass
+
+    async def on_imu_data(self, imu):
+        self.fake_clock.spent += 0.002
+
+
+def test_histogram():
+    h = Histogram()
+    for us in [3, 5, 6, 7, 9, 12, 100, 1000]:
+        h.record(us * 1e-6)
+    assert h.count == 8 and h.max == pytest.approx(1e-3)
+    # 50% are under 8us, 99% under the 1ms maximum
+    assert h.percentile(50) == pytest.approx(8e-6)
+    assert h.percentile(99) == pytest.approx(1e-3)
+    assert Histogram().percentile(50) == 0.0
+
+
+def test_client_metrics(caplog):
+    async def run():
+        backend = ReplayBackend(synthetic_source(duration=0.5), speed=None)
+        client = await SlowClient.with_device(backend=backend)
+        client.fake_clock = FakeClock(backend)
+        await client.setup(classifier_mode=ClassifierMode.DISABLED, emg_mode=EMGMode.SEND_FILT, imu_mode=IMUMode.SEND_DATA)
+        s = client.stream(kinds=("fv",), maxsize=8)
+        client.enable_metrics(clock=client.fake_clock)
+        await client.start()
+        measured = client._dispatch[Handle.FV_DATA.value][1]
+        await client._client.wait_done()
+        snapshot = client.metrics_snapshot()
+        # the periodic log line
+        client.enable_metrics(log_interval=0.01)
+        await asyncio.sleep(0.05)
+        client.disable_metrics()
+        restored = client._dispatch[Handle.FV_DATA.value][1]
+        await client.stop()
+        await client.disconnect()
+        s.close()
+        return snapshot, measured, restored
+
+    with caplog.at_level(logging.INFO, logger="myo.core"):
+        snapshot, measured, restored = asyncio.run(run())
+    fv = snapshot["handles"]["FV_DATA"]
+    imu = snapshot["handles"]["IMU_DATA"]
+    assert fv["hook"] == "on_fv_data" and imu["hook"] == "on_imu_data"
+    # 0.5s at 50Hz, and one 2ms IMU callback between two FV packets
+    assert fv["packets"] == imu["packets"] == 25
+    assert fv["interval"] == pytest.approx(0.022) and fv["jitter"] == pytest.approx(0.0, abs=1e-9)
+    # from enable_metrics to the last event of the source at 0.49s
+    assert fv["rate"] == pytest.approx(25 / (0.49 + 25 * 0.002))
+    assert imu["callback"]["p50"] == pytest.approx(0.002) and fv["callback"]["max"] == 0.0
+    # the stream is never read
+    assert snapshot["streams"] == [{"depth": 8, "received": 25, "dropped": 17}]
+    assert measured.__name__ == "measured" and restored.__name__ == "on_fv_data"
+    assert any("metrics: FV_DATA" in r.message for r in caplog.records)
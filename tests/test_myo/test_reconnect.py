@@ -0,0 +1,94 @@
+import asyncio
+
+import pytest
+from myo import Handle, MyoClient
+from myo.replay import ReplayBackend, synthetic_source
+from myo.types import ClassifierMode, EMGMode, IMUMode, SleepMode
+
+
+class GapClient(MyoClient):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fv = 0
+        self.gaps = []
+
+    async def on_fv_data(self, fvd):
+        self.fv += 1
+
+    async def on_imu_data(self, imu):
+        pass
+
+    async def on_gap(self, gap):
+        self.gaps.append(gap)
+
+
+async def wait_for(condition, timeout=2.0):
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while not condition():
+        assert loop.time() < deadline
+        await asyncio.sleep(0.005)
+
+
+@pytest.mark.parametrize("fault", ["drop", "stall"])
+def test_supervised_reconnect(fault):
+    async def run():
+        # 2s of data at 20x
+        backend = ReplayBackend(synthetic_source(duration=2.0), speed=20)
+        client = await GapClient.with_device(backend=backend)
+        await client.setup(classifier_mode=ClassifierMode.DISABLED, emg_mode=EMGMode.SEND_FILT, imu_mode=IMUMode.SEND_DATA)
+        s = client.stream(kinds=("fv",), batch_size=256, max_latency=0.01)
+        await client.start()
+        client.supervise(stall_timeout=0.05, retry_delay=0.01)
+
+        first = client._client
+        await wait_for(lambda: client.fv >= 20)
+        if fault == "drop":
+            await first.drop(lost=0.3)
+        else:
+            await first.stall(lost=0.3)
+        await wait_for(lambda: client.gaps)
+        await client._client.wait_done()
+        second = client._client
+        await client.stop()
+        await client.disconnect()
+        items = []
+        async for batch in s:
+            items += batch
+        return client, first, second, items
+
+    client, first, second, items = asyncio.run(run())
+    assert second is not first and len(client.gaps) == 1
+    gap = client.gaps[0]
+    assert gap.reason == ("disconnected" if fault == "drop" else "stalled")
+    if fault == "drop":
+        # the lost 0.3s, give or take one FV interval
+        assert gap.duration == pytest.approx(0.3, abs=0.021)
+    # the sleep mode and modes are restored, and exactly the started handles re-subscribed
+    assert [w[1] for w in second.writes[:2]] == [
+        bytes([0x09, 0x01, SleepMode.NEVER_SLEEP.value]),
+        bytes([0x01, 0x03, EMGMode.SEND_FILT.value, IMUMode.SEND_DATA.value, ClassifierMode.DISABLED.value]),
+    ]
+    assert set(second.sent) == {Handle.FV_DATA.value, Handle.IMU_DATA.value}
+    # 100 FV packets minus the ~15 lost
+    assert 80 <= client.fv <= 86
+    markers = [i for i, (h, _, _) in enumerate(items) if h is None]
+    assert len(markers) == 1 and items[markers[0]][2] is gap
+    assert len(items) == client.fv + 1
+
+
+def test_disconnect_is_not_a_drop():
+    async def run():
+        backend = ReplayBackend(synthetic_source(duration=0.2), speed=None)
+        client = await GapClient.with_device(backend=backend)
+        await client.setup()
+        await client.start()
+        supervisor = client.supervise()
+        await client._client.wait_done()
+        await client.stop()
+        await client.disconnect()
+        await asyncio.sleep(0)
+        return client, supervisor, backend
+
+    client, supervisor, backend = asyncio.run(run())
+    assert supervisor.cancelled() and len(backend.clients) == 1 and not client.gaps
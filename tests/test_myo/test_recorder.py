@@ -0,0 +1,42 @@
+import json
+import time
+
+import pytest
+from myo.recorder import RecordingSink
+from myo.types import EMGData, FVData
+
+
+def read_lines(path):
+    with open(path) as f:
+        return [json.loads(line) for line in f]
+
+
+def test_sink_sync_and_close(tmp_path):
+    sink = RecordingSink(str(tmp_path), "session", flush_interval=60)
+    emg = EMGData(bytes.fromhex('090d01fefefefa0206e9fcfdfcfe0502'))
+    fvd = FVData(bytes.fromhex('5203ce0061007901d80062006f00730100'))
+    for _ in range(3):
+        sink.write("emg_data", emg)
+    sink.write("fv_data", fvd)
+    sink.sync()
+    assert read_lines(sink.path("emg_data")) == [json.loads(emg.json())] * 3
+    assert read_lines(sink.path("fv_data")) == [fvd.to_dict() | {"fv": list(fvd.fv)}]
+
+    sink.write("fv_data", {"fv": [0] * 8, "mask": 0})
+    sink.close()
+    assert len(read_lines(sink.path("fv_data"))) == 2
+    assert sink.written == 5
+    with pytest.raises(ValueError):
+        sink.write("fv_data", fvd)
+
+
+def test_sink_flushes_on_size(tmp_path):
+    sink = RecordingSink(str(tmp_path), "session", flush_records=10, flush_interval=60)
+    for i in range(10):
+        sink.write("x", {"i": i})
+    # the flusher wakes up without waiting for the interval
+    deadline = time.monotonic() + 1
+    while sink.written < 10 and time.monotonic() < deadline:
+        time.sleep(0.005)
+    assert sink.written == 10
+    sink.close()
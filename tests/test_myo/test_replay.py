@@ -0,0 +1,169 @@
+import asyncio
+import os
+
+import pytest
+from myo import Handle, MyoClient
+from myo.replay import (
+    ReplayBackend,
+    ReplayClient,
+    ReplayDevice,
+    fv_packet,
+    imu_packet,
+    jsonl_source,
+    synthetic_source,
+)
+from myo.types import ClassifierMode, EMGMode, FVData, IMUData, IMUMode
+
+EMG_DATA_DIR = os.path.join(os.path.dirname(__file__), "..", "..", "EMG_data")
+
+
+class CountingClient(MyoClient):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.counts = {"emg": 0, "fv": 0, "imu": 0, "aggregated": 0}
+
+    async def on_emg_data(self, emg):
+        self.counts["emg"] += 1
+
+    async def on_fv_data(self, fvd):
+        self.counts["fv"] += 1
+
+    async def on_imu_data(self, imu):
+        self.counts["imu"] += 1
+
+    async def on_aggregated_data(self, ad):
+        self.counts["aggregated"] += 1
+
+
+async def run_session(client, emg_mode, imu_mode):
+    await client.setup(classifier_mode=ClassifierMode.DISABLED, emg_mode=emg_mode, imu_mode=imu_mode)
+    await client.start()
+    await client._client.wait_done()
+    await client.stop()
+    await client.disconnect()
+
+
+@pytest.mark.parametrize(
+    "emg_mode,expected",
+    [
+        (EMGMode.SEND_RAW, {"emg": 100, "fv": 0, "imu": 50, "aggregated": 0}),
+        (EMGMode.SEND_FILT, {"emg": 0, "fv": 50, "imu": 50, "aggregated": 0}),
+    ],
+)
+def test_synthetic_rates(emg_mode, expected):
+    async def run():
+        backend = ReplayBackend(synthetic_source(duration=1.0), speed=None)
+        client = await CountingClient.with_device(backend=backend)
+        await run_session(client, emg_mode, IMUMode.SEND_DATA)
+        return client, backend
+
+    client, backend = asyncio.run(run())
+    assert client.counts == expected
+    if emg_mode == EMGMode.SEND_RAW:
+        sent = backend.clients[0].sent
+        assert [sent[h.value] for h in (Handle.EMG0_DATA, Handle.EMG1_DATA, Handle.EMG2_DATA, Handle.EMG3_DATA)] == [
+            25
+        ] * 4
+
+
+def test_jsonl_source_aggregated():
+    path = os.path.join(EMG_DATA_DIR, "myo_data_20240811_145353_aggregated_data.json")
+    with open(path) as f:
+        frames = sum(1 for line in f if line.strip())
+
+    async def run():
+        backend = ReplayBackend(jsonl_source(path), speed=None)
+        client = await CountingClient.with_device(backend=backend, aggregate_all=True)
+        await run_session(client, EMGMode.SEND_FILT, IMUMode.SEND_DATA)
+        return client
+
+    client = asyncio.run(run())
+    assert client.counts["aggregated"] == frames
+
+
+def test_packet_round_trip():
+    fvd = FVData(fv_packet([850, 206, 97, 377, 216, 98, 111, 371]))
+    assert fvd.fv == (850, 206, 97, 377, 216, 98, 111, 371)
+    imu = IMUData(imu_packet((0.7225341796875, 0.68231201171875, -0.11102294921875, 0.002197265625),
+                             [0.1630859375, 0.96728515625, 0.04248046875], [0.1875, -0.6875, -0.25]))
+    assert imu.gyroscope == [0.1875, -0.6875, -0.25]
+    assert imu.orientation.w == 0.7225341796875
+
+
+def test_speed_multiplier():
+    async def run():
+        loop = asyncio.get_running_loop()
+        backend = ReplayBackend(synthetic_source(duration=0.5), speed=10)
+        client = await CountingClient.with_device(backend=backend)
+        t0 = loop.time()
+        await run_session(client, EMGMode.SEND_FILT, IMUMode.NONE)
+        return loop.time() - t0
+
+    # 0.5s of data at 10x takes ~50ms
+    assert asyncio.run(run()) < 0.4
+
+
+def test_fast_start():
+    async def bring_up(fast_start):
+        backend = ReplayBackend(synthetic_source(duration=1.0), latency=0.01)
+        client = await CountingClient.with_device(backend=backend, fast_start=fast_start)
+        await client.setup(classifier_mode=ClassifierMode.DISABLED, emg_mode=EMGMode.SEND_RAW, imu_mode=IMUMode.SEND_DATA)
+        await client.start()
+        while client.time_to_first_sample is None:
+            await asyncio.sleep(0.001)
+        startup = dict(client.startup)
+        await client.stop()
+        await client.disconnect()
+        return startup, [w[1][0] for w in backend.clients[0].writes]
+
+    default, default_writes = asyncio.run(bring_up(False))
+    fast, fast_writes = asyncio.run(bring_up(True))
+    # only sleep mode (0x09) then set_mode (0x01): no LED (0x06) or vibrate (0x03)
+    assert fast_writes == [0x09, 0x01]
+    assert {0x03, 0x06} <= set(default_writes)
+    assert fast["setup"] < fast["first_sample"] and fast["setup"] < fast["start"]
+    # 5 subscriptions at once instead of one by one, without the cosmetic commands
+    assert fast["first_sample"] < default["first_sample"] / 2
+
+
+def test_stall_skips_a_list_source():
+    async def run():
+        events = [(0.1 * i, Handle.FV_DATA, fv_packet([i] * 8)) for i in range(20)]
+        client = ReplayClient(ReplayDevice("D2:3B:85:94:32:8E"), events, speed=None)
+        await client.stall(0.5)
+        # a list is not restarted: the skipped events are gone
+        return [t for t, _, _ in client._source]
+
+    rest = asyncio.run(run())
+    # the first event after the lost 0.5s is kept for when notifications resume
+    assert len(rest) == 15 and rest[0] == pytest.approx(0.5)
+
+
+def test_stall_holds_back_events():
+    async def run():
+        packets = [fv_packet([i] * 8) for i in range(100)]
+        index = {p: i for i, p in enumerate(packets)}
+        events = [(0.01 * i, Handle.FV_DATA, p) for i, p in enumerate(packets)]
+        client = ReplayClient(ReplayDevice("D2:3B:85:94:32:8E"), events, speed=1.0)
+        client.emg_mode = EMGMode.SEND_FILT
+        got = []
+
+        def on_fv(_, data):
+            got.append(index[bytes(data)])
+
+        await client.start_notify(Handle.FV_DATA.value, on_fv)
+        await asyncio.sleep(0.105)
+        await client.stall(0.195)
+        stalled = list(got)
+        await asyncio.sleep(0.1)
+        during = got[len(stalled):]
+        await client.start_notify(Handle.FV_DATA.value, on_fv)
+        await client.wait_done()
+        return stalled, during, got
+
+    stalled, during, got = asyncio.run(run())
+    k = len(stalled)
+    assert k > 0 and stalled == list(range(k))
+    # nothing is delivered while stalled, and no event is taken beyond the lost 0.195s
+    assert during == []
+    assert got == list(range(k)) + list(range(k + 19, 100))
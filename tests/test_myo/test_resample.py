@@ -0,0 +1,130 @@
+import asyncio
+
+import numpy as np
+import pytest
+from myo import MyoClient
+from myo.replay import ReplayBackend, synthetic_source
+from myo.resample import FrameResampler, Resampler, SampleClock
+from myo.types import ClassifierMode, EMGMode, IMUMode
+
+
+def feed(resampler, kind, x, rate, block, jitter=0.0, seed=0):
+    """
+    <> push x in blocks arriving late by up to jitter seconds (in order), return the frames
+    """
+    rng = np.random.default_rng(seed)
+    out, arrival = [], 0.0
+    for i in range(0, len(x), block):
+        n = len(x[i : i + block])
+        arrival = max(arrival, (i + n - 1) / rate + jitter * rng.random())
+        out.append(resampler.push(kind, x[i : i + block], arrival - (n - 1 - np.arange(n)) / rate))
+    return out
+
+
+def test_clock_through_jitter():
+    clock = SampleClock(rate=50)
+    rng = np.random.default_rng(0)
+    index = np.arange(1000)
+    # a band clock 0.1% fast, arrivals 0-20ms late
+    clock.push(index, 3.0 + index / 50.05 + rng.uniform(0, 0.02, 1000))
+    assert 1.0 / clock._line()[0] == pytest.approx(50.05, rel=1e-4)
+    assert clock.time(1000) == pytest.approx(3.0 + 1000 / 50.05 + 0.01, abs=0.002)
+    assert clock.position(clock.time(123.5)) == pytest.approx(123.5)
+
+
+@pytest.mark.parametrize("freq, gain", [(10.0, 1.0), (30.0, 1.0), (80.0, 0.0)])
+def test_anti_aliasing(freq, gain):
+    # 200Hz -> 100Hz keeps what is below 45Hz, removes what would alias
+    t = np.arange(2000) / 200
+    frames = FrameResampler(rate=100, streams={"emg": (200, 1)})
+    out = feed(frames, "emg", np.sin(2 * np.pi * freq * t)[:, None], 200, block=2)
+    block = [b for b in out if len(b)]
+    tf = np.concatenate([b.t for b in block])
+    y = np.concatenate([b["emg"] for b in block])[:, 0]
+    assert np.abs(y - gain * np.sin(2 * np.pi * freq * tf)).max() < 0.01
+
+
+def test_streaming_matches_one_block():
+    t = np.arange(600) / 50
+    # well below the 22.5Hz cutoff
+    x = np.sin(2 * np.pi * np.array([1.0, 5.0, 12.0]) * t[:, None])
+
+    def run(block):
+        s = Resampler(50, 100, 3)
+        for i in range(0, 600, block):
+            s.push(x[i : i + block], t[i : i + block])
+        return s.read(np.arange(1.0, 10.0, 0.01))
+
+    y1, gap1 = run(600)
+    y2, gap2 = run(7)
+    assert np.allclose(y1, y2) and not gap1.any() and not gap2.any()
+    # every other output falls on an input sample
+    assert np.allclose(y1[::2], x[50:500], atol=0.01)
+
+
+def test_multimodal_frames():
+    frames = FrameResampler(rate=100)
+    assert frames.width == 26 and frames.columns["imu"] == slice(16, 26)
+    emg_t = np.arange(1000) / 200
+    imu_t = np.arange(250) / 50
+    out = []
+    for i in range(250):
+        out.append(frames.push("emg", np.full((4, 8), 1.0), emg_t[4 * i : 4 * i + 4], np.arange(4 * i, 4 * i + 4)))
+        # a lost FV packet
+        if i != 100:
+            out.append(frames.push("fv", np.full((1, 8), 2.0), imu_t[i], index=[i]))
+        out.append(frames.push("imu", np.full((1, 10), 3.0), imu_t[i]))
+    out.append(frames.flush())
+    t = np.concatenate([b.t for b in out])
+    x = np.concatenate([b.x for b in out])
+    gap = np.concatenate([b.gap for b in out])
+    assert x.dtype == np.float32 and x.shape == (len(t), 26)
+    assert np.allclose(np.diff(t), 0.01)
+    ok = ~gap
+    assert np.allclose(x[ok, :8], 1) and np.allclose(x[ok, 8:16], 2) and np.allclose(x[ok, 16:], 3)
+    # the lost packet reaches the frames around 2s within the FV filter support
+    assert gap[(t > 1.9) & (t < 2.1)].any() and not gap[(t > 1.0) & (t < 1.5)].any()
+    assert frames.stats()["received"] == {"emg": 1000, "fv": 249, "imu": 250}
+
+
+def test_stalled_stream():
+    frames = FrameResampler(rate=100, streams={"emg": (200, 8), "fv": (50, 8)}, max_delay=0.2)
+    out = feed(frames, "emg", np.ones((400, 8)), 200, block=2)
+    block = [b for b in out if len(b)]
+    assert block and np.isnan(block[-1]["fv"]).all() and block[-1].gap.all()
+    assert np.allclose(np.concatenate([b["emg"] for b in block]), 1)
+
+
+class FrameClient(MyoClient):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.blocks = []
+
+    async def on_frames(self, block):
+        self.blocks.append(block)
+
+
+def test_client_frames():
+    async def run():
+        backend = ReplayBackend(synthetic_source(duration=2.0), speed=10.0)
+        client = await FrameClient.with_device(backend=backend, sequence_emg=True)
+        client.resampler = FrameResampler(rate=100)
+        await client.setup(
+            classifier_mode=ClassifierMode.DISABLED, emg_mode=EMGMode.SEND_RAW, imu_mode=IMUMode.SEND_ALL
+        )
+        await client.start()
+        await client._client.wait_done()
+        await client.stop()
+        await client.disconnect()
+        return client
+
+    client = asyncio.run(run())
+    t = np.concatenate([b.t for b in client.blocks])
+    x = np.concatenate([b.x for b in client.blocks])
+    # on the replay clock, whatever the speed
+    assert np.allclose(np.diff(t), 0.01)
+    assert len(t) > 150
+    stats = client.resampler.stats()
+    assert stats["received"]["emg"] == 400 and stats["received"]["imu"] == 100
+    # the synthetic band rests its accelerometer at 1g on z
+    assert np.allclose(x[~np.concatenate([b.gap for b in client.blocks]), 22], 1.0, atol=0.01)
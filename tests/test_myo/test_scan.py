@@ -0,0 +1,155 @@
+import asyncio
+import json
+
+from myo import Myo, MyoClient
+from myo.replay import ReplayBackend, ReplayDevice, synthetic_source
+from myo.scan import CachedDevice, DeviceCache, SharedScanner
+
+MAC = "D2:3B:85:94:32:8E"
+
+
+class FakeScanner:
+    instances = []
+
+    def __init__(self, detection_callback, **kwargs):
+        self.detection_callback = detection_callback
+        self.running = False
+        FakeScanner.instances.append(self)
+
+    async def start(self):
+        self.running = True
+
+    async def stop(self):
+        self.running = False
+
+
+class CountingBackend(ReplayBackend):
+    def __init__(self, *args, misses=0, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.scans = 0
+        self.misses = misses  # scans that find nothing
+
+    async def find_device_by_filter(self, filterfunc, timeout=10.0, **kwargs):
+        self.scans += 1
+        if self.scans <= self.misses:
+            return None
+        return await super().find_device_by_filter(filterfunc, timeout, **kwargs)
+
+
+def test_cache_persistence_and_ttl(tmp_path):
+    path = str(tmp_path / "devices.json")
+    cache = DeviceCache(path, ttl=60)
+    device = ReplayDevice(MAC)
+    cache.put(device)
+    assert cache.get(MAC.lower()) is device
+
+    # another process only knows the address
+    cache = DeviceCache(path, ttl=60)
+    cached = cache.get(MAC)
+    assert isinstance(cached, CachedDevice) and cached.address == MAC and cached.name == "Myo"
+    assert cache.latest().address == MAC
+
+    with open(path) as f:
+        entries = json.load(f)
+    entries[0]["seen"] -= 120
+    with open(path, "w") as f:
+        json.dump(entries, f)
+    cache = DeviceCache(path, ttl=60)
+    assert cache.get(MAC) is None and cache.latest() is None
+
+    cache.forget(MAC)
+    assert len(DeviceCache(path)) == 0
+
+
+def test_shared_scanner_serves_concurrent_lookups():
+    async def run():
+        FakeScanner.instances = []
+        shared = SharedScanner(scanner_cls=FakeScanner)
+        a = asyncio.create_task(shared.find_device_by_filter(lambda d, _: d.address == "A", timeout=1))
+        b = asyncio.create_task(shared.find_device_by_filter(lambda d, _: d.address == "B", timeout=1))
+        await asyncio.sleep(0)
+        scanner = FakeScanner.instances[0]
+        for address in ["C", "B", "A"]:
+            scanner.detection_callback(ReplayDevice(address), None)
+        found = [(await a).address, (await b).address]
+        missing = await shared.find_device_by_filter(lambda d, _: False, timeout=0.01)
+        return found, missing, len(FakeScanner.instances), shared.running
+
+    found, missing, scanners, running = asyncio.run(run())
+    assert found == ["A", "B"]
+    assert missing is None
+    # one scanner for both pending lookups, another for the later one, none left running
+    assert scanners == 2 and not running
+
+
+def test_with_mac_uses_cache(tmp_path):
+    async def run():
+        cache = DeviceCache(str(tmp_path / "devices.json"))
+        backend = CountingBackend(synthetic_source(duration=0.1), address=MAC)
+        first = await Myo.with_mac(MAC, backend=backend, cache=cache)
+        second = await Myo.with_mac(MAC, backend=backend, cache=cache)
+        latest = await Myo.with_uuid(backend=backend, cache=cache)
+        return backend.scans, first, second, latest
+
+    scans, first, second, latest = asyncio.run(run())
+    assert scans == 1
+    assert not first.cached and second.cached and latest.cached
+    assert second.device is first.device is latest.device
+
+
+def test_with_device_backoff():
+    async def run():
+        backend = CountingBackend(synthetic_source(duration=0.1), misses=2)
+        client = await MyoClient.with_device(backend=backend, retry_delay=0.01)
+        await client.disconnect()
+        return backend.scans
+
+    assert asyncio.run(run()) == 3
+
+
+class StaleBackend(CountingBackend):
+    """cached devices (known only by address) are out of range"""
+
+    def client(self, device, **kwargs):
+        c = super().client(device, **kwargs)
+        if isinstance(device, CachedDevice):
+
+            async def connect(**kwargs):
+                raise OSError("not found")
+
+            c.connect = connect
+        return c
+
+
+def test_unreachable_cached_device_is_rescanned(tmp_path):
+    async def run():
+        cache = DeviceCache(str(tmp_path / "devices.json"))
+        cache.put(CachedDevice(MAC, "Myo"))
+        backend = StaleBackend(synthetic_source(duration=0.1), address=MAC)
+        client = await MyoClient.with_device(mac=MAC, backend=backend, cache=cache)
+        connected = client._client.is_connected
+        await client.disconnect()
+        return backend.scans, connected, client.m.cached, cache.get(MAC) is backend.device
+
+    scans, connected, cached, replaced = asyncio.run(run())
+    assert scans == 1 and connected and not cached
+    # the scanned device replaces the stale entry
+    assert replaced
+
+
+def test_unreachable_latest_device_is_rescanned(tmp_path):
+    async def run():
+        cache = DeviceCache(str(tmp_path / "devices.json"))
+        cache.put(CachedDevice(MAC, "Myo"))
+        backend = StaleBackend(synthetic_source(duration=0.1), address=MAC)
+        # the newest entry is returned without a scan, even though it cannot be reached
+        stale = await Myo.with_uuid(backend=backend, cache=cache)
+        client = await MyoClient.with_device(backend=backend, cache=cache)
+        connected = client._client.is_connected
+        await client.disconnect()
+        return stale, backend.scans, connected, client.m.cached, cache.latest() is backend.device
+
+    stale, scans, connected, cached, replaced = asyncio.run(run())
+    assert stale.cached and isinstance(stale.device, CachedDevice)
+    assert scans == 1 and connected and not cached
+    assert replaced
@@ -0,0 +1,145 @@
+import asyncio
+
+import numpy as np
+import pytest
+from myo import MyoClient
+from myo.replay import EMG_HANDLES, ReplayBackend, synthetic_source
+from myo.sequence import EMGSequencer
+from myo.types import ClassifierMode, EMGData, EMGMode, IMUMode
+
+PERIOD = 0.01  # one 2-sample packet per 10ms at 200Hz
+
+
+def run(events, **kwargs):
+    """
+    <> push (t, packet number) events, packet n carries the value n in every channel
+    """
+    seq = EMGSequencer(**kwargs)
+    blocks = [seq.push(t, EMG_HANDLES[n % 4], [n] * 16) for t, n in events]
+    blocks.append(seq.flush())
+    index = np.concatenate([b.index for b in blocks])
+    emg = np.concatenate([b.emg for b in blocks])
+    gap = np.concatenate([b.gap for b in blocks])
+    return seq, index, emg, gap
+
+
+def test_in_order():
+    seq, index, emg, gap = run([(n * PERIOD + 0.003, n) for n in range(50)])
+    assert (index == np.arange(100)).all()
+    assert (emg[::2, 0] == np.arange(50)).all() and not gap.any()
+    assert seq.stats()["dropped"] == 0
+    assert seq.effective_rate == pytest.approx(200, rel=0.03)
+
+
+@pytest.mark.parametrize("fill", [False, True])
+def test_dropped_packets(fill):
+    # a single packet, two in a row and a whole rotation (4 packets, no characteristic skipped)
+    lost = {10, 20, 21, 30, 31, 32, 33}
+    events = [(n * PERIOD, n) for n in range(50) if n not in lost]
+    seq, index, emg, gap = run(events, fill=fill)
+    assert seq.dropped == len(lost)
+    assert seq.stats()["loss"] == pytest.approx(len(lost) / 50)
+    received = [n for n in range(50) if n not in lost]
+    if fill:
+        # a uniform series with NaN rows for the dropped packets
+        assert (index == np.arange(100)).all()
+        assert (np.flatnonzero(gap[::2]) == sorted(lost)).all()
+        assert np.isnan(emg[gap]).all()
+        assert (emg[~gap][::2, 0] == received).all()
+    else:
+        assert (index[::2] // 2 == received).all()
+        assert not np.isnan(emg).any()
+
+
+def test_reordered_packets():
+    events = [(n * PERIOD, n) for n in range(20)]
+    events[7], events[8] = (8 * PERIOD, 8), (8 * PERIOD + 0.001, 7)
+    seq, index, emg, gap = run(events, fill=True)
+    assert seq.reordered == 1 and seq.dropped == 0
+    assert (emg[::2, 0] == np.arange(20)).all()
+
+
+def test_bursts():
+    # packets delivered 3 at a time, as within one connection event
+    events = [((n // 3 * 3 + 2) * PERIOD + 0.001 * (n % 3), n) for n in range(60) if n != 31]
+    seq, index, emg, gap = run(events, fill=True)
+    assert seq.dropped == 1 and seq.reordered == 0
+    assert np.flatnonzero(gap[::2]).tolist() == [31]
+
+
+@pytest.mark.parametrize("rate", [198.0, 199.0, 201.0])
+def test_clock_drift(rate):
+    # a minute of a band clock off its nominal 200Hz, jittery arrivals and nothing lost
+    rng = np.random.default_rng(0)
+    arrival, events = 0.0, []
+    for n in range(int(60 * rate / 2)):
+        arrival = max(arrival, n * 2 / rate + 0.002 + rng.exponential(0.004))
+        events.append((arrival, n))
+    seq, index, emg, gap = run(events, fill=True)
+    assert seq.dropped == 0 and seq.late == 0 and not gap.any()
+    assert (emg[::2, 0] == np.arange(len(events))).all()
+    assert seq.fitted_period == pytest.approx(2 / rate, rel=1e-4)
+
+
+def test_jitter_without_loss():
+    # an early fit on a few jittery arrivals must not stick and turn into false drops
+    for seed in range(100):
+        rng = np.random.default_rng(seed)
+        arrival = np.maximum.accumulate(np.arange(500) * PERIOD + 0.002 + rng.exponential(0.004, 500))
+        seq, index, emg, gap = run([(t, n) for n, t in enumerate(arrival)])
+        assert seq.dropped == 0, seed
+        assert seq.fitted_period == pytest.approx(PERIOD, rel=1e-3), seed
+
+
+def test_late_packet():
+    events = [(n * PERIOD, n) for n in range(20) if n != 5] + [(0.2, 5)]
+    seq, index, emg, gap = run(events, depth=2)
+    assert seq.late == 1 and seq.dropped == 1
+    assert 5 not in index // 2
+
+
+def test_timestamps():
+    seq = EMGSequencer()
+    seq.push(0.100, EMG_HANDLES[0], EMGData(bytes(16)))
+    seq.push(0.110, EMG_HANDLES[1], EMGData(bytes(16)))
+    block = seq.flush()
+    assert block.t == pytest.approx([0.095, 0.100, 0.105, 0.110])
+
+
+class SequencedClient(MyoClient):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.blocks = []
+
+    async def on_emg_samples(self, block):
+        self.blocks.append(block)
+
+
+def test_client_sequence_emg():
+    lost = {7, 40, 41, 42, 43}
+
+    def lossy_source():
+        n = 0
+        for t, handle, data in synthetic_source(duration=1.0):
+            if handle in EMG_HANDLES:
+                n += 1
+                if n - 1 in lost:
+                    continue
+            yield t, handle, data
+
+    async def run_client():
+        backend = ReplayBackend(lossy_source(), speed=None)
+        client = await SequencedClient.with_device(backend=backend, sequence_emg=True, sequence_fill=True)
+        await client.setup(classifier_mode=ClassifierMode.DISABLED, emg_mode=EMGMode.SEND_RAW, imu_mode=IMUMode.NONE)
+        await client.start()
+        await client._client.wait_done()
+        await client.stop()
+        await client.disconnect()
+        return client
+
+    client = asyncio.run(run_client())
+    index = np.concatenate([b.index for b in client.blocks])
+    gap = np.concatenate([b.gap for b in client.blocks])
+    assert (index == np.arange(200)).all()
+    assert sorted(np.flatnonzero(gap[::2])) == sorted(lost)
+    assert client.metrics_snapshot()["sequencer"]["dropped"] == len(lost)
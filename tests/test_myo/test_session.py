@@ -0,0 +1,84 @@
+import asyncio
+import json
+import os
+
+from myo import Handle, MyoClient
+from myo.replay import ReplayBackend, synthetic_source
+from myo.session import SessionReader, SessionWriter, jsonl_to_session, session_to_jsonl
+from myo.types import ClassifierMode, EMGData, EMGMode, IMUMode
+
+EMG_DATA_DIR = os.path.join(os.path.dirname(__file__), "..", "..", "EMG_data")
+RECORDING = os.path.join(EMG_DATA_DIR, "myo_data_20240811_145353_aggregated_data.json")
+
+
+def test_write_read(tmp_path):
+    path = str(tmp_path / "s.myo")
+    events = [e for e, _ in zip(synthetic_source(), range(100))]
+    with SessionWriter(path, buffer_records=16) as w:
+        for t, handle, payload in events:
+            w.write(10.0 + t, handle, payload)
+    r = SessionReader(path)
+    assert len(r) == 100
+    records = list(r.records())
+    assert [(h, p) for _, h, p in records] == [(h, p) for _, h, p in events]
+    assert abs(records[-1][0] - events[-1][0]) < 1e-5
+    t, handle, emg = next(r.decoded())
+    assert handle == Handle.EMG0_DATA and isinstance(emg, EMGData)
+
+
+def test_truncated_record_is_ignored(tmp_path):
+    path = str(tmp_path / "s.myo")
+    with SessionWriter(path) as w:
+        for t, handle, payload in [e for e, _ in zip(synthetic_source(), range(10))]:
+            w.write(t, handle, payload)
+    with open(path, "ab") as f:
+        f.write(b"\x01\x02\x03")
+    assert len(list(SessionReader(path).records())) == 10
+
+
+def test_jsonl_round_trip(tmp_path):
+    session = str(tmp_path / "s.myo")
+    out = str(tmp_path / "s.json")
+    jsonl_to_session(RECORDING, session)
+    frames = session_to_jsonl(session, out)
+    with open(RECORDING) as f:
+        original = [json.loads(line) for line in f if line.strip()]
+    with open(out) as f:
+        converted = [json.loads(line) for line in f]
+    assert frames == len(original)
+    assert converted == original
+    assert os.path.getsize(session) * 5 < os.path.getsize(RECORDING)
+
+
+def test_client_record_session(tmp_path):
+    path = str(tmp_path / "s.myo")
+
+    async def run():
+        backend = ReplayBackend(synthetic_source(duration=1.0), speed=None)
+        client = await MyoClient.with_device(backend=backend)
+        await client.setup(classifier_mode=ClassifierMode.DISABLED, emg_mode=EMGMode.SEND_RAW, imu_mode=IMUMode.NONE)
+        client.stream(kinds=("emg",))  # so notifications are accepted without on_emg_data
+        await client.record_session(path)
+        await client.start()
+        await client._client.wait_done()
+        await client.stop()
+        await client.disconnect()
+
+    asyncio.run(run())
+    r = SessionReader(path)
+    assert r.header.emg_mode == EMGMode.SEND_RAW
+    assert r.header.firmware == (1, 5, 1970, 2)
+    assert len(r) == 100
+
+
+def test_ticks_wrap(tmp_path):
+    path = str(tmp_path / "s.myo")
+    events = [e for e, _ in zip(synthetic_source(), range(10))]
+    # 2**32 ticks of 10us are ~11.9 hours
+    times = [0.0, 1.0, 40000.0, 40000.5, 90000.0, 90001.0, 90002.0, 90003.0, 90004.0, 90005.0]
+    with SessionWriter(path, buffer_records=4) as w:
+        for t, (_, handle, payload) in zip(times, events):
+            w.write(t, handle, payload)
+    records = list(SessionReader(path).records())
+    assert [t for t, _, _ in records] == times
+    assert [(h, p) for _, h, p in records] == [(h, p) for _, h, p in events]
@@ -0,0 +1,40 @@
+import numpy as np
+from myo.shm import SharedRing
+
+
+def test_ring_read_since():
+    ring = SharedRing.create(capacity=8, width=3, dtype=np.uint16)
+    reader = SharedRing.attach(ring.name, capacity=8, width=3, dtype=np.uint16)
+    try:
+        for i in range(5):
+            ring.write(float(i), [i, i, i])
+        seen, t, frames = reader.read_since(0)
+        assert seen == 5
+        assert t.tolist() == [0.0, 1.0, 2.0, 3.0, 4.0]
+        assert frames[:, 0].tolist() == [0, 1, 2, 3, 4]
+
+        # the reader falls behind by more than the capacity: only the newest frames survive
+        ring.write_many(np.arange(5, 17, dtype=float), np.repeat(np.arange(5, 17)[:, None], 3, axis=1))
+        seen, t, frames = reader.read_since(seen)
+        assert seen == 17
+        assert frames[:, 0].tolist() == list(range(9, 17))
+
+        seen, t, frames = reader.read_since(seen)
+        assert len(frames) == 0
+    finally:
+        reader.close()
+        ring.close()
+
+
+def test_ring_read_during_write():
+    ring = SharedRing.create(capacity=4, width=1, dtype=np.uint16)
+    try:
+        for i in range(4):
+            ring.write(float(i), [i])
+        # the writer has claimed the slot of frame 0 for frame 4 but not published it yet
+        ring._claimed[0] = 5
+        ring._data[0] = 4
+        seen, t, frames = ring.read_since(0)
+        assert seen == 4 and frames[:, 0].tolist() == [1, 2, 3]
+    finally:
+        ring.close()
@@ -0,0 +1,98 @@
+import asyncio
+
+import pytest
+from myo import Handle, MyoClient
+from myo.stream import OverflowPolicy, StreamBuffer
+from myo.types import ClassifierMode, EMGMode, FVData, IMUMode
+
+
+class Sender:
+    def __init__(self, handle):
+        self.handle = handle
+
+
+FV_BLOB = bytes.fromhex('5203ce0061007901d80062006f00730100')
+
+
+@pytest.mark.parametrize(
+    "policy,kept,dropped",
+    [
+        (OverflowPolicy.DROP_OLDEST, [2, 3, 4], 2),
+        (OverflowPolicy.DROP_NEWEST, [0, 1, 2], 2),
+        (OverflowPolicy.BLOCK, [0, 1, 2], 0),
+    ],
+)
+def test_overflow_policy(policy, kept, dropped):
+    buf = StreamBuffer(maxsize=3, policy=policy)
+    accepted = [buf.put_nowait(i) for i in range(5)]
+    assert list(buf._items) == kept
+    assert buf.dropped == dropped
+    assert accepted == [True, True, True] + [policy != OverflowPolicy.BLOCK] * 2
+
+
+@pytest.mark.parametrize("policy", list(OverflowPolicy))
+def test_marker_is_never_dropped(policy):
+    buf = StreamBuffer(maxsize=2, policy=policy)
+    for i in range(3):
+        buf.put_nowait(i)
+    assert buf.put_marker("gap")
+    assert list(buf._items)[-1] == "gap" and len(buf) == 3
+    # data still follows the policy
+    buf.put_nowait(3)
+    assert "gap" in buf._items
+
+
+def test_get_batch_latency():
+    async def run():
+        buf = StreamBuffer()
+        buf.put_nowait(1)
+        # fewer than batch_size items: returns after max_latency
+        assert await buf.get_batch(batch_size=4, max_latency=0.01) == [1]
+        for i in range(6):
+            buf.put_nowait(i)
+        assert await buf.get_batch(batch_size=4, max_latency=1) == [0, 1, 2, 3]
+        buf.close()
+        assert await buf.get_batch(batch_size=4) == [4, 5]
+        assert await buf.get_batch(batch_size=4) == []
+
+    asyncio.run(run())
+
+
+def test_block_waits_for_consumer():
+    async def run():
+        buf = StreamBuffer(maxsize=1, policy=OverflowPolicy.BLOCK)
+        await buf.put(0)
+        producer = asyncio.create_task(buf.put(1))
+        await asyncio.sleep(0)
+        assert not producer.done()
+        assert await buf.get_batch() == [0]
+        await producer
+        assert await buf.get_batch() == [1]
+
+    asyncio.run(run())
+
+
+def test_client_stream():
+    client = MyoClient()
+    client.classifier_mode = ClassifierMode.DISABLED
+    client.emg_mode = EMGMode.SEND_FILT
+    client.imu_mode = IMUMode.NONE
+    client._build_dispatch()
+
+    async def run():
+        s = client.stream(kinds=("fv",), batch_size=2, max_latency=0.01)
+        for _ in range(3):
+            # on_fv_data is not overridden, so only the stream is fed
+            await client.notify_callback(Sender(Handle.FV_DATA.value), FV_BLOB)
+        batches = []
+        async for batch in s:
+            batches.append(batch)
+            if len(batches) == 2:
+                s.close()
+        return batches
+
+    batches = asyncio.run(run())
+    assert [len(b) for b in batches] == [2, 1]
+    handle, t, fvd = batches[0][0]
+    assert handle == Handle.FV_DATA and isinstance(t, float) and isinstance(fvd, FVData)
+    assert not client._streams
@@ -173,3 +173,20 @@ def test_firmware_info(blob, fi_dict):
 def test_firmware_version(blob, fv_str):
     fv = FirmwareVersion(blob)
     assert str(fv) == fv_str
+
+
+@pytest.mark.parametrize(
+    "cls,blob",
+    [
+        (ClassifierEvent, bytes.fromhex('030100000000')),
+        (EMGData, bytes.fromhex('090d01fefefefa0206e9fcfdfcfe0502')),
+        (FVData, bytes.fromhex('5203ce0061007901d80062006f00730100')),
+        (IMUData, bytes.fromhex('3e2eab2be5f824004e01bd0757000300f5fffcff')),
+        (MotionEvent, bytes.fromhex('000201')),
+    ],
+)
+def test_types_decode_memoryview(cls, blob):
+    # decoders read in place: memoryview input decodes the same and no __dict__ is created
+    obj = cls(memoryview(blob))
+    assert obj.to_dict() == cls(bytearray(blob)).to_dict()
+    assert not hasattr(obj, "__dict__")
@@ -0,0 +1,71 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+matplotlib = pytest.importorskip("matplotlib")
+matplotlib.use("Agg")
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "myo_progects"))
+
+import matplotlib.pyplot as plt  # noqa: E402
+from live_render import LineRenderer, SampleWindow, minmax_decimate  # noqa: E402
+
+
+def test_sample_window_wraps():
+    w = SampleWindow(5, 2)
+    assert len(w.ordered()) == 0
+    w.push(np.arange(6).reshape(3, 2))
+    assert np.array_equal(w.ordered()[:, 0], [0, 2, 4])
+    w.push(np.arange(6, 14).reshape(4, 2))
+    assert w.count == 7
+    assert np.array_equal(w.ordered()[:, 0], [4, 6, 8, 10, 12])
+    assert np.array_equal(w.latest(), [12, 13])
+    # more than size at once keeps the last size samples
+    w.push(np.arange(100, 114).reshape(7, 2))
+    assert w.count == 14 and np.array_equal(w.ordered()[:, 0], [104, 106, 108, 110, 112])
+
+
+def test_minmax_decimate_keeps_peaks():
+    y = np.zeros((1003, 2))
+    y[500, 0] = 9.0
+    y[700, 1] = -9.0
+    x, lo, hi = minmax_decimate(y, 100)
+    assert x.shape == (100,) and lo.shape == hi.shape == (100, 2)
+    # every sample is used even though 1003 is not a multiple of 100
+    assert x[-1] == 1002 and np.all(np.diff(x) > 0) and np.all(np.diff(x) <= 11)
+    assert hi[:, 0].max() == 9.0 and lo[:, 1].min() == -9.0
+    peak = np.argmax(hi[:, 0])
+    assert x[peak - 1] < 500 <= x[peak]
+    # each column also covers the last sample of the previous one, so the band has no gaps
+    y = np.arange(40.0).reshape(20, 2)
+    x, lo, hi = minmax_decimate(y, 4)
+    assert np.array_equal(lo[1:], y[x[:-1]]) and np.array_equal(hi, y[x])
+
+
+def test_line_renderer_decimates_to_width():
+    fig, ax = plt.subplots(figsize=(4, 3), dpi=100)
+    try:
+        renderer = LineRenderer(ax, channels=3, rate=50, seconds=60)
+        renderer.push(np.full((3000, 3), 0.5))
+        (collection,) = renderer.draw()
+        paths = collection.get_paths()
+        assert len(paths) == 3 and len(renderer.handles) == 3
+        # a closed band: max from left to right, then min from right to left
+        verts = paths[0].vertices
+        assert len(verts) <= ax.bbox.width
+        assert -60 <= verts[0, 0] < -59.5
+        assert verts[len(verts) // 2 - 1, 0] == 0 and verts[-1, 0] == verts[0, 0]
+        # a flat signal still covers about one pixel
+        pixel = np.diff(ax.get_ylim())[0] / ax.bbox.height
+        assert np.allclose(verts[:len(verts) // 2, 1] - verts[len(verts) // 2:, 1], pixel)
+        assert not collection.get_antialiased().any()
+        # short windows are drawn as plain lines
+        renderer.window = SampleWindow(10, 3)
+        renderer.push(np.zeros((10, 3)))
+        (collection,) = renderer.draw()
+        assert len(collection.get_paths()[0].vertices) == 10
+        assert np.all(collection.get_linewidth() == 1)
+    finally:
+        plt.close(fig)